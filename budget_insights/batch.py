@@ -0,0 +1,168 @@
+"""Batch forecasts every budget of the database across a process pool.
+Budgets are streamed out of BudgetDatabase in chunks and only a few
+chunks are in flight per worker, so memory stays bounded however many
+budgets there are. Forecasts land in the forecast cache of the database,
+or in a columnar .npz file of the total of every budget.
+"""
+import collections
+import concurrent.futures
+import datetime
+import itertools
+import os
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+import forecast
+import forecast_cache
+
+# budgets sent to a worker at once
+CHUNK_SIZE = 32
+# chunks queued for every worker, the rest of the budgets are not read yet
+CHUNKS_PER_WORKER = 2
+
+def forecast_chunk(
+    budgets: list, years: int, resolution: str, start: datetime.date
+    ) -> list:
+    """Forecasts a chunk of budgets, see forecast_budgets
+
+    Returns:
+        list: (Budget_id, Name, cache key, Forecast) of every budget
+
+    """
+    return [(budget_id, name,
+             forecast_cache.cache_key(accounts, expenses, years, resolution, start),
+             forecast.forecast(accounts, expenses, years, resolution, start))
+            for budget_id, name, accounts, expenses in budgets]
+
+def forecast_budgets(
+    budgets: Iterable[tuple], years: int = 30, resolution: str = 'monthly',
+    start: Optional[datetime.date] = None, chunk_size: int = CHUNK_SIZE,
+    workers: Optional[int] = None
+    ) -> Iterator[tuple]:
+    """Forecasts budgets across a process pool, in the order they are given
+
+    Args:
+        budgets (Iterable): (Budget_id, Name, accounts, expenses) of every
+            budget, such as BudgetDatabase.iter_budgets()
+        years (int): length of the forecasts in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecasts, defaults to today
+        chunk_size (int): budgets sent to a worker at once
+        workers (int): processes used, defaults to one per core.
+            Budgets are forecast in this process if 1
+
+    Yields:
+        tuple: (Budget_id, Name, cache key, Forecast) of every budget
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    budgets = iter(budgets)
+    chunks = iter(lambda: list(itertools.islice(budgets, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from forecast_chunk(chunk, years, resolution, start)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(forecast_chunk, chunk, years, resolution, start))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def store_cache(cache: forecast_cache.ForecastCache, results: Iterable[tuple]) -> int:
+    """Puts forecasts into the forecast cache, committing once per chunk
+
+    Args:
+        cache (ForecastCache): cache of the database the budgets are from
+        results (Iterable): (Budget_id, Name, cache key, Forecast) of every budget
+
+    Returns:
+        int: number of forecasts stored
+
+    """
+    results = iter(results)
+    stored = 0
+    for chunk in iter(lambda: list(itertools.islice(results, CHUNK_SIZE)), []):
+        with cache.transaction():
+            for budget_id, _, key, result in chunk:
+                cache.put(key, budget_id, result)
+        stored += len(chunk)
+    return stored
+
+def write_totals(path: str, results: Iterable[tuple], dates: np.ndarray, count: int) -> int:
+    """Writes the total of every budget to a columnar .npz file holding the
+    arrays budget_id, name, dates and total (budgets x periods). Totals are
+    written to a memory mapped .npy file next to path as they arrive, then
+    copied into the .npz in buffered chunks, so they are never all in memory.
+
+    Args:
+        path (str): path of the .npz file
+        results (Iterable): (Budget_id, Name, cache key, Forecast) of every budget
+        dates (np.ndarray): date of every period of the forecasts
+        count (int): most budgets results holds, such as BudgetDatabase.count_budgets()
+
+    Returns:
+        int: number of budgets written
+
+    """
+    budget_ids = np.zeros(count, dtype=np.int64)
+    names = []
+    scratch = f'{path}.total.npy'
+    total = np.lib.format.open_memmap(scratch, mode='w+', dtype=np.float64,
+                                      shape=(count, len(dates)))
+    try:
+        for row, (budget_id, name, _, result) in enumerate(results):
+            if row == count:
+                raise ValueError(f'more than {count} budgets to write')
+            budget_ids[row] = budget_id
+            names.append(name)
+            total[row] = result.total
+        written = len(names)
+        total.flush()
+        np.savez(path, budget_id=budget_ids[:written], name=np.array(names, dtype=str),
+                 dates=dates, total=total[:written])
+    finally:
+        del total
+        os.remove(scratch)
+    return written
+
+def forecast_all(
+    budget_database, years: int = 30, resolution: str = 'monthly',
+    start: Optional[datetime.date] = None, path: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None
+    ) -> int:
+    """Forecasts every budget of the database
+
+    Args:
+        budget_database (BudgetDatabase): helper for budget database
+        years (int): length of the forecasts in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecasts, defaults to today
+        path (str): .npz file the totals are written to, see write_totals.
+            Forecasts are stored in the forecast cache if None
+        chunk_size (int): budgets sent to a worker at once
+        workers (int): processes used, defaults to one per core
+
+    Returns:
+        int: number of budgets forecast
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    budgets = budget_database.iter_budgets()
+    if path is not None:
+        # the file is sized for the budgets counted, budgets added later wait for the next run
+        count = budget_database.count_budgets()
+        budgets = itertools.islice(budgets, count)
+    results = forecast_budgets(budgets, years, resolution, start, chunk_size, workers)
+    if path is not None:
+        dates, _, _ = forecast.time_axis(forecast.count_periods(years, resolution),
+                                         resolution, start)
+        return write_totals(path, results, dates, count)
+    return store_cache(forecast_cache.ForecastCache(manager=budget_database.manager), results)
@@ -0,0 +1,61 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import batch
+import budget_dbhelper
+import forecast
+import forecast_cache
+
+START = datetime.date(2022, 1, 15)
+
+def create_budgets(database, count):
+    for index in range(count):
+        accounts = [{'name': 'Savings', 'balance': 100 * index, 'interest': 2,
+                     'type': 'Savings', 'compound': 'Monthly'}]
+        database.create_budget(f'budget {index}', accounts)
+        if index % 2:
+            database.update_expenses(f'budget {index}', [
+                {'name': 'Rent', 'description': '', 'amount': index,
+                 'type': 'Expense', 'frequency': 'Monthly'}])
+
+def test_iter_budgets(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    create_budgets(database, 4)
+    budgets = list(database.iter_budgets())
+    assert [name for _, name, _, _ in budgets] == [f'budget {index}' for index in range(4)]
+    for _, name, accounts, expenses in budgets:
+        assert accounts == database.get_accounts_by_name(name)
+        assert expenses == database.get_expenses_by_name(name)
+
+def test_forecast_all_into_cache_and_file(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    create_budgets(database, 7)
+    assert batch.forecast_all(database, years=2, start=START, chunk_size=2, workers=2) == 7
+    cache = forecast_cache.ForecastCache(manager=database.manager)
+    for budget_id, name, accounts, expenses in database.iter_budgets():
+        key = forecast_cache.cache_key(accounts, expenses, 2, 'monthly', START)
+        expected = forecast.forecast(accounts, expenses, 2, start=START).total
+        assert np.allclose(cache.get(key).total, expected)
+
+    path = str(tmp_path / 'totals.npz')
+    assert batch.forecast_all(database, years=2, start=START, path=path, workers=1) == 7
+    with np.load(path) as totals:
+        assert totals['total'].shape == (7, 25)
+        assert list(totals['name']) == [f'budget {index}' for index in range(7)]
+        assert np.allclose(totals['total'][3], 300 * (1 + 0.02 / 12) ** np.arange(25)
+                           - 3 * np.arange(25))
+
+def test_write_totals_streams_through_a_scratch_file(tmp_path):
+    result = forecast.forecast([], [], 1, start=START)
+    results = [(budget_id, f'budget {budget_id}', None, result) for budget_id in (3, 5)]
+    path = str(tmp_path / 'totals.npz')
+    # fewer budgets than counted are trimmed
+    assert batch.write_totals(path, results, result.dates, 4) == 2
+    with np.load(path) as totals:
+        assert list(totals['budget_id']) == [3, 5] and totals['total'].shape == (2, 13)
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ['totals.npz']
+    with pytest.raises(ValueError):
+        batch.write_totals(path, results, result.dates, 1)
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ['totals.npz']
@@ -0,0 +1,64 @@
+"""Synthetic budgets for the benchmarks (*_benchmark.py). Values come from
+a seeded generator, so every run measures the same data.
+"""
+import os
+import random
+
+import budget_dbhelper
+
+# rows of the largest database benchmarked, raise to 10 ** 6 for nightly runs
+MAX_ROWS = int(os.environ.get('BENCHMARK_MAX_ROWS', 10 ** 5))
+# accounts & expenses of every budget
+ITEMS_PER_BUDGET = 10
+COMPOUNDS = ('Daily', 'Monthly', 'Quarterly', 'Annually')
+FREQUENCIES = ('Weekly', 'Bi Weekly', 'Monthly', 'Quarterly', 'Annually')
+
+def row_counts() -> list:
+    """Returns the row counts benchmarked, powers of ten from 10 ** 3 to MAX_ROWS"""
+    return [10 ** power for power in range(3, 7) if 10 ** power <= MAX_ROWS]
+
+def accounts(count: int, seed: int = 0) -> list:
+    """Returns count account dicts"""
+    generator = random.Random(seed)
+    return [{
+        'name': f'Account {index}',
+        'balance': round(generator.uniform(0, 50000), 2),
+        'interest': round(generator.uniform(0, 8), 2),
+        'type': 'Savings',
+        'compound': generator.choice(COMPOUNDS)
+        } for index in range(count)]
+
+def expenses(count: int, seed: int = 0) -> list:
+    """Returns count expense dicts, about one in five is income"""
+    generator = random.Random(seed)
+    return [{
+        'name': f'Expense {index}',
+        'description': 'benchmark',
+        'amount': round(generator.uniform(5, 3000), 2),
+        'type': 'Income' if generator.random() < 0.2 else 'Expense',
+        'frequency': generator.choice(FREQUENCIES)
+        } for index in range(count)]
+
+def budgets(rows: int) -> list:
+    """Returns (name, accounts) pairs of budgets holding rows accounts in total"""
+    return [(f'Budget {index}', accounts(ITEMS_PER_BUDGET, seed=index))
+            for index in range(max(rows // ITEMS_PER_BUDGET, 1))]
+
+def database(path: str, rows: int) -> budget_dbhelper.BudgetDatabase:
+    """Creates a database with budgets holding rows accounts and rows expenses
+
+    Args:
+        path (str): path of the database file
+        rows (int): number of accounts, and of expenses
+
+    Returns:
+        BudgetDatabase: helper of the new database
+
+    """
+    budget_database = budget_dbhelper.BudgetDatabase(path)
+    pairs = budgets(rows)
+    with budget_database.transaction():
+        budget_database.bulk_create_budgets(pairs)
+        budget_database.bulk_update_expenses(
+            (name, expenses(ITEMS_PER_BUDGET, seed=index)) for index, (name, _) in enumerate(pairs))
+    return budget_database
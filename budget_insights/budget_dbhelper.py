@@ -1,24 +1,102 @@
 """dbhelper allows user to connect to Database and make
 changes to budget.db
 """
-import sqlite3
+import threading
 import sys
 import os
 import json
-from typing import Union
-
-from utils import exception_handler
-
-class BudgetDatabase():
+import itertools
+from typing import Iterable, Iterator, Optional, Union
+
+import connection
+import errors
+import metrics
+import records
+from utils import (table_columns, create_unique_index, create_cache_triggers, iter_rows,
+                   ErrorMixin, TransactionMixin)
+
+# keys of account & expense dicts, in the order of their table columns
+ACCOUNT_KEYS = ('name', 'balance', 'interest', 'type', 'compound')
+EXPENSE_KEYS = ('name', 'description', 'amount', 'type', 'frequency', 'date')
+# values per IN list of select_in, below sqlite's variable limit
+NAMES_PER_QUERY = 500
+# upserts which only rewrite a row if one of its values changed
+UPSERT_COMMANDS = {
+    'accounts': ('''INSERT INTO accounts(Budget_id, Name, Balance, Interest, Type, Compound)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(Budget_id, Name) DO UPDATE SET
+                    Balance = excluded.Balance, Interest = excluded.Interest,
+                    Type = excluded.Type, Compound = excluded.Compound
+                WHERE (Balance, Interest, Type, Compound) IS NOT
+                    (excluded.Balance, excluded.Interest, excluded.Type, excluded.Compound);'''),
+    'expenses': ('''INSERT INTO expenses(Budget_id, Name, Description, Amount, Type, Frequency, Date)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(Budget_id, Name) DO UPDATE SET
+                    Description = excluded.Description, Amount = excluded.Amount,
+                    Type = excluded.Type, Frequency = excluded.Frequency, Date = excluded.Date
+                WHERE (Description, Amount, Type, Frequency, Date) IS NOT
+                    (excluded.Description, excluded.Amount,
+                     excluded.Type, excluded.Frequency, excluded.Date);'''),
+    }
+
+def account_values(budget_id: int, account: dict) -> tuple:
+    """Returns the values of UPSERT_COMMANDS['accounts'] for an account"""
+    if isinstance(account, records.Account):
+        return (budget_id, *account.to_row())
+    return (
+        budget_id,
+        account['name'],
+        float(account['balance']),
+        float(account['interest']),
+        account.get('type'),
+        account.get('compound')
+        )
+
+def expense_values(budget_id: int, expense: dict) -> tuple:
+    """Returns the values of UPSERT_COMMANDS['expenses'] for an expense"""
+    if isinstance(expense, records.Expense):
+        return (budget_id, *expense.to_row())
+    return (
+        budget_id,
+        expense['name'],
+        expense.get('description'),
+        float(expense['amount']),
+        expense.get('type'),
+        expense.get('frequency'),
+        expense.get('date')
+        )
+
+ROW_VALUES = {'accounts': account_values, 'expenses': expense_values}
+
+def expense_dict(row: tuple) -> dict:
+    """Returns the expense dict of a row ordered like EXPENSE_KEYS,
+    'date' is only included for expenses which have one"""
+    expense = dict(zip(EXPENSE_KEYS, row))
+    if expense['date'] is None:
+        del expense['date']
+    return expense
+
+@metrics.instrument
+class BudgetDatabase(ErrorMixin, TransactionMixin, connection.ConnectionMixin):
     """Allows user to connect to database using sqlite and
     make changes or get strored information"""
-    def __init__(self, name: str = 'budget.db'):
-        self.con = sqlite3.connect(name)
-        self.cur = self.con.cursor()
+    def __init__(self, name: str = 'budget.db',
+                 manager: Optional[connection.ConnectionManager] = None):
+        """
+        Args:
+            name (str): path of the database file
+            manager (ConnectionManager): pool to take connections from,
+                defaults to the shared manager of name
+
+        """
+        self.manager = manager if manager is not None else connection.get_manager(name)
+        self.cursors = threading.local()
+        self.failures = threading.local()
         self.create_db()
 
     def create_db(self) -> bool:
-        """Executes command to create budgets table if not exists
+        """Executes commands to create budgets, accounts and expenses tables
+        if not exists, then migrates budgets which still store JSON
 
         Returns:
             bool: pass or fail
@@ -29,45 +107,175 @@ class BudgetDatabase():
             command = ('''CREATE TABLE IF NOT EXISTS budgets (
                         Budget_id integer primary key autoincrement,
                         Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        Name text,
-                        Account text,
-                        Expenses text
+                        Name text
                         );''')
             self.cur.execute(command)
-            self.con.commit()
+            # one row per account, linked to budgets through Budget_id
+            command = ('''CREATE TABLE IF NOT EXISTS accounts (
+                        Account_id integer primary key autoincrement,
+                        Budget_id integer NOT NULL
+                            REFERENCES budgets(Budget_id) ON DELETE CASCADE,
+                        Name text NOT NULL,
+                        Balance real,
+                        Interest real,
+                        Type text,
+                        Compound text,
+                        UNIQUE (Budget_id, Name)
+                        );''')
+            self.cur.execute(command)
+            # one row per expense or income, linked to budgets through Budget_id
+            command = ('''CREATE TABLE IF NOT EXISTS expenses (
+                        Expense_id integer primary key autoincrement,
+                        Budget_id integer NOT NULL
+                            REFERENCES budgets(Budget_id) ON DELETE CASCADE,
+                        Name text NOT NULL,
+                        Description text,
+                        Amount real,
+                        Type text,
+                        Frequency text,
+                        Date text,
+                        UNIQUE (Budget_id, Name)
+                        );''')
+            self.cur.execute(command)
+            # Date was added for one time expenses such as imported transactions
+            if 'Date' not in table_columns(self.cur, 'expenses'):
+                self.cur.execute('ALTER TABLE expenses ADD COLUMN Date text;')
+            # UNIQUE (Budget_id, Name) already indexes lookups by budget
+            self.cur.execute('CREATE INDEX IF NOT EXISTS accounts_name ON accounts(Name);')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS expenses_name ON expenses(Name);')
+            self.commit()
+            if 'Account' in table_columns(self.cur, 'budgets'):
+                self.migrate_json_columns()
+            # name lookups use this index, create_budget relies on it for ON CONFLICT
+            create_unique_index(self.cur, 'budgets_name', 'budgets', 'Name', 'Budget_id')
+            # tables created again after delete_table have lost their triggers
+            create_cache_triggers(self.cur)
+            self.commit()
             return True
-        except Exception as exception:
-            exception_handler()
-            return False
+        except Exception:
+            self.rollback()
+            return self.fail('create_db')
+
+    def migrate_json_columns(self) -> None:
+        """Moves accounts and expenses stored as JSON in the Account/Expenses
+        columns of an older budget.db into their own tables, then rebuilds
+        budgets without those columns. Budget_id values are kept so
+        projections stay linked.
+        """
+        # rebuilding a parent table must not cascade into its children
+        self.cur.execute('PRAGMA foreign_keys = OFF;')
+        try:
+            self.cur.execute('BEGIN;')
+            self.cur.execute('SELECT Budget_id, Account, Expenses FROM budgets;')
+            for budget_id, accounts, expenses in self.cur.fetchall():
+                if accounts:
+                    self.insert_accounts(budget_id, json.loads(accounts))
+                if expenses:
+                    self.insert_expenses(budget_id, json.loads(expenses))
+            self.cur.execute('''CREATE TABLE budgets_new (
+                            Budget_id integer primary key autoincrement,
+                            Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                            Name text
+                            );''')
+            self.cur.execute('''INSERT INTO budgets_new(Budget_id, Timestamp, Name)
+                            SELECT Budget_id, Timestamp, Name FROM budgets;''')
+            self.cur.execute('DROP TABLE budgets;')
+            self.cur.execute('ALTER TABLE budgets_new RENAME TO budgets;')
+            self.con.commit()
+        finally:
+            if self.con.in_transaction:
+                self.con.rollback()
+            self.cur.execute('PRAGMA foreign_keys = ON;')
+
+    def insert_accounts(self, budget_id: int, accounts: list) -> None:
+        """Inserts or updates account rows of a budget without committing.
+        Rows whose values did not change are not rewritten.
 
-    def create_budget(self, name: str, accounts: str) -> bool:
-        """Inserts row into budget table with new budget
+        Args:
+            budget_id (int): ID of budget
+            accounts (list): list of account dictionaries
+
+        """
+        self.upsert_rows('accounts', ((budget_id, account) for account in accounts))
+
+    def insert_expenses(self, budget_id: int, expenses: list) -> None:
+        """Inserts or updates expense rows of a budget without committing.
+        Rows whose values did not change are not rewritten.
+
+        Args:
+            budget_id (int): ID of budget
+            expenses (list): list of expense dictionaries
+
+        """
+        self.upsert_rows('expenses', ((budget_id, expense) for expense in expenses))
+
+    def upsert_rows(self, table: str, rows: Iterable) -> None:
+        """Inserts or updates accounts or expenses of any number of budgets
+        with one executemany, without committing
+
+        Args:
+            table (str): 'accounts' or 'expenses'
+            rows (Iterable): (budget id, dictionary) pairs
+
+        """
+        values = ROW_VALUES[table]
+        self.cur.executemany(UPSERT_COMMANDS[table],
+                             (values(budget_id, item) for budget_id, item in rows))
+
+    def delete_missing(self, table: str, keep: dict) -> None:
+        """Deletes rows of accounts or expenses whose name is not kept,
+        without committing
+
+        Args:
+            table (str): 'accounts' or 'expenses'
+            keep (dict): budget id to set of names of rows to keep
+
+        """
+        command = f'SELECT Budget_id, Name FROM {table} WHERE Budget_id IN ({{}})'
+        removed = [row for row in self.select_in(command, list(keep))
+                   if row[1] not in keep[row[0]]]
+        self.cur.executemany(f'DELETE FROM {table} WHERE Budget_id = ? AND Name = ?;', removed)
+
+    def select_in(self, command: str, values: list) -> Iterable:
+        """Runs a query with an IN list in chunks small enough for sqlite
+
+        Args:
+            command (str): query with {} where the placeholders of the IN list go
+            values (list): values of the IN list
+
+        Yields:
+            tuple: every row returned by the chunks
+
+        """
+        for start in range(0, len(values), NAMES_PER_QUERY):
+            chunk = values[start:start + NAMES_PER_QUERY]
+            self.cur.execute(command.format(', '.join('?' * len(chunk))), chunk)
+            yield from self.cur.fetchall()
+
+    def create_budget(self, name: str, accounts: list) -> bool:
+        """Inserts row into budget table with new budget and its accounts
 
         Args:
             name (str): name of budget
-            accounts (str): a str which contains list of dictionaries
+            accounts (list): list of account dictionaries
 
         Returns:
             bool: pass or fail
 
         """
         try:
-            # check if name already exists
-            command = "SELECT EXISTS(SELECT 1 FROM budgets WHERE Name=?);"
-            accounts = json.dumps(accounts)
+            # nothing is inserted if the name already exists
+            command = ('''INSERT INTO budgets(Name)
+                        VALUES (?)
+                        ON CONFLICT(Name) DO NOTHING;''')
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()
-            if results[0][0] == 1:
-                return False
-            # now that it does not exist, create it
-            command = ('''INSERT INTO budgets(Name, Account)
-                        VALUES (?, ?);''')
-            values = (name, accounts)
-            self.cur.execute(command, values)
-            self.con.commit()
-        except Exception as exception:
-            exception_handler()
-            return False
+            if self.cur.rowcount == 0:
+                raise errors.ConflictError()
+            self.insert_accounts(self.cur.lastrowid, accounts)
+            self.commit()
+        except Exception:
+            self.rollback()
+            return self.fail('create_budget', name=name)
         return True
 
     def get_id_by_name(self, name:str) -> Union[str, bool]:
@@ -83,32 +291,58 @@ class BudgetDatabase():
         try:
             command = "SELECT Budget_id FROM budgets WHERE Name = ?"
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()[0][0]
-            return results
-        except Exception as exception:
-            exception_handler()
-            return False
+            row = self.cur.fetchone()
+            if row is None:
+                raise errors.NotFoundError()
+            return row[0]
+        except Exception:
+            return self.fail('get_id_by_name', name=name)
 
-    def update_expenses(self, name:str, expenses:str) -> bool:
-        """Inserts expenses into the budget database
+    def update_expenses(self, name:str, expenses:list) -> bool:
+        """Replaces the expenses of a budget. Only expenses which were
+        added, changed or removed are written.
 
         Args:
             name (str): name of budget
-            expenses (str): list of expenses
+            expenses (list): list of expenses
 
         Returns:
             bool: pass or fail
 
         """
         try:
-            expenses = json.dumps(expenses)
-            command = """UPDATE budgets SET Expenses = ? WHERE Name = ?;"""
-            self.cur.execute(command, (expenses, name))
-            self.con.commit()
+            budget_id = self.get_id_by_name(name)
+            if budget_id is False:
+                return False
+            self.insert_expenses(budget_id, expenses)
+            self.delete_missing('expenses', {budget_id: {expense['name'] for expense in expenses}})
+            self.commit()
             return True
-        except Exception as exception:
-            exception_handler()
-            return False
+        except Exception:
+            self.rollback()
+            return self.fail('update_expenses', name=name)
+
+    def update_expense(self, name: str, expense: dict) -> bool:
+        """Inserts or updates a single expense of a budget
+
+        Args:
+            name (str): name of budget
+            expense (dict): expense to write
+
+        Returns:
+            bool: pass or fail
+
+        """
+        try:
+            budget_id = self.get_id_by_name(name)
+            if budget_id is False:
+                return False
+            self.insert_expenses(budget_id, [expense])
+            self.commit()
+            return True
+        except Exception:
+            self.rollback()
+            return self.fail('update_expense', name=name)
 
     def get_by_name(self, name: str) -> Union[list, bool]:
         """Searches table budgets by name
@@ -123,11 +357,12 @@ class BudgetDatabase():
         try:
             command = "SELECT * FROM budgets WHERE Name = ?"
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()[0]
-            return results
-        except Exception as exception:
-            exception_handler()
-            return False
+            row = self.cur.fetchone()
+            if row is None:
+                raise errors.NotFoundError()
+            return row
+        except Exception:
+            return self.fail('get_by_name', name=name)
 
     def get_all_budgets(self) -> list:
         """Returns every row contained in budgets table
@@ -136,11 +371,65 @@ class BudgetDatabase():
             list: contains every row in budgets table
 
         """
-        command = "SELECT * FROM budgets"
+        command = "SELECT Budget_id, Timestamp, Name FROM budgets"
         self.cur.execute(command)
         results = self.cur.fetchall()
         return results
 
+    def iter_budget_summaries(self, totals: bool = False) -> Iterator[tuple]:
+        """Iterates over a summary of every budget ordered by name, reading only
+        the columns listed so memory stays proportional to the number of
+        budgets rather than their accounts & expenses
+
+        Args:
+            totals (bool): also compute the account balance, number of
+                accounts and number of expenses of every budget in SQL
+
+        Returns:
+            Iterator: (Budget_id, Timestamp, Name) rows or, with totals,
+                (Budget_id, Timestamp, Name, Balance, Accounts, Expenses) rows
+
+        """
+        if totals:
+            command = """SELECT Budget_id, Timestamp, Name,
+                        (SELECT TOTAL(Balance) FROM accounts
+                            WHERE accounts.Budget_id = budgets.Budget_id),
+                        (SELECT COUNT(*) FROM accounts
+                            WHERE accounts.Budget_id = budgets.Budget_id),
+                        (SELECT COUNT(*) FROM expenses
+                            WHERE expenses.Budget_id = budgets.Budget_id)
+                        FROM budgets ORDER BY Name"""
+        else:
+            command = "SELECT Budget_id, Timestamp, Name FROM budgets ORDER BY Name"
+        return iter_rows(self.con, command)
+
+    def count_budgets(self) -> int:
+        """Returns the number of budgets
+
+        Returns:
+            int: number of rows in budgets table
+
+        """
+        self.cur.execute("SELECT COUNT(*) FROM budgets")
+        return self.cur.fetchone()[0]
+
+    def get_budgets_page(self, offset: int, limit: int) -> list:
+        """Returns one page of budgets ordered by name, read through the
+        budgets_name index so any page costs about the same
+
+        Args:
+            offset (int): number of budgets before the page
+            limit (int): maximum number of budgets in the page
+
+        Returns:
+            list: (Budget_id, Timestamp, Name) rows
+
+        """
+        command = """SELECT Budget_id, Timestamp, Name FROM budgets
+                    ORDER BY Name LIMIT ? OFFSET ?"""
+        self.cur.execute(command, (limit, offset))
+        return self.cur.fetchall()
+
     def get_accounts_by_name(self, name:str) -> Union[list, bool]:
         """Returns accounts for a budget
 
@@ -148,17 +437,17 @@ class BudgetDatabase():
             name (str): name of budget
 
         Returns:
-            list: account information associated with name
+            list: account dictionaries associated with name
 
         """
         try:
-            command = "SELECT Account FROM budgets where Name = ?"
+            command = ('''SELECT accounts.Name, Balance, Interest, Type, Compound
+                        FROM accounts JOIN budgets USING (Budget_id)
+                        WHERE budgets.Name = ? ORDER BY Account_id''')
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()
-            return results[0][0]
-        except Exception as exception:
-            exception_handler()
-            return False
+            return [dict(zip(ACCOUNT_KEYS, row)) for row in self.cur.fetchall()]
+        except Exception:
+            return self.fail('get_accounts_by_name', name=name)
 
     def get_expenses_by_name(self, name:str) -> Union[list, bool]:
         """Returns expenses for a budget
@@ -167,38 +456,224 @@ class BudgetDatabase():
             name (str): name of budget
 
         Returns:
-            list: expenses associated with name
+            list: expense dictionaries associated with name
+
+        """
+        try:
+            command = ('''SELECT expenses.Name, Description, Amount, Type, Frequency, Date
+                        FROM expenses JOIN budgets USING (Budget_id)
+                        WHERE budgets.Name = ? ORDER BY Expense_id''')
+            self.cur.execute(command, (name,))
+            return [expense_dict(row) for row in self.cur.fetchall()]
+        except Exception:
+            return self.fail('get_expenses_by_name', name=name)
+
+    def get_account_records(self, name: str) -> Union[list, bool]:
+        """Returns the accounts of a budget as records, see records.py
+
+        Args:
+            name (str): name of budget
+
+        Returns:
+            list | bool: Account records associated with name
+
+        """
+        try:
+            command = ('''SELECT accounts.Name, Balance, Interest, Type, Compound
+                        FROM accounts JOIN budgets USING (Budget_id)
+                        WHERE budgets.Name = ? ORDER BY Account_id''')
+            self.cur.execute(command, (name,))
+            return [records.Account(*row) for row in self.cur.fetchall()]
+        except Exception:
+            return self.fail('get_account_records', name=name)
+
+    def get_expense_records(self, name: str) -> Union[list, bool]:
+        """Returns the expenses of a budget as records, see records.py
+
+        Args:
+            name (str): name of budget
+
+        Returns:
+            list | bool: Expense records associated with name
 
         """
         try:
-            command = "SELECT Expenses FROM budgets where Name = ?"
+            command = ('''SELECT expenses.Name, Description, Amount, Type, Frequency, Date
+                        FROM expenses JOIN budgets USING (Budget_id)
+                        WHERE budgets.Name = ? ORDER BY Expense_id''')
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()
-            return results[0][0]
-        except Exception as exception:
-            exception_handler()
-            return False
+            return [records.Expense(*row) for row in self.cur.fetchall()]
+        except Exception:
+            return self.fail('get_expense_records', name=name)
+
+    def iter_budgets(self) -> Iterator[tuple]:
+        """Iterates over every budget with its accounts & expenses, ordered by
+        Budget_id. Budgets, accounts and expenses are read by three cursors
+        walking their tables in that order, so only one budget is in memory.
 
-    def update_accounts(self, name:str, accounts:str) -> bool:
-        """Updates accounts for an existing budget
+        Yields:
+            tuple: (Budget_id, Name, accounts, expenses) of every budget
+
+        """
+        budgets = iter_rows(self.con, "SELECT Budget_id, Name FROM budgets ORDER BY Budget_id")
+        account_rows = iter_rows(self.con, """SELECT Budget_id, Name, Balance, Interest, Type, Compound
+                                FROM accounts ORDER BY Budget_id, Account_id""")
+        expense_rows = iter_rows(self.con, """SELECT Budget_id, Name, Description, Amount, Type,
+                                Frequency, Date FROM expenses ORDER BY Budget_id, Expense_id""")
+        account_groups = ((budget_id, [dict(zip(ACCOUNT_KEYS, row[1:])) for row in rows])
+                          for budget_id, rows in itertools.groupby(account_rows, lambda row: row[0]))
+        expense_groups = ((budget_id, [expense_dict(row[1:]) for row in rows])
+                          for budget_id, rows in itertools.groupby(expense_rows, lambda row: row[0]))
+        accounts = next(account_groups, None)
+        expenses = next(expense_groups, None)
+        for budget_id, name in budgets:
+            while accounts is not None and accounts[0] < budget_id:
+                accounts = next(account_groups, None)
+            while expenses is not None and expenses[0] < budget_id:
+                expenses = next(expense_groups, None)
+            yield (
+                budget_id,
+                name,
+                accounts[1] if accounts is not None and accounts[0] == budget_id else [],
+                expenses[1] if expenses is not None and expenses[0] == budget_id else []
+                )
+
+    def update_accounts(self, name:str, accounts:list) -> bool:
+        """Replaces the accounts of an existing budget. Only accounts which
+        were added, changed or removed are written.
 
         Args:
             name (str): name of budget
-            accounts (str): new accounts
+            accounts (list): new accounts
 
         Returns:
             bool: pass or fail
 
         """
         try:
-            accounts = json.dumps(accounts)
-            command = """UPDATE budgets SET Account = ? WHERE Name = ?;"""
-            self.cur.execute(command, (accounts, name))
-            self.con.commit()
+            budget_id = self.get_id_by_name(name)
+            if budget_id is False:
+                return False
+            self.insert_accounts(budget_id, accounts)
+            self.delete_missing('accounts', {budget_id: {account['name'] for account in accounts}})
+            self.commit()
             return True
-        except Exception as exception:
-            exception_handler()
-            return False
+        except Exception:
+            self.rollback()
+            return self.fail('update_accounts', name=name)
+
+    def update_account(self, name: str, account: dict) -> bool:
+        """Inserts or updates a single account of a budget
+
+        Args:
+            name (str): name of budget
+            account (dict): account to write
+
+        Returns:
+            bool: pass or fail
+
+        """
+        try:
+            budget_id = self.get_id_by_name(name)
+            if budget_id is False:
+                return False
+            self.insert_accounts(budget_id, [account])
+            self.commit()
+            return True
+        except Exception:
+            self.rollback()
+            return self.fail('update_account', name=name)
+
+    def get_ids_by_names(self, names: list) -> dict:
+        """Returns the id of every existing budget in names
+
+        Args:
+            names (list): names of budgets
+
+        Returns:
+            dict: budget name to budget id, missing budgets are left out
+
+        """
+        command = 'SELECT Name, Budget_id FROM budgets WHERE Name IN ({})'
+        return dict(self.select_in(command, list(names)))
+
+    def bulk_create_budgets(self, budgets: Iterable) -> Union[int, bool]:
+        """Creates many budgets and their accounts with a single commit.
+        Budgets whose name already exists are skipped.
+
+        Args:
+            budgets (Iterable): (name, accounts) pairs
+
+        Returns:
+            int | bool: number of budgets created, or fail
+
+        """
+        try:
+            budgets = dict(budgets)
+            existing = self.get_ids_by_names(list(budgets))
+            budgets = {name: accounts for name, accounts in budgets.items() if name not in existing}
+            self.cur.executemany('INSERT INTO budgets(Name) VALUES (?);',
+                                 [(name,) for name in budgets])
+            ids = self.get_ids_by_names(list(budgets))
+            self.upsert_rows('accounts', ((ids[name], account)
+                                          for name, accounts in budgets.items()
+                                          for account in accounts))
+            self.commit()
+            return len(budgets)
+        except Exception:
+            self.rollback()
+            return self.fail('bulk_create_budgets')
+
+    def bulk_update_accounts(self, accounts: Iterable) -> bool:
+        """Replaces the accounts of many budgets with a single commit
+
+        Args:
+            accounts (Iterable): (budget name, list of accounts) pairs
+
+        Returns:
+            bool: pass or fail
+
+        """
+        return self.bulk_update('accounts', accounts)
+
+    def bulk_update_expenses(self, expenses: Iterable) -> bool:
+        """Replaces the expenses of many budgets with a single commit
+
+        Args:
+            expenses (Iterable): (budget name, list of expenses) pairs
+
+        Returns:
+            bool: pass or fail
+
+        """
+        return self.bulk_update('expenses', expenses)
+
+    def bulk_update(self, table: str, items: Iterable) -> bool:
+        """Replaces accounts or expenses of many budgets with a single commit.
+        Nothing is written if any of the budgets does not exist.
+
+        Args:
+            table (str): 'accounts' or 'expenses'
+            items (Iterable): (budget name, list of dictionaries) pairs
+
+        Returns:
+            bool: pass or fail
+
+        """
+        try:
+            items = dict(items)
+            ids = self.get_ids_by_names(list(items))
+            if len(ids) < len(items):
+                raise errors.NotFoundError(missing=sorted(set(items) - set(ids))[:10])
+            self.upsert_rows(table, ((ids[name], row)
+                                     for name, rows in items.items() for row in rows))
+            self.delete_missing(table, {ids[name]: {row['name'] for row in rows}
+                                        for name, rows in items.items()})
+            self.commit()
+            return True
+        except Exception:
+            self.rollback()
+            return self.fail('bulk_update', table=table)
 
     def delete_table(self) -> bool:
         """Deletes entire tables from database
@@ -208,13 +683,9 @@ class BudgetDatabase():
 
         """
         try:
-            command = "DROP TABLE budgets"
-            self.cur.execute(command)
-            self.con.commit()
+            for table in ('accounts', 'expenses', 'budgets'):
+                self.cur.execute(f'DROP TABLE IF EXISTS {table}')
+            self.commit()
             return True
-        except:
-            return False
-
-    def __del__(self) -> None:
-        """Closes the database on deletion of instance"""
-        self.con.close()
+        except Exception:
+            return self.fail('delete_table')
@@ -0,0 +1,121 @@
+import json
+import logging
+import sqlite3
+
+import pytest
+
+import budget_dbhelper
+import errors
+import projections_dbhelper
+
+ACCOUNT = {'name': 'Checking', 'balance': '100', 'interest': '1.5',
+           'type': 'Checkings', 'compound': 'Monthly'}
+EXPENSE = {'name': 'Rent', 'description': 'apartment', 'amount': 900.0,
+           'type': 'Expense', 'frequency': 'Monthly'}
+
+def test_budget_accounts_and_expenses(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    assert database.create_budget('home', [ACCOUNT]) is True
+    assert database.create_budget('home', [ACCOUNT]) is False
+    assert database.update_expenses('home', [EXPENSE]) is True
+    assert database.get_accounts_by_name('home')[0]['balance'] == 100
+    assert database.get_expenses_by_name('home') == [EXPENSE]
+    assert database.update_expenses('home', []) is True
+    assert database.get_expenses_by_name('home') == []
+
+def test_failures_are_typed_and_logged(tmp_path, caplog):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    projections = projections_dbhelper.ProjectionsDatabase(manager=database.manager)
+    database.create_budget('home', [ACCOUNT])
+    with caplog.at_level(logging.DEBUG):
+        assert database.create_budget('home', [ACCOUNT]) is False
+        assert isinstance(database.last_error, errors.ConflictError)
+        assert database.update_expenses('missing', [EXPENSE]) is False
+        error = database.last_error
+        assert isinstance(error, errors.NotFoundError)
+        assert error.operation == 'BudgetDatabase.get_id_by_name'
+        assert error.context == {'name': 'missing'}
+        assert projections.create_projection('future', 'missing') is False
+        assert isinstance(projections.last_error, errors.NotFoundError)
+        assert projections.bulk_insert_events([('missing', [])]) is False
+    # the failure of insert_event is logged once, not again by bulk_insert_events
+    assert [record.operation for record in caplog.records] == [
+        'BudgetDatabase.create_budget', 'BudgetDatabase.get_id_by_name',
+        'ProjectionsDatabase.create_projection', 'ProjectionsDatabase.get_id_by_name']
+    assert caplog.records[1].getMessage() == (
+        "BudgetDatabase.get_id_by_name failed: NotFoundError (name='missing')")
+    assert projections.get_budget_name('missing') is False
+    assert isinstance(projections.last_error, errors.NotFoundError)
+    assert projections.last_error.operation == 'ProjectionsDatabase.get_budget_name'
+
+def test_migrate_json_columns(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    con = sqlite3.connect(path)
+    con.execute('''CREATE TABLE budgets (
+                Budget_id integer primary key autoincrement,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                Name text, Account text, Expenses text);''')
+    con.execute('''CREATE TABLE projections (
+                Projections_id integer primary key autoincrement,
+                Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                Name text, Events text, Budget_id int);''')
+    con.execute('INSERT INTO budgets(Name, Account, Expenses) VALUES (?, ?, ?)',
+                ('home', json.dumps([ACCOUNT]), json.dumps([EXPENSE])))
+    con.execute('INSERT INTO projections(Name, Events, Budget_id) VALUES (?, ?, 1)',
+                ('future', json.dumps([{'name': 'raise', 'date': '2030-01-01'}])))
+    con.commit()
+    con.close()
+
+    database = budget_dbhelper.BudgetDatabase(path)
+    assert database.get_by_name('home')[2] == 'home'
+    assert database.get_accounts_by_name('home')[0]['name'] == 'Checking'
+    assert database.get_expenses_by_name('home') == [EXPENSE]
+    projections = projections_dbhelper.ProjectionsDatabase(path)
+    assert projections.get_events('future')[0]['name'] == 'raise'
+
+def test_unique_names(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    con = sqlite3.connect(path)
+    con.execute('CREATE TABLE budgets (Budget_id integer primary key, Timestamp DATETIME, Name text);')
+    con.executemany('INSERT INTO budgets(Name) VALUES (?)', [('home',), ('home',)])
+    con.commit()
+    con.close()
+
+    database = budget_dbhelper.BudgetDatabase(path)
+    assert [row[2] for row in database.get_all_budgets()] == ['home', 'home (2)']
+    projections = projections_dbhelper.ProjectionsDatabase(path)
+    assert projections.create_projection('future', 'home') is True
+    assert projections.create_projection('future', 'home') is False
+    assert projections.create_projection('other', 'missing') is False
+
+def test_bulk_writes_and_transactions(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    budgets = [(f'budget {count}', [ACCOUNT]) for count in range(50)]
+    assert database.bulk_create_budgets(budgets) == 50
+    assert database.bulk_create_budgets(budgets[:10]) == 0
+    assert database.bulk_update_expenses([('budget 1', [EXPENSE])]) is True
+    assert database.bulk_update_expenses([('missing', [EXPENSE])]) is False
+    assert database.get_expenses_by_name('budget 1') == [EXPENSE]
+
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.create_budget('rolled back', [ACCOUNT])
+            raise RuntimeError
+    assert database.get_id_by_name('rolled back') is False
+
+def test_summaries(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    database = budget_dbhelper.BudgetDatabase(path)
+    database.create_budget('work', [ACCOUNT, dict(ACCOUNT, name='Savings', balance='50')])
+    database.create_budget('home', [])
+    database.update_expenses('home', [EXPENSE])
+    summaries = database.iter_budget_summaries(totals=True)
+    assert [row[2:] for row in summaries] == [('home', 0.0, 0, 1), ('work', 150.0, 2, 0)]
+
+    projections = projections_dbhelper.ProjectionsDatabase(path)
+    projections.create_projection('future', 'work')
+    projections.insert_event('future', [{'name': 'raise', 'date': '2030-01-01'}])
+    # other queries can run while iterating
+    for row in projections.iter_projection_summaries():
+        assert projections.get_id_by_name(row[2]) == row[0]
+        assert row[2:] == ('future', 'work', 1)
@@ -0,0 +1,271 @@
+"""Chart draws the graphs of a budget on a single Figure and canvas which
+are created once. Every view has its own Axes, switching views hides
+and shows them, and new data is set on the existing lines and bars.
+Data artists are animated, so while the limits of a view stay the same
+they are blitted over its cached background instead of drawing the
+whole figure again. Lines only hold the minimum & maximum of every pixel
+column of their series, resampled whenever the x limits change.
+"""
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+import numpy as np
+from typing import Optional
+
+import downsample
+
+matplotlib.use("TkAgg")
+# tkinter colors in hex
+SLATEGRAY3 = '#9FB6CD'
+SLATEGRAY4 = '#6C7B8B'
+# views of a chart, each drawn on its own Axes
+GRAPH = 'graph'
+BAR = 'bar'
+MONTE_CARLO = 'monte carlo'
+
+class Chart:
+    """Figure & canvas shared by every view of a budget"""
+    def __init__(self, master=None, views: tuple = (GRAPH, BAR, MONTE_CARLO)) -> None:
+        """
+        Args:
+            master (tk.Widget): widget the canvas is drawn in, the chart
+                is drawn off screen if None
+            views (tuple): names of the views
+
+        """
+        self.figure = Figure()
+        self.figure.patch.set_color(SLATEGRAY3)
+        self.axes = {}
+        for view in views:
+            subplot = self.figure.add_subplot(1, 1, 1, label=view)
+            subplot.patch.set_color(SLATEGRAY3)
+            subplot.set_visible(False)
+            # zooming or panning shows another part of the series
+            subplot.callbacks.connect('xlim_changed',
+                                      lambda subplot, view=view: self.resample(view))
+            self.axes[view] = subplot
+        # animated data artists of every view, drawn by blit
+        self.lines = {view: [] for view in views}
+        self.bars = {view: [] for view in views}
+        self.fills = {view: [] for view in views}
+        # full (x, x as numbers, y) series of every line, see resample
+        self.series = {}
+        # last (dates, dates as numbers) converted by plot
+        self.numbers = (None, None)
+        # (limits, canvas size, saved region) of every view drawn
+        self.backgrounds = {}
+        self.view = None
+        if master is not None:
+            self.canvas = FigureCanvasTkAgg(self.figure, master)
+        else:
+            self.canvas = FigureCanvasAgg(self.figure)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('resize_event', self.on_resize)
+
+    def get_tk_widget(self):
+        """Returns the Tk widget of the canvas"""
+        return self.canvas.get_tk_widget()
+
+    def place(self, **kwargs) -> None:
+        """Places the canvas in its master, off screen charts are not placed
+
+        Args:
+            kwargs: keyword arguments of tk.Widget.place
+
+        """
+        if isinstance(self.canvas, FigureCanvasTkAgg):
+            self.canvas.get_tk_widget().place(**kwargs)
+
+    def show(self, view: str) -> None:
+        """Shows a view, blitting its cached background when it is still valid
+
+        Args:
+            view (str): name of the view
+
+        """
+        for name, subplot in self.axes.items():
+            subplot.set_visible(name == view)
+        self.view = view
+        self.redraw(view)
+
+    def redraw(self, view: str) -> None:
+        """Draws a view again after its data changed, if it is shown"""
+        if view == self.view and not self.blit():
+            self.canvas.draw_idle()
+
+    def blit(self) -> bool:
+        """Draws the data of the shown view over its cached background
+
+        Returns:
+            bool: False if there is no valid background, the figure must be drawn
+
+        """
+        cached = self.backgrounds.get(self.view)
+        if cached is None or cached[:2] != (self.limits(self.view), self.size()):
+            return False
+        self.canvas.restore_region(cached[2])
+        self.draw_animated(self.view)
+        self.canvas.blit(self.figure.bbox)
+        return True
+
+    def on_draw(self, event) -> None:
+        """Caches the background of the shown view after the figure was
+        drawn, then draws its animated data over it"""
+        if self.view is None:
+            return
+        self.backgrounds[self.view] = (self.limits(self.view), self.size(),
+                                       self.canvas.copy_from_bbox(self.figure.bbox))
+        self.draw_animated(self.view)
+
+    def on_resize(self, event) -> None:
+        """Resamples every view to the new pixel width of the canvas"""
+        for view in self.axes:
+            self.resample(view)
+
+    def resample(self, view: str, limits: Optional[tuple] = None) -> None:
+        """Sets the data of the lines of a view to the minimum & maximum of
+        their series for every pixel column between the x limits
+
+        Args:
+            view (str): name of the view
+            limits (tuple): (low, high) x values shown, the x limits of the view if None
+
+        """
+        subplot = self.axes[view]
+        low, high = limits if limits is not None else subplot.get_xlim()
+        for line in self.lines[view]:
+            x, numbers, y = self.series[line]
+            window = downsample.visible(numbers, low, high)
+            indices = downsample.min_max(y[window], subplot.bbox.width) + window.start
+            line.set_data(x[indices], y[indices])
+
+    def draw_animated(self, view: str) -> None:
+        """Draws the data artists of a view"""
+        subplot = self.axes[view]
+        for artist in self.fills[view] + self.bars[view] + self.lines[view]:
+            subplot.draw_artist(artist)
+
+    def limits(self, view: str) -> tuple:
+        """Returns the (x, y) limits of a view"""
+        subplot = self.axes[view]
+        return tuple(subplot.get_xlim()), tuple(subplot.get_ylim())
+
+    def size(self) -> tuple:
+        """Returns the size of the figure in pixels"""
+        return tuple(self.figure.bbox.size)
+
+    def relayout(self) -> None:
+        """Fits the layout to legends or ticks which changed. Every view
+        shares the layout, so every cached background is dropped."""
+        self.figure.tight_layout()
+        self.backgrounds.clear()
+
+    def rescale(self, view: str) -> None:
+        """Fits the limits of a view to its data"""
+        subplot = self.axes[view]
+        subplot.relim()
+        # relim only measures lines & patches
+        for fill in self.fills[view]:
+            subplot.update_datalim(fill.get_datalim(subplot.transData).get_points())
+        subplot.autoscale_view()
+
+    def plot(self, view: str, dates: np.ndarray, series: list) -> None:
+        """Sets the lines of a view. Lines are updated in place with set_data
+        unless their labels changed, and drawn downsampled, see resample.
+
+        Args:
+            view (str): name of the view
+            dates (np.ndarray): x values shared by every line
+            series (list): (label, y values, style dict) of every line
+
+        """
+        subplot = self.axes[view]
+        lines = self.lines[view]
+        relabeled = [line.get_label() for line in lines] != [label for label, _, _ in series]
+        if relabeled:
+            for line in lines:
+                line.remove()
+                del self.series[line]
+            lines[:] = [subplot.plot(dates[:1], values[:1], label=label, animated=True,
+                                     **style)[0]
+                        for label, values, style in series]
+        # dates as the numbers the axis uses, to find the part shown.
+        # Forecasts keep their dates array, so it is only converted once
+        if self.numbers[0] is not dates:
+            self.numbers = (dates, np.asarray(subplot.convert_xunits(dates), dtype=np.float64))
+        numbers = self.numbers[1]
+        for line, (_, values, _) in zip(lines, series):
+            self.series[line] = (dates, numbers, np.asarray(values))
+        if relabeled:
+            # the layout changes the x limits, which resamples every line,
+            # so it waits until each line has its series
+            subplot.legend(handles=self.fills[view] + lines)
+            self.relayout()
+        self.resample(view, (-np.inf, np.inf))
+        self.rescale(view)
+        self.redraw(view)
+
+    def bar(self, view: str, names: list, heights: np.ndarray, **style) -> None:
+        """Sets the bars of a view. Bars are updated in place with set_height
+        unless their names changed.
+
+        Args:
+            view (str): name of the view
+            names (list): label of every bar
+            heights (np.ndarray): height of every bar
+            style: keyword arguments of Axes.bar
+
+        """
+        subplot = self.axes[view]
+        bars = self.bars[view]
+        if [bar.get_label() for bar in bars] != list(names):
+            for bar in bars:
+                bar.remove()
+            positions = np.arange(len(names))
+            bars[:] = list(subplot.bar(positions, heights, animated=True, **style))
+            for bar, name in zip(bars, names):
+                bar.set_label(name)
+            subplot.set_xticks(positions)
+            subplot.set_xticklabels(names)
+            self.relayout()
+        else:
+            for bar, height in zip(bars, heights):
+                bar.set_height(height)
+        self.rescale(view)
+        self.redraw(view)
+
+    def fill(self, view: str, dates: np.ndarray, bands: list) -> None:
+        """Sets the shaded bands of a view, replacing the previous bands.
+        Call before plot, which draws the view and its legend.
+
+        Args:
+            view (str): name of the view
+            dates (np.ndarray): x values shared by every band
+            bands (list): (label, lower values, upper values, style dict) of every band
+
+        """
+        subplot = self.axes[view]
+        fills = self.fills[view]
+        for fill in fills:
+            fill.remove()
+        fills[:] = [subplot.fill_between(dates, lower, upper, label=label, animated=True, **style)
+                    for label, lower, upper, style in bands]
+
+    def style(self, view: str, ylabel: Optional[str] = None) -> None:
+        """Applies the colors of the GUI to a view
+
+        Args:
+            view (str): name of the view
+            ylabel (str): label of the y axis
+
+        """
+        subplot = self.axes[view]
+        if ylabel is not None:
+            subplot.set_ylabel(ylabel)
+        subplot.yaxis.label.set_color(color='white')
+        subplot.spines['top'].set_color('none')
+        subplot.spines['bottom'].set_color('white')
+        subplot.spines['left'].set_color('white')
+        subplot.spines['right'].set_color('none')
+        subplot.tick_params(colors='white', top=False, bottom=False, left=True, right=False)
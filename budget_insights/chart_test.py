@@ -0,0 +1,66 @@
+import numpy as np
+
+import chart
+
+DATES = np.arange('2022-01', '2023-01', dtype='datetime64[M]').astype('datetime64[D]')
+
+def count_draws(budget_chart):
+    draws = []
+    budget_chart.canvas.mpl_connect('draw_event', draws.append)
+    return draws
+
+def test_lines_are_updated_in_place_and_blitted():
+    budget_chart = chart.Chart()
+    draws = count_draws(budget_chart)
+    budget_chart.plot(chart.GRAPH, DATES, [('Total', np.arange(12.0), {'color': 'white'})])
+    budget_chart.show(chart.GRAPH)
+    assert len(draws) == 1
+    line = budget_chart.lines[chart.GRAPH][0]
+    # same limits, the line is blitted over the cached background
+    budget_chart.plot(chart.GRAPH, DATES, [('Total', np.arange(12.0)[::-1], {})])
+    assert budget_chart.lines[chart.GRAPH] == [line] and len(draws) == 1
+    assert line.get_ydata()[0] == 11
+    # new limits draw the figure again
+    budget_chart.plot(chart.GRAPH, DATES, [('Total', np.arange(12.0) * 10, {})])
+    assert len(draws) == 2
+
+def test_switching_views_reuses_backgrounds():
+    budget_chart = chart.Chart()
+    draws = count_draws(budget_chart)
+    budget_chart.bar(chart.BAR, ['Checking', 'Savings'], np.array([100, 200]))
+    budget_chart.plot(chart.GRAPH, DATES, [('Total', np.arange(12.0), {})])
+    budget_chart.show(chart.GRAPH)
+    budget_chart.show(chart.BAR)
+    assert len(draws) == 2
+    budget_chart.show(chart.GRAPH)
+    budget_chart.show(chart.BAR)
+    assert len(draws) == 2
+    bars = list(budget_chart.bars[chart.BAR])
+    budget_chart.bar(chart.BAR, ['Checking', 'Savings'], np.array([150, 50]))
+    assert budget_chart.bars[chart.BAR] == bars and bars[0].get_height() == 150
+
+def test_long_lines_are_downsampled_and_resampled_on_zoom():
+    budget_chart = chart.Chart()
+    dates = np.datetime64('2000-01-01') + np.arange(1000000).astype('timedelta64[m]')
+    values = np.cumsum(np.random.default_rng(1).normal(size=len(dates)))
+    budget_chart.plot(chart.GRAPH, dates, [('Total', values, {})])
+    budget_chart.show(chart.GRAPH)
+    line = budget_chart.lines[chart.GRAPH][0]
+    width = budget_chart.axes[chart.GRAPH].bbox.width
+    assert len(line.get_xdata()) <= 2 * width + 4
+    assert line.get_ydata().max() == values.max()
+    low, high = budget_chart.axes[chart.GRAPH].get_xlim()
+    budget_chart.axes[chart.GRAPH].set_xlim(low + (high - low) / 2, low + (high - low) * 0.51)
+    shown = line.get_xdata()
+    assert len(shown) <= 2 * width + 4
+    assert shown[0] > dates[0] and shown[-1] < dates[-1]
+
+def test_lines_can_change_after_the_chart_is_shown():
+    budget_chart = chart.Chart()
+    budget_chart.plot(chart.GRAPH, DATES, [('Total', np.arange(12.0), {})])
+    budget_chart.show(chart.GRAPH)
+    budget_chart.plot(chart.GRAPH, DATES, [('Total', np.arange(12.0), {}),
+                                           ('Savings', np.ones(12), {})])
+    lines = budget_chart.lines[chart.GRAPH]
+    assert [line.get_label() for line in lines] == ['Total', 'Savings']
+    assert all(line in budget_chart.series for line in lines) and len(budget_chart.series) == 2
@@ -0,0 +1,198 @@
+"""Command line interface to create, import, forecast and export budgets
+without the GUI. Installed as budget-cli.
+
+    budget-cli create home --account "Checking:2500:0.5:Monthly"
+    budget-cli create --file budgets.json
+    budget-cli import home transactions.csv
+    budget-cli forecast home savings --years 40
+    budget-cli simulate home --paths 100000
+    budget-cli batch --out totals.npz
+    budget-cli report
+    budget-cli export home home.csv
+    budget-cli --metrics db.prom batch
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import Optional
+
+import logs
+import metrics
+import services
+
+def parse_account(value: str) -> dict:
+    """Parses "name:balance:interest[:compound[:type]]" into an account dict"""
+    fields = value.split(':')
+    if len(fields) < 3:
+        raise argparse.ArgumentTypeError(f'Account "{value}" needs name:balance:interest')
+    fields += ['Monthly', 'Checkings'][len(fields) - 3:]
+    name, balance, interest, compound, type_act = fields[:5]
+    return {'name': name, 'balance': float(balance), 'interest': float(interest),
+            'type': type_act, 'compound': compound}
+
+def parse_expense(value: str) -> dict:
+    """Parses "name:amount:frequency[:type[:description]]" into an expense dict"""
+    fields = value.split(':')
+    if len(fields) < 3:
+        raise argparse.ArgumentTypeError(f'Expense "{value}" needs name:amount:frequency')
+    fields += ['Expense', ''][len(fields) - 3:]
+    name, amount, frequency, expense_income, description = fields[:5]
+    return {'name': name, 'description': description, 'amount': abs(float(amount)),
+            'type': expense_income, 'frequency': frequency}
+
+def create(args: argparse.Namespace) -> int:
+    """Creates one budget from arguments or many from a JSON file"""
+    budget_service = services.BudgetService(path=args.db)
+    if args.file:
+        with open(args.file, encoding='utf-8') as file:
+            created = budget_service.create_many(json.load(file))
+        if created is False:
+            print('Could not create budgets', file=sys.stderr)
+            return 1
+        print(f'Created {created} budgets')
+        return 0
+    if not args.name:
+        print('Give a budget name or --file', file=sys.stderr)
+        return 2
+    if budget_service.create(args.name, args.account, args.expense) is False:
+        print(f'Could not create budget {args.name}', file=sys.stderr)
+        return 1
+    print(f'Created budget {args.name}')
+    return 0
+
+def import_mint(args: argparse.Namespace) -> int:
+    """Imports a Mint export into a budget"""
+    budget_service = services.BudgetService(path=args.db)
+
+    def progress(imported: int, bytes_read: int, total: int) -> None:
+        print(f'\r{imported} transactions, {100 * bytes_read // max(total, 1)}%',
+              end='', file=sys.stderr)
+
+    try:
+        imported = budget_service.import_mint(args.name, args.path, progress=progress)
+    except ValueError as exception:
+        print(exception, file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(f'Imported {imported} transactions into {args.name}')
+    return 0
+
+def forecast(args: argparse.Namespace) -> int:
+    """Prints the forecasted total of budgets at the end of the horizon"""
+    forecast_service = services.ForecastService(path=args.db)
+    names = args.names or services.BudgetService(forecast_service.budget_database).names()
+    status = 0
+    for name in names:
+        try:
+            result = forecast_service.forecast(name, args.years, args.resolution)
+        except ValueError as exception:
+            print(exception, file=sys.stderr)
+            status = 1
+            continue
+        print(f'{name}\t{result.dates[-1]}\t{result.total[-1]:.2f}')
+    return status
+
+def simulate(args: argparse.Namespace) -> int:
+    """Prints the percentiles of a budget simulated along random paths"""
+    forecast_service = services.ForecastService(path=args.db)
+    try:
+        result = forecast_service.simulate(args.name, args.paths, args.years, args.resolution,
+                                           seed=args.seed, workers=args.workers)
+    except ValueError as exception:
+        print(exception, file=sys.stderr)
+        return 1
+    for percentile, band in zip(result.percentiles, result.bands):
+        print(f'{percentile}%\t{result.dates[-1]}\t{band[-1]:.2f}')
+    return 0
+
+def forecast_batch(args: argparse.Namespace) -> int:
+    """Forecasts every budget across processes, into the cache or a .npz file"""
+    forecast_service = services.ForecastService(path=args.db)
+    count = forecast_service.forecast_all(args.years, args.resolution, path=args.out,
+                                          chunk_size=args.chunk_size, workers=args.workers)
+    print(f'Forecast {count} budgets' + (f' to {args.out}' if args.out else ''))
+    return 0
+
+def report(args: argparse.Namespace) -> int:
+    """Prints the totals of every budget, computed over columns of every line item"""
+    items = services.BudgetService(path=args.db).line_items()
+    print('budget\taccounts\tbalance\tinterest\texpenses\tyearly income\tyearly expenses')
+    for name, row in zip(items.names, items.summary()):
+        print(f'{name}\t{row["accounts"]}\t{row["balance"]:.2f}\t{row["interest"]:.2f}\t'
+              f'{row["expenses"]}\t{row["yearly_income"]:.2f}\t{row["yearly_expenses"]:.2f}')
+    return 0
+
+def export_csv(args: argparse.Namespace) -> int:
+    """Exports a budget and its forecast to a .csv file"""
+    budget_service = services.BudgetService(path=args.db)
+    try:
+        rows = budget_service.export_csv(args.name, args.path, args.years, args.resolution)
+    except ValueError as exception:
+        print(exception, file=sys.stderr)
+        return 1
+    print(f'Wrote {rows} rows to {args.path}')
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Returns the parser of every command"""
+    parser = argparse.ArgumentParser(prog='budget-cli', description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default='budget.db', help='database file')
+    parser.add_argument('--metrics', help='write query timings to this file after the command, '
+                        'as Prometheus text if it ends with .prom or .txt, JSON otherwise')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = commands.add_parser('create', help='create budgets')
+    create_parser.add_argument('name', nargs='?')
+    create_parser.add_argument('--account', action='append', type=parse_account, default=[],
+                               help='name:balance:interest[:compound[:type]]')
+    create_parser.add_argument('--expense', action='append', type=parse_expense, default=[],
+                               help='name:amount:frequency[:type[:description]]')
+    create_parser.add_argument('--file', help='JSON list of {name, accounts, expenses}')
+    create_parser.set_defaults(run=create)
+
+    import_parser = commands.add_parser('import', help='import a Mint .csv export')
+    import_parser.add_argument('name')
+    import_parser.add_argument('path')
+    import_parser.set_defaults(run=import_mint)
+
+    report_parser = commands.add_parser('report', help='print the totals of every budget')
+    report_parser.set_defaults(run=report)
+
+    for name, run, help_text in (('forecast', forecast, 'forecast budgets, all if none given'),
+                                 ('simulate', simulate, 'simulate a budget along random paths'),
+                                 ('batch', forecast_batch, 'forecast every budget on every core'),
+                                 ('export', export_csv, 'export a budget to .csv')):
+        command_parser = commands.add_parser(name, help=help_text)
+        if name == 'forecast':
+            command_parser.add_argument('names', nargs='*')
+        elif name == 'batch':
+            command_parser.add_argument('--out', help='.npz file of totals, the forecast cache if not given')
+            command_parser.add_argument('--chunk-size', type=int, default=services.batch.CHUNK_SIZE,
+                                        help='budgets sent to a process at once')
+            command_parser.add_argument('--workers', type=int, help='processes, one per core if not given')
+        elif name == 'simulate':
+            command_parser.add_argument('name')
+            command_parser.add_argument('--paths', type=int, default=10000)
+            command_parser.add_argument('--seed', type=int)
+            command_parser.add_argument('--workers', type=int, help='processes, one per core if not given')
+        else:
+            command_parser.add_argument('name')
+            command_parser.add_argument('path')
+        command_parser.add_argument('--years', type=int, default=30)
+        command_parser.add_argument('--resolution', choices=('daily', 'monthly'),
+                                    default='monthly')
+        command_parser.set_defaults(run=run)
+    return parser
+
+def main(argv: Optional[list] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logs.start(level=logging.WARNING)
+    try:
+        return args.run(args)
+    finally:
+        if args.metrics:
+            metrics.REGISTRY.write(args.metrics)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+import cli
+
+def test_create_forecast_export(tmp_path, capsys):
+    database = str(tmp_path / 'budget.db')
+    assert cli.main(['--db', database, 'create', 'home',
+                     '--account', 'Checking:1000:0',
+                     '--expense', 'Rent:100:Monthly']) == 0
+    budgets = tmp_path / 'budgets.json'
+    budgets.write_text(json.dumps([{'name': 'other', 'accounts': [], 'expenses': []}]))
+    assert cli.main(['--db', database, 'create', '--file', str(budgets)]) == 0
+    capsys.readouterr()
+    assert cli.main(['--db', database, 'forecast', 'home', '--years', '1']) == 0
+    assert capsys.readouterr().out.split('\t')[-1].strip() == '-200.00'
+    assert cli.main(['--db', database, 'forecast', 'missing']) == 1
+    assert cli.main(['--db', database, 'simulate', 'home', '--years', '1',
+                     '--paths', '100', '--workers', '1']) == 0
+    bands = capsys.readouterr().out.splitlines()[-5:]
+    assert [band.split('\t')[0] for band in bands] == ['5%', '25%', '50%', '75%', '95%']
+    assert cli.main(['--db', database, 'export', 'home', str(tmp_path / 'home.csv')]) == 0
+    (tmp_path / 'bad.csv').write_text('Date,Amount\n', encoding='utf-8')
+    assert cli.main(['--db', database, 'import', 'bad', str(tmp_path / 'bad.csv')]) == 1
+    assert 'Not a Mint export' in capsys.readouterr().err
+    assert cli.main(['--db', database, 'export', 'missing', str(tmp_path / 'missing.csv')]) == 1
+    assert not (tmp_path / 'missing.csv').exists()
+    assert cli.main(['--db', database, 'batch', '--years', '1', '--workers', '1',
+                     '--out', str(tmp_path / 'totals.npz')]) == 0
+    assert 'Forecast 2 budgets' in capsys.readouterr().out
+    assert cli.main(['--db', database, 'report']) == 0
+    assert capsys.readouterr().out.splitlines()[1].split('\t')[:3] == ['home', '1', '1000.00']
+
+def test_no_gui_imports():
+    command = 'import sys, cli; assert "tkinter" not in sys.modules and "matplotlib" not in sys.modules'
+    subprocess.run([sys.executable, '-c', command], check=True, cwd=os.path.dirname(os.path.abspath(cli.__file__)))
@@ -0,0 +1,178 @@
+"""Connection shares tuned sqlite connections to budget.db between
+every database helper and thread of the application
+"""
+import atexit
+import sqlite3
+import threading
+import weakref
+from typing import Optional
+
+# applied to every new connection, see https://www.sqlite.org/pragma.html
+DEFAULT_PRAGMAS = {
+    # readers no longer block the writer and the writer no longer blocks readers
+    'journal_mode': 'WAL',
+    # safe with WAL, only the checkpoint waits for fsync
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # negative values are in KiB
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'foreign_keys': 'ON',
+}
+# idle connections kept for reuse by new threads
+MAX_IDLE = 8
+
+class _Lease():
+    """Held in the thread local storage of the thread using a connection,
+    the connection is given back to the pool once the thread is gone.
+    Every helper sharing the connection shares its transaction state."""
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        # number of transaction() blocks open on the connection
+        self.depth = 0
+        # set when a write inside those blocks failed
+        self.failed = False
+
+class ConnectionManager():
+    """Pool of connections to one database file. Each thread is handed one
+    connection, which every helper used by that thread shares. Connections of
+    finished threads are reused by new threads.
+    """
+    def __init__(self, path: str = 'budget.db', pragmas: Optional[dict] = None,
+                 max_idle: int = MAX_IDLE) -> None:
+        """
+        Args:
+            path (str): path of the database file
+            pragmas (dict): pragmas which override DEFAULT_PRAGMAS
+            max_idle (int): number of idle connections kept for reuse
+
+        """
+        self.path = path
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self.max_idle = max_idle
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.idle = []
+        self.connections = []
+        # keys of cached forecasts read since they were last marked as used,
+        # in order of use, see ForecastCache.get
+        self.cache_hits = {}
+        # callbacks by name, run by close before the connections are closed
+        self.closing = {}
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns the connection of the calling thread, checking one
+        out of the pool the first time a thread asks for it
+
+        Returns:
+            sqlite3.Connection: connection with pragmas applied
+
+        """
+        return self.lease().connection
+
+    def lease(self) -> _Lease:
+        """Returns the lease of the calling thread, which holds its
+        connection and the state of its transaction
+
+        Returns:
+            _Lease: lease of the calling thread
+
+        """
+        lease = getattr(self.local, 'lease', None)
+        if lease is None:
+            with self.lock:
+                connection = self.idle.pop() if self.idle else None
+            if connection is None:
+                connection = self.connect()
+            lease = _Lease(connection)
+            weakref.finalize(lease, self.release, connection)
+            self.local.lease = lease
+        return lease
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens a new connection and applies the pragmas
+
+        Returns:
+            sqlite3.Connection: new connection
+
+        """
+        # connections move between threads through the pool, never at the same time
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        for pragma, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {pragma} = {value};')
+        with self.lock:
+            self.connections.append(connection)
+        return connection
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        """Gives a connection back to the pool, closing it if the pool is full
+
+        Args:
+            connection (sqlite3.Connection): connection of a finished thread
+
+        """
+        try:
+            connection.rollback()
+        except sqlite3.ProgrammingError:
+            # already closed by close()
+            return
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(connection)
+                return
+            self.connections.remove(connection)
+        connection.close()
+
+    def close(self) -> None:
+        """Runs the closing callbacks, then closes every connection of the pool"""
+        for callback in list(self.closing.values()):
+            callback()
+        with self.lock:
+            for connection in self.connections:
+                connection.close()
+            self.idle = []
+            self.connections = []
+        self.local = threading.local()
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_manager(path: str = 'budget.db', pragmas: Optional[dict] = None) -> ConnectionManager:
+    """Returns the shared manager of a database file, creating it on first use.
+    pragmas only apply to the call which creates the manager.
+
+    Args:
+        path (str): path of the database file
+        pragmas (dict): pragmas which override DEFAULT_PRAGMAS
+
+    Returns:
+        ConnectionManager: manager shared by every helper of path
+
+    """
+    with _managers_lock:
+        if path not in _managers:
+            _managers[path] = ConnectionManager(path, pragmas)
+            # closing callbacks still run when the process exits
+            atexit.register(_managers[path].close)
+        return _managers[path]
+
+class ConnectionMixin():
+    """Gives a database helper the con & cur of the calling thread.
+    Helpers set self.manager to their ConnectionManager and self.cursors
+    to a threading.local() in __init__."""
+    manager = None
+    cursors = None
+
+    @property
+    def con(self) -> sqlite3.Connection:
+        """sqlite3.Connection: connection of the calling thread"""
+        return self.manager.connection()
+
+    @property
+    def cur(self) -> sqlite3.Cursor:
+        """sqlite3.Cursor: cursor of this helper for the calling thread"""
+        connection = self.con
+        cursor = getattr(self.cursors, 'cursor', None)
+        if cursor is None or cursor.connection is not connection:
+            cursor = self.cursors.cursor = connection.cursor()
+        return cursor
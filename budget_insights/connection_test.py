@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+import budget_dbhelper
+import connection
+import projections_dbhelper
+
+def test_pragmas_and_sharing(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    budgets = budget_dbhelper.BudgetDatabase(path)
+    projections = projections_dbhelper.ProjectionsDatabase(path)
+    assert budgets.con is projections.con
+    assert budgets.con.execute('PRAGMA journal_mode;').fetchone()[0] == 'wal'
+    assert budgets.con.execute('PRAGMA synchronous;').fetchone()[0] == 1
+    assert budgets.con.execute('PRAGMA foreign_keys;').fetchone()[0] == 1
+
+def test_threads_reuse_connections(tmp_path):
+    manager = connection.ConnectionManager(str(tmp_path / 'budget.db'))
+    database = budget_dbhelper.BudgetDatabase(manager=manager)
+    database.create_budget('home', [])
+    seen = []
+
+    def worker():
+        seen.append(id(manager.connection()))
+        assert database.get_id_by_name('home') == 1
+
+    for _ in range(3):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    assert manager.connection() not in manager.idle
+    assert len(set(seen)) == 1
+    manager.close()
+
+def test_transactions_belong_to_the_connection(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    budgets = budget_dbhelper.BudgetDatabase(path)
+    projections = projections_dbhelper.ProjectionsDatabase(path)
+    budgets.create_budget('home', [])
+
+    def worker():
+        # another thread commits on its own connection
+        assert budgets.create_budget('work', []) is True
+
+    with pytest.raises(RuntimeError):
+        with budgets.transaction():
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            # helpers sharing the connection defer their commits
+            assert projections.create_projection('future', 'home') is True
+            raise RuntimeError
+    assert budgets.get_id_by_name('work') == 2
+    assert projections.get_all_projections() == []
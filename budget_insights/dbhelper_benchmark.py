@@ -0,0 +1,82 @@
+"""Benchmarks of BudgetDatabase, run with nox -s benchmark"""
+import itertools
+import json
+
+import pytest
+
+import benchmark_data
+import budget_dbhelper
+import line_items
+
+# benchmarks creating a database need a new file for every round
+paths = itertools.count()
+
+@pytest.fixture(scope='module', params=benchmark_data.row_counts(), ids=lambda rows: f'{rows}rows')
+def filled(request, tmp_path_factory):
+    """A database with request.param accounts and as many expenses"""
+    path = str(tmp_path_factory.mktemp('filled') / 'budget.db')
+    return request.param, benchmark_data.database(path, request.param)
+
+@pytest.mark.parametrize('rows', benchmark_data.row_counts())
+def test_create_budgets(benchmark, tmp_path, rows):
+    budgets = benchmark_data.budgets(rows)
+
+    def setup():
+        path = str(tmp_path / f'budget{next(paths)}.db')
+        return (budget_dbhelper.BudgetDatabase(path), budgets), {}
+
+    created = benchmark.pedantic(
+        lambda budget_database, budgets: budget_database.bulk_create_budgets(budgets),
+        setup=setup, rounds=3)
+    assert created == len(budgets)
+
+def test_read_budget(benchmark, filled):
+    _, budget_database = filled
+    accounts = benchmark(budget_database.get_accounts_by_name, 'Budget 0')
+    assert len(accounts) == benchmark_data.ITEMS_PER_BUDGET
+
+def test_update_budget(benchmark, filled):
+    _, budget_database = filled
+    versions = itertools.cycle([benchmark_data.expenses(benchmark_data.ITEMS_PER_BUDGET, seed)
+                                for seed in range(2)])
+    assert benchmark(lambda: budget_database.update_expenses('Budget 0', next(versions)))
+
+def test_delete_expenses(benchmark, filled):
+    _, budget_database = filled
+    expenses = benchmark_data.expenses(benchmark_data.ITEMS_PER_BUDGET)
+
+    def setup():
+        budget_database.update_expenses('Budget 1', expenses)
+        return (), {}
+
+    assert benchmark.pedantic(lambda: budget_database.update_expenses('Budget 1', []),
+                              setup=setup, rounds=20)
+
+def test_get_all_budgets(benchmark, filled):
+    rows, budget_database = filled
+    budgets = benchmark(budget_database.get_all_budgets)
+    assert len(budgets) == rows // benchmark_data.ITEMS_PER_BUDGET
+
+def test_iter_budget_summaries(benchmark, filled):
+    rows, budget_database = filled
+    summaries = benchmark(lambda: list(budget_database.iter_budget_summaries(totals=True)))
+    assert len(summaries) == rows // benchmark_data.ITEMS_PER_BUDGET
+
+def test_load_line_items(benchmark, filled):
+    rows, budget_database = filled
+    assert len(benchmark(line_items.load, budget_database)) == 2 * rows
+
+def test_line_items_summary(benchmark, filled):
+    rows, budget_database = filled
+    items = line_items.load(budget_database)
+    assert len(benchmark(items.summary)) == rows // benchmark_data.ITEMS_PER_BUDGET
+
+@pytest.mark.parametrize('rows', benchmark_data.row_counts())
+def test_json_dumps(benchmark, rows):
+    items = benchmark_data.accounts(rows // 2) + benchmark_data.expenses(rows // 2)
+    assert benchmark(json.dumps, items)
+
+@pytest.mark.parametrize('rows', benchmark_data.row_counts())
+def test_json_loads(benchmark, rows):
+    dump = json.dumps(benchmark_data.accounts(rows // 2) + benchmark_data.expenses(rows // 2))
+    assert len(benchmark(json.loads, dump)) == rows
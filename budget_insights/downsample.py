@@ -0,0 +1,59 @@
+"""Downsample reduces long series to about as many points as a plot has
+pixels before they are drawn. Every bucket of points keeps its minimum
+and maximum, so spikes and dips of a forecast stay visible however far
+the plot is zoomed out.
+"""
+import numpy as np
+
+# points kept for every pixel column, the minimum and maximum
+POINTS_PER_PIXEL = 2
+
+def visible(x: np.ndarray, low: float, high: float) -> slice:
+    """Returns the slice of sorted x values within [low, high], with one
+    more point on each side so lines still reach the edges of the plot
+
+    Args:
+        x (np.ndarray): sorted x values
+        low (float): smallest x shown
+        high (float): largest x shown
+
+    Returns:
+        slice: points of x to draw
+
+    """
+    start = max(int(np.searchsorted(x, low, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, high, side='right')) + 1, len(x))
+    return slice(start, stop)
+
+def min_max(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Returns the indices of the minimum and maximum of each of buckets
+    equal runs of y, in order, along with the first and last point
+
+    Args:
+        y (np.ndarray): values of the series
+        buckets (int): number of runs, usually the pixel width of the plot
+
+    Returns:
+        np.ndarray: sorted indices of the points to draw, all of them
+            if y has no more than 2 points per bucket
+
+    """
+    count = len(y)
+    buckets = max(int(buckets), 1)
+    if count <= POINTS_PER_PIXEL * buckets + 2:
+        return np.arange(count)
+    size = -(-count // buckets)
+    full = count // size
+    runs = y[:full * size].reshape(full, size)
+    starts = np.arange(full) * size
+    lowest = starts + runs.argmin(axis=1)
+    highest = starts + runs.argmax(axis=1)
+    parts = [np.zeros(1, dtype=np.int64)]
+    parts.append(np.stack((np.minimum(lowest, highest), np.maximum(lowest, highest)), axis=1).ravel())
+    if full * size < count:
+        # the last, shorter run
+        rest = y[full * size:]
+        pair = sorted((full * size + int(rest.argmin()), full * size + int(rest.argmax())))
+        parts.append(np.array(pair, dtype=np.int64))
+    parts.append(np.array([count - 1], dtype=np.int64))
+    return np.concatenate(parts)
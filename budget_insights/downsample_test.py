@@ -0,0 +1,17 @@
+import numpy as np
+
+import downsample
+
+def test_min_max_keeps_extremes_in_order():
+    y = np.cumsum(np.random.default_rng(1).normal(size=100001))
+    indices = downsample.min_max(y, 500)
+    assert len(indices) <= 2 * 500 + 4
+    assert (np.diff(indices) >= 0).all()
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert y[indices].min() == y.min() and y[indices].max() == y.max()
+    assert list(downsample.min_max(y[:10], 500)) == list(range(10))
+
+def test_visible():
+    x = np.arange(10.0)
+    assert downsample.visible(x, 2.5, 5.5) == slice(2, 7)
+    assert downsample.visible(x, -np.inf, np.inf) == slice(0, 10)
@@ -0,0 +1,46 @@
+"""Errors of the database helpers. Helpers return False when a call fails,
+the error which caused it is logged with the operation and the values it
+was called with, and kept as helper.last_error for the calling thread.
+"""
+import logging
+from typing import Optional
+
+class DatabaseError(Exception):
+    """A helper call which failed, wrapping the exception which caused it"""
+    # level the error is logged at
+    level = logging.ERROR
+
+    def __init__(self, operation: str = '', cause: Optional[BaseException] = None, **context) -> None:
+        """
+        Args:
+            operation (str): "<helper>.<method>" which failed, filled in by
+                the helper when raised without one
+            cause (BaseException): exception which made the call fail
+            context: values the call was made with, such as the budget name
+
+        """
+        super().__init__(operation, cause)
+        self.operation = operation
+        self.cause = cause
+        self.context = context
+        # set once the error has been logged, so nested helpers log it once
+        self.logged = False
+
+    def __str__(self) -> str:
+        message = f'{self.operation or "database call"} failed'
+        if self.cause is not None:
+            message += f': {type(self.cause).__name__}: {self.cause}'
+        elif type(self) is not DatabaseError:
+            message += f': {type(self).__name__}'
+        if self.context:
+            message += ' (' + ', '.join(f'{key}={value!r}' for key, value in self.context.items()) + ')'
+        return message
+
+class NotFoundError(DatabaseError):
+    """The budget or projection named does not exist"""
+    # callers expect and handle missing names, bulk imports can hit many
+    level = logging.DEBUG
+
+class ConflictError(DatabaseError):
+    """The name of a new budget or projection is already taken"""
+    level = logging.DEBUG
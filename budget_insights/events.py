@@ -0,0 +1,370 @@
+"""Events change a budget from a date on: a new job, a one time expense,
+a recurring expense starting or stopping, or a new interest rate. A
+projection applies its events on top of the forecast of its budget.
+
+Events are sorted into a timeline which splits every expense and account
+into segments. Each segment is evaluated over every period at once, so
+the cost grows with the number of events, never with the number of days.
+"""
+import abc
+import datetime
+from typing import Optional, Union
+
+import numpy as np
+
+import forecast
+
+class Event(abc.ABC):
+    """Change to a budget from a date on. Subclasses set kind, the value
+    stored in the Kind column of the events table, and add their own
+    attributes to __slots__ so events carry no __dict__."""
+    __slots__ = ('name', 'date', 'amount')
+    kind = None
+
+    def __init__(self, name: str, date: Union[str, datetime.date], amount: float) -> None:
+        """
+        Args:
+            name (str): name of event
+            date (str | date): date the event happens
+            amount (float): amount of the event
+
+        """
+        self.name = name
+        self.date = np.datetime64(date, 'D')
+        self.amount = float(amount)
+
+    @classmethod
+    def from_dict(cls, event: dict) -> 'Event':
+        """Builds an event from a dict as stored by ProjectionsDatabase
+
+        Args:
+            event (dict): event with 'kind', 'name', 'date', 'amount' and details
+
+        Returns:
+            Event: event of the class registered for its kind
+
+        """
+        kind = event.get('kind')
+        if kind not in EVENT_KINDS:
+            raise ValueError(f'Unknown event kind {kind}')
+        fields = {key: value for key, value in event.items() if key != 'kind'}
+        # 'type' is stored like the Type column of expenses
+        if 'type' in fields:
+            fields['expense_income'] = fields.pop('type')
+        return EVENT_KINDS[kind](**fields)
+
+    def to_dict(self) -> dict:
+        """Returns the event as a dict for ProjectionsDatabase.insert_event"""
+        return {'name': self.name, 'kind': self.kind,
+                'date': str(self.date), 'amount': self.amount}
+
+    @abc.abstractmethod
+    def apply(self, timeline: 'Timeline') -> None:
+        """Changes the streams or rates of timeline from the date of the event"""
+
+class OneOffExpense(Event):
+    """Expense or income which happens once"""
+    __slots__ = ('expense_income',)
+    kind = 'one_off'
+
+    def __init__(
+        self, name: str, date: Union[str, datetime.date], amount: float,
+        expense_income: str = 'Expense'
+        ) -> None:
+        """
+        Args:
+            name (str): name of event
+            date (str | date): date of the expense
+            amount (float): amount of the expense
+            expense_income (str): 'Expense' or 'Income'
+
+        """
+        super().__init__(name, date, amount)
+        self.expense_income = expense_income
+
+    def to_dict(self) -> dict:
+        return dict(super().to_dict(), type=self.expense_income)
+
+    def apply(self, timeline: 'Timeline') -> None:
+        timeline.start_stream(self.name, self.signed_amount(), forecast.ONCE, self.date)
+
+    def signed_amount(self) -> float:
+        """Returns the amount, negative for expenses and positive for income"""
+        return forecast.signed_amount({'amount': self.amount, 'type': self.expense_income})
+
+class RecurringChange(OneOffExpense):
+    """Expense or income which recurs from its date on, optionally
+    replacing an existing expense or income and stopping at end"""
+    __slots__ = ('frequency', 'replaces', 'end')
+    kind = 'recurring'
+
+    def __init__(
+        self, name: str, date: Union[str, datetime.date], amount: float,
+        expense_income: str = 'Expense', frequency: str = 'Monthly',
+        replaces: Optional[str] = None, end: Optional[Union[str, datetime.date]] = None
+        ) -> None:
+        """
+        Args:
+            name (str): name of event
+            date (str | date): date of the first period
+            amount (float): amount per occurrence
+            expense_income (str): 'Expense' or 'Income'
+            frequency (str): frequency, see forecast.FREQUENCIES
+            replaces (str): name of expense or event which stops on date
+            end (str | date): date the expense stops, never if None
+
+        """
+        super().__init__(name, date, amount, expense_income)
+        if frequency not in forecast.FREQUENCIES:
+            raise ValueError(f'Unknown frequency {frequency}')
+        self.frequency = frequency
+        self.replaces = replaces
+        self.end = None if end is None else np.datetime64(end, 'D')
+
+    def to_dict(self) -> dict:
+        event = dict(super().to_dict(), frequency=self.frequency)
+        if self.replaces is not None:
+            event['replaces'] = self.replaces
+        if self.end is not None:
+            event['end'] = str(self.end)
+        return event
+
+    def apply(self, timeline: 'Timeline') -> None:
+        if self.replaces is not None:
+            timeline.stop_stream(self.replaces, self.date)
+        timeline.start_stream(self.name, self.signed_amount(), self.frequency,
+                              self.date, self.end)
+
+class JobChange(RecurringChange):
+    """New income from a job, replacing the income of the previous job"""
+    __slots__ = ()
+    kind = 'job'
+
+    def __init__(
+        self, name: str, date: Union[str, datetime.date], amount: float,
+        frequency: str = 'Bi Weekly', replaces: Optional[str] = None,
+        end: Optional[Union[str, datetime.date]] = None, expense_income: str = 'Income'
+        ) -> None:
+        """
+        Args:
+            name (str): name of event
+            date (str | date): first day of the job
+            amount (float): pay per paycheck
+            frequency (str): frequency of paychecks, see forecast.FREQUENCIES
+            replaces (str): name of the income of the previous job
+            end (str | date): last day of the job, never if None
+            expense_income (str): always 'Income', kept for from_dict
+
+        """
+        super().__init__(name, date, amount, 'Income', frequency, replaces, end)
+
+class RateChange(Event):
+    """New interest rate of an account"""
+    __slots__ = ('account',)
+    kind = 'rate'
+
+    def __init__(
+        self, name: str, date: Union[str, datetime.date], amount: float, account: str
+        ) -> None:
+        """
+        Args:
+            name (str): name of event
+            date (str | date): date the rate changes
+            amount (float): new annual interest, in percent like accounts
+            account (str): name of account
+
+        """
+        super().__init__(name, date, amount)
+        self.account = account
+
+    def to_dict(self) -> dict:
+        return dict(super().to_dict(), account=self.account)
+
+    def apply(self, timeline: 'Timeline') -> None:
+        timeline.change_rate(self.account, self.date, self.amount)
+
+EVENT_KINDS = {event.kind: event for event in (OneOffExpense, RecurringChange, JobChange, RateChange)}
+
+class Timeline():
+    """Expense streams and account rates of a budget with events applied"""
+    def __init__(self, accounts: list, expenses: list, origin: np.datetime64) -> None:
+        """
+        Args:
+            accounts (list): account dicts as stored by BudgetDatabase
+            expenses (list): expense dicts which affect the forecast
+            origin (np.datetime64): date elapsed days & months are counted from
+
+        """
+        self.origin = origin
+        # name, signed amount, frequency, begin & end (None if never) of every stream
+        self.streams = []
+        self.active = {}
+        for expense in expenses:
+            frequency = str(expense['frequency'])
+            begin = expense['date'] if frequency == forecast.ONCE else origin
+            self.start_stream(expense['name'], forecast.signed_amount(expense),
+                              frequency, np.datetime64(begin, 'D'))
+        # (date, annual interest) of every account, in date order
+        self.rates = {account['name']: [(origin, float(account['interest']))]
+                      for account in accounts}
+
+    def start_stream(
+        self, name: str, amount: float, frequency: str,
+        begin: np.datetime64, end: Optional[np.datetime64] = None
+        ) -> None:
+        """Adds an expense or income stream"""
+        stream = [name, amount, frequency, begin, end]
+        self.streams.append(stream)
+        self.active[name] = stream
+
+    def stop_stream(self, name: str, date: np.datetime64) -> None:
+        """Stops a stream on date, unless it already stopped before"""
+        if name not in self.active:
+            raise ValueError(f'Nothing named {name} to replace')
+        stream = self.active[name]
+        if stream[4] is None or stream[4] > date:
+            stream[4] = date
+
+    def change_rate(self, account: str, date: np.datetime64, rate: float) -> None:
+        """Changes the interest of an account from date on"""
+        if account not in self.rates:
+            raise ValueError(f'Unknown account {account}')
+        self.rates[account].append((date, rate))
+
+    def elapsed(self, dates: list) -> tuple:
+        """Returns the elapsed days and calendar months of dates from origin"""
+        dates = np.array(dates, dtype='datetime64[D]')
+        days = (dates - self.origin).astype(np.int64)
+        months = (dates.astype('datetime64[M]')
+                  - self.origin.astype('datetime64[M]')).astype(np.int64)
+        return days, months
+
+def stream_totals(timeline: Timeline, days: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Accumulates the cash flow of every stream over the time axis. Every
+    stream is one segment, evaluated for all streams and periods at once.
+
+    Args:
+        timeline (Timeline): streams with events applied
+        days (np.ndarray): elapsed days for every period
+        months (np.ndarray): elapsed calendar months for every period
+
+    Returns:
+        np.ndarray: streams x periods cumulative cash flow
+
+    """
+    streams = timeline.streams
+    counts = np.zeros((len(streams), len(days)), dtype=np.int64)
+    if not streams:
+        return counts.astype(np.float64)
+    amount = np.array([stream[1] for stream in streams], dtype=np.float64)
+    frequencies = [stream[2] for stream in streams]
+    # streams which never stop end after the last period
+    never = timeline.origin + np.timedelta64(int(days[-1]) + 1, 'D')
+    begin_days, begin_months = timeline.elapsed([stream[3] for stream in streams])
+    end_days, end_months = timeline.elapsed(
+        [never if stream[4] is None else stream[4] for stream in streams])
+    once = np.array([frequency == forecast.ONCE for frequency in frequencies])
+    if once.any():
+        # counted if it happens from the start of the forecast and before it stops
+        happens = (begin_days[once] >= 0) & (begin_days[once] < end_days[once])
+        counts[once] = (days[None, :] >= begin_days[once][:, None]) & happens[:, None]
+    recurring = ~once
+    if recurring.any():
+        frequencies = [frequency for frequency in frequencies if frequency != forecast.ONCE]
+        begin = (begin_days[recurring][:, None], begin_months[recurring][:, None])
+        length = ((end_days - begin_days)[recurring][:, None],
+                  (end_months - begin_months)[recurring][:, None])
+        # occurrences before the start of the forecast already happened
+        counts[recurring] = (
+            segment_counts(frequencies, (days, months), begin, length)
+            - segment_counts(frequencies, (np.zeros(1, np.int64),) * 2, begin, length))
+    return amount[:, None] * counts
+
+def segment_counts(frequencies: list, elapsed: tuple, begin: tuple, length: tuple) -> np.ndarray:
+    """Counts occurrences of segments which begin and stop at their own dates
+
+    Args:
+        frequencies (list): frequency of every segment, see forecast.FREQUENCIES
+        elapsed (tuple): elapsed days & months of every period
+        begin (tuple): elapsed days & months when every segment begins, as columns
+        length (tuple): days & months every segment lasts, as columns
+
+    Returns:
+        np.ndarray: segments x periods occurrences since each segment began
+
+    """
+    return forecast.occurrences(
+        frequencies,
+        np.clip(elapsed[0][None, :] - begin[0], 0, length[0]),
+        np.clip(elapsed[1][None, :] - begin[1], 0, length[1]))
+
+def rate_balances(
+    timeline: Timeline, accounts: list, days: np.ndarray, months: np.ndarray
+    ) -> np.ndarray:
+    """Compounds every account with its rate changing at each of its events.
+    Every rate is one segment of compounding periods, evaluated over all
+    periods at once.
+
+    Args:
+        timeline (Timeline): rates with events applied
+        accounts (list): account dicts as stored by BudgetDatabase
+        days (np.ndarray): elapsed days for every period
+        months (np.ndarray): elapsed calendar months for every period
+
+    Returns:
+        np.ndarray: accounts x periods balances
+
+    """
+    balances = np.zeros((len(accounts), len(days)), dtype=np.float64)
+    for row, account in enumerate(accounts):
+        compound = str(account['compound'])
+        counts = forecast.occurrences([compound], days, months)[0]
+        per_year = forecast.FREQUENCIES[compound][2]
+        changes = sorted(timeline.rates[account['name']], key=lambda change: change[0])
+        change_days, change_months = timeline.elapsed([date for date, _ in changes])
+        # compounding periods which had happened when each rate started
+        starts = np.maximum(
+            forecast.occurrences([compound] * len(changes), change_days[:, None],
+                                 change_months[:, None])[:, 0], 0)
+        ends = np.append(starts[1:], np.iinfo(np.int64).max)
+        growth = np.ones(len(days), dtype=np.float64)
+        for (_, rate), start, end in zip(changes, starts, ends):
+            growth *= (1 + rate / 100 / per_year) ** np.clip(counts - start, 0, end - start)
+        balances[row] = float(account['balance']) * growth
+    return balances
+
+def project(
+    accounts: list, expenses: Optional[list], events: list, years: int = 30,
+    resolution: str = 'monthly', start: Optional[datetime.date] = None
+    ) -> forecast.Forecast:
+    """Forecasts a budget with events applied in date order
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        events (list): Event objects or event dicts as stored by ProjectionsDatabase
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+
+    Returns:
+        Forecast: balances of every account, expense and event for every period
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    dates, days, months = forecast.time_axis(
+        forecast.count_periods(years, resolution), resolution, start)
+    timeline = Timeline(accounts, forecast.upcoming(expenses or [], start), dates[0])
+    events = [event if isinstance(event, Event) else Event.from_dict(event)
+              for event in events]
+    # sorted is stable, events on the same date apply in the order given
+    for event in sorted(events, key=lambda event: event.date):
+        event.apply(timeline)
+    return forecast.Forecast(
+        dates=dates,
+        account_names=[account['name'] for account in accounts],
+        account_balances=rate_balances(timeline, accounts, days, months),
+        expense_names=[stream[0] for stream in timeline.streams],
+        expense_totals=stream_totals(timeline, days, months)
+        )
@@ -0,0 +1,51 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import events
+import forecast
+import services
+
+START = datetime.date(2022, 1, 15)
+ACCOUNTS = [{'name': 'Savings', 'balance': '1000', 'interest': '12', 'compound': 'Monthly'}]
+EXPENSES = [
+    {'name': 'Job', 'amount': 2000, 'type': 'Income', 'frequency': 'Monthly'},
+    {'name': 'Rent', 'amount': 500, 'type': 'Expense', 'frequency': 'Weekly'},
+    ]
+
+def test_no_events_matches_forecast():
+    for resolution in ('monthly', 'daily'):
+        expected = forecast.forecast(ACCOUNTS, EXPENSES, 5, resolution, START)
+        result = events.project(ACCOUNTS, EXPENSES, [], 5, resolution, START)
+        assert np.allclose(result.total, expected.total)
+
+def test_events_split_streams_and_rates():
+    timeline = [
+        events.JobChange('New job', '2022-07-01', 3000, frequency='Monthly', replaces='Job'),
+        events.RateChange('Rate cut', '2022-04-01', 0, account='Savings'),
+        events.OneOffExpense('Car', '2022-03-10', 5000),
+        {'kind': 'recurring', 'name': 'Loan', 'date': '2022-03-01', 'amount': 100,
+         'frequency': 'Monthly', 'end': '2022-09-01'},
+        ]
+    assert not hasattr(timeline[0], '__dict__')
+    with pytest.raises(TypeError):
+        events.Event('Nothing', '2022-01-01', 0)
+    result = events.project(ACCOUNTS, EXPENSES, timeline, 1, 'monthly', START)
+    totals = dict(zip(result.expense_names, result.expense_totals[:, -1]))
+    assert totals['Job'] == 2000 * 6
+    assert totals['New job'] == 3000 * 6
+    assert totals['Car'] == -5000
+    assert totals['Loan'] == -100 * 6
+    # interest stops after three months of compounding
+    assert np.isclose(result.account_balances[0][-1], 1000 * 1.01 ** 3)
+
+def test_projection_service(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    services.BudgetService(path=path).create('home', ACCOUNTS, EXPENSES)
+    projection_service = services.ProjectionService(path=path)
+    job = events.JobChange('New job', '2022-07-01', 3000, replaces='Job')
+    assert projection_service.create('future', 'home', [job]) is True
+    assert events.Event.from_dict(projection_service.events('future')[0]).to_dict() == job.to_dict()
+    result = projection_service.forecast('future', 1, start=START)
+    assert result.expense_names == ['Job', 'Rent', 'New job']
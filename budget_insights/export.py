@@ -0,0 +1,144 @@
+"""Export writes budgets and their forecasts to .csv files.
+Rows are generated one at a time and streamed to csv.writer,
+so a forecast of any length exports in constant memory.
+"""
+import csv
+import datetime
+import itertools
+from typing import Iterator, Optional
+
+import numpy as np
+
+import forecast
+
+ACCOUNT_HEADER = ('Account', 'Balance', 'Interest', 'Type', 'Compound')
+EXPENSE_HEADER = ('Expense/Income', 'Description', 'Amount', 'Type', 'Frequency')
+
+def account_rows(accounts: list) -> Iterator[tuple]:
+    """Yields the header and one row per account
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+
+    Yields:
+        tuple: csv row
+
+    """
+    yield ACCOUNT_HEADER
+    for account in accounts:
+        yield (account['name'], account['balance'], account['interest'],
+               account.get('type'), account.get('compound'))
+
+def expense_rows(expenses: list) -> Iterator[tuple]:
+    """Yields the header and one row per expense or income
+
+    Args:
+        expenses (list): expense dicts as stored by BudgetDatabase
+
+    Yields:
+        tuple: csv row
+
+    """
+    yield EXPENSE_HEADER
+    for expense in expenses:
+        yield (expense['name'], expense.get('description'), expense['amount'],
+               expense.get('type'), expense.get('frequency'))
+
+def forecast_rows(
+    accounts: list, expenses: list, years: int = 30, resolution: str = 'monthly',
+    start: Optional[datetime.date] = None, chunk_size: int = 10000
+    ) -> Iterator[tuple]:
+    """Yields the header and one row per period of the forecast, with the
+    total followed by the balance of every account and expense. The
+    forecast is computed chunk_size periods at a time.
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+        chunk_size (int): number of periods computed at a time
+
+    Yields:
+        tuple: csv row
+
+    """
+    yield ('Date', 'Total',
+           *[account['name'] for account in accounts],
+           *[expense['name'] for expense in forecast.upcoming(expenses, start)])
+    for chunk in forecast.iter_forecast(accounts, expenses, years, resolution,
+                                        start, chunk_size):
+        columns = np.vstack((chunk.total, chunk.account_balances, chunk.expense_totals))
+        for date, values in zip(chunk.dates.astype(str), columns.T.round(2).tolist()):
+            yield (date, *values)
+
+def budget_rows(
+    accounts: list, expenses: list, years: int = 30, resolution: str = 'monthly',
+    start: Optional[datetime.date] = None
+    ) -> Iterator[tuple]:
+    """Yields the accounts, expenses and forecast sections of a budget,
+    separated by an empty row
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+
+    Returns:
+        Iterator: csv rows
+
+    """
+    return itertools.chain(
+        account_rows(accounts), [()],
+        expense_rows(expenses), [()],
+        forecast_rows(accounts, expenses, years, resolution, start)
+        )
+
+def write_csv(path: str, rows: Iterator[tuple]) -> int:
+    """Streams rows into a .csv file
+
+    Args:
+        path (str): path of the .csv file
+        rows (Iterator): rows to write
+
+    Returns:
+        int: number of rows written
+
+    """
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def export_budget(
+    budget_database, name: str, path: str, years: int = 30,
+    resolution: str = 'monthly', start: Optional[datetime.date] = None
+    ) -> int:
+    """Exports the accounts, expenses and forecast of a budget to a .csv file
+
+    Args:
+        budget_database (BudgetDatabase): helper for budget database
+        name (str): name of budget
+        path (str): path of the .csv file
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+
+    Returns:
+        int: number of rows written
+
+    """
+    # a budget which does not exist has no accounts or expenses either
+    if budget_database.get_id_by_name(name) is False:
+        raise ValueError(f'Budget {name} does not exist') from budget_database.last_error
+    accounts = budget_database.get_accounts_by_name(name)
+    expenses = budget_database.get_expenses_by_name(name)
+    if accounts is False or expenses is False:
+        raise ValueError(f'Could not read budget {name}') from budget_database.last_error
+    return write_csv(path, budget_rows(accounts, expenses, years, resolution, start))
@@ -0,0 +1,30 @@
+import csv
+import datetime
+
+import budget_dbhelper
+import export
+
+ACCOUNT = {'name': 'Savings', 'balance': 1000.0, 'interest': 0.0,
+           'type': 'Savings', 'compound': 'Monthly'}
+EXPENSE = {'name': 'Rent', 'description': 'apartment', 'amount': 100.0,
+           'type': 'Expense', 'frequency': 'Monthly'}
+
+def test_forecast_rows_in_chunks():
+    rows = export.forecast_rows([ACCOUNT], [EXPENSE], years=1,
+                                start=datetime.date(2022, 1, 1), chunk_size=5)
+    assert next(rows) == ('Date', 'Total', 'Savings', 'Rent')
+    rows = list(rows)
+    assert len(rows) == 13
+    assert rows[0] == ('2022-01-01', 1000.0, 1000.0, 0.0)
+    assert rows[-1] == ('2023-01-01', -200.0, 1000.0, -1200.0)
+
+def test_export_budget(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    database.create_budget('home', [ACCOUNT])
+    database.update_expenses('home', [EXPENSE])
+    path = str(tmp_path / 'home.csv')
+    count = export.export_budget(database, 'home', path, years=1)
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    assert len(rows) == count == 2 + 1 + 2 + 1 + 14
+    assert rows[0] == list(export.ACCOUNT_HEADER)
@@ -0,0 +1,454 @@
+"""Forecast projects accounts and expenses of a budget forward in time.
+Every series is computed as a whole NumPy array, so multi-decade
+horizons never loop over individual periods in Python.
+"""
+import copy
+import datetime
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+# (unit the frequency is counted in, units between occurrences, occurrences per year)
+# 'D' frequencies are counted in elapsed days, 'M' frequencies in calendar months
+FREQUENCIES = {
+    'Daily': ('D', 1, 365),
+    'Weekly': ('D', 7, 52),
+    'Bi Weekly': ('D', 14, 26),
+    'Monthly': ('M', 1, 12),
+    'Quarterly': ('M', 3, 4),
+    'Semi Annually': ('M', 6, 2),
+    'Annually': ('M', 12, 1),
+}
+# frequency of an expense which only occurs on its 'date'
+ONCE = 'Once'
+# number of periods in a year for each supported resolution
+RESOLUTIONS = {
+    'daily': 365,
+    'monthly': 12,
+}
+
+class Forecast:
+    """Result of a forecast. Every series shares the ``dates`` axis."""
+    def __init__(
+        self, dates: np.ndarray,
+        account_names: list, account_balances: np.ndarray,
+        expense_names: list, expense_totals: np.ndarray
+        ) -> None:
+        """
+        Args:
+            dates (np.ndarray): datetime64[D] date of every period
+            account_names (list): name of every account, in row order
+            account_balances (np.ndarray): accounts x periods balances
+            expense_names (list): name of every expense, in row order
+            expense_totals (np.ndarray): expenses x periods cumulative cash flow
+
+        """
+        self.dates = dates
+        self.account_names = account_names
+        self.account_balances = account_balances
+        self.expense_names = expense_names
+        self.expense_totals = expense_totals
+
+    @property
+    def total(self) -> np.ndarray:
+        """np.ndarray: net worth of the budget for every period"""
+        return self.account_balances.sum(axis=0) + self.expense_totals.sum(axis=0)
+
+def time_axis(
+    periods: int, resolution: str = 'monthly',
+    start: Optional[Union[datetime.date, np.datetime64]] = None, first: int = 0
+    ) -> tuple:
+    """Builds the dates of a forecast along with elapsed days and months
+
+    Args:
+        periods (int): number of periods
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+        first (int): index of the first period, used to build a forecast in chunks
+
+    Returns:
+        tuple: (dates, elapsed days, elapsed calendar months) as arrays
+
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f'Unknown resolution {resolution}')
+    if start is None:
+        start = datetime.date.today()
+    start = np.datetime64(start, 'D')
+    index = np.arange(first, first + periods)
+    if resolution == 'daily':
+        dates = start + index
+    else:
+        # monthly forecasts are sampled on the first of each month
+        start = start.astype('datetime64[M]').astype('datetime64[D]')
+        dates = (start.astype('datetime64[M]') + index).astype('datetime64[D]')
+    days = (dates - start).astype(np.int64)
+    months = (dates.astype('datetime64[M]') - start.astype('datetime64[M]')).astype(np.int64)
+    return dates, days, months
+
+def occurrences(frequencies: list, days: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Counts how many times each frequency has occurred by every period
+
+    Args:
+        frequencies (list): frequency names, see FREQUENCIES
+        days (np.ndarray): elapsed days for every period, or
+            len(frequencies) x periods when every frequency has its own
+        months (np.ndarray): elapsed calendar months, shaped like days
+
+    Returns:
+        np.ndarray: len(frequencies) x periods array of counts
+
+    """
+    try:
+        table = [FREQUENCIES[frequency] for frequency in frequencies]
+    except KeyError as exception:
+        raise ValueError(f'Unknown frequency {exception.args[0]}') from exception
+    if not table:
+        return np.zeros((0, np.shape(days)[-1]), dtype=np.int64)
+    by_day = np.array([unit == 'D' for unit, _, _ in table])[:, None]
+    interval = np.array([interval for _, interval, _ in table], dtype=np.int64)[:, None]
+    return np.where(by_day, np.atleast_2d(days) // interval, np.atleast_2d(months) // interval)
+
+def account_balances(accounts: list, days: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Compounds every account balance over the time axis
+
+    Args:
+        accounts (list): account dicts with 'balance', 'interest' and 'compound'
+        days (np.ndarray): elapsed days for every period
+        months (np.ndarray): elapsed calendar months for every period
+
+    Returns:
+        np.ndarray: accounts x periods balances
+
+    """
+    compound = [str(account['compound']) for account in accounts]
+    counts = occurrences(compound, days, months)
+    balance = np.array([float(account['balance']) for account in accounts], dtype=np.float64)
+    # interest is entered as an annual percentage
+    rate = np.array([float(account['interest']) for account in accounts], dtype=np.float64) / 100
+    per_year = np.array([FREQUENCIES[name][2] for name in compound], dtype=np.float64)
+    return balance[:, None] * (1 + rate / per_year)[:, None] ** counts
+
+def expense_totals(
+    expenses: list, days: np.ndarray, months: np.ndarray,
+    dates: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+    """Accumulates the cash flow of every expense or income over the time axis
+
+    Args:
+        expenses (list): expense dicts with 'amount', 'type' and 'frequency'
+        days (np.ndarray): elapsed days for every period
+        months (np.ndarray): elapsed calendar months for every period
+        dates (np.ndarray): date of every period, needed by 'Once' expenses
+
+    Returns:
+        np.ndarray: expenses x periods cumulative cash flow, expenses negative
+
+    """
+    amount = np.array([signed_amount(expense) for expense in expenses], dtype=np.float64)
+    frequencies = [str(expense['frequency']) for expense in expenses]
+    once = np.array([frequency == ONCE for frequency in frequencies], dtype=bool)
+    counts = np.zeros((len(expenses), len(days)), dtype=np.int64)
+    counts[~once] = occurrences(
+        [frequency for frequency in frequencies if frequency != ONCE], days, months)
+    if once.any():
+        # elapsed days are counted from this date
+        origin = dates[0] - np.timedelta64(int(days[0]), 'D')
+        when = np.array([expense['date'] for expense, is_once in zip(expenses, once) if is_once],
+                        dtype='datetime64[D]')
+        offset = (when - origin).astype(np.int64)
+        # expenses from before the forecast already happened
+        counts[once] = (days[None, :] >= offset[:, None]) & (offset >= 0)[:, None]
+    return amount[:, None] * counts
+
+def upcoming(expenses: list, start: Optional[datetime.date] = None) -> list:
+    """Leaves out 'Once' expenses dated before start, which can not affect
+    a forecast, so imported transaction history costs nothing to forecast
+
+    Args:
+        expenses (list): expense dicts as stored by BudgetDatabase
+        start (date): first date of the forecast, defaults to today
+
+    Returns:
+        list: expenses which affect a forecast from start
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    start = str(np.datetime64(start, 'D').astype('datetime64[M]').astype('datetime64[D]'))
+    return [expense for expense in expenses
+            if expense['frequency'] != ONCE or str(expense['date']) >= start]
+
+def signed_amount(expense: dict) -> float:
+    """Returns the amount of an expense, negative for expenses and positive for income
+
+    Args:
+        expense (dict): expense dict with 'amount' and 'type'
+
+    Returns:
+        float: signed amount
+
+    """
+    amount = abs(float(expense['amount']))
+    if str(expense.get('type', 'Expense')).lower() == 'income':
+        return amount
+    return -amount
+
+def forecast(
+    accounts: list, expenses: Optional[list] = None, years: int = 30,
+    resolution: str = 'monthly', start: Optional[datetime.date] = None
+    ) -> Forecast:
+    """Forecasts a budget forward. Accounts grow by their compound interest,
+    expenses and income accumulate as cash outside of the accounts.
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+
+    Returns:
+        Forecast: balances of every account and expense for every period
+
+    """
+    return evaluate(accounts, expenses, count_periods(years, resolution), resolution, start)
+
+def iter_forecast(
+    accounts: list, expenses: Optional[list] = None, years: int = 30,
+    resolution: str = 'monthly', start: Optional[datetime.date] = None,
+    chunk_size: int = 10000
+    ) -> Iterator[Forecast]:
+    """Same as forecast(), but yields it in chunks of at most chunk_size
+    periods so arbitrarily long forecasts use bounded memory
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+        chunk_size (int): maximum number of periods per chunk
+
+    Yields:
+        Forecast: consecutive chunks of the forecast
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    periods = count_periods(years, resolution)
+    for first in range(0, periods, chunk_size):
+        yield evaluate(accounts, expenses, min(chunk_size, periods - first),
+                       resolution, start, first)
+
+def count_periods(years: int, resolution: str) -> int:
+    """Returns the number of periods of a forecast, including the starting period
+
+    Args:
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+
+    Returns:
+        int: number of periods
+
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f'Unknown resolution {resolution}')
+    return int(years * RESOLUTIONS[resolution]) + 1
+
+def evaluate(
+    accounts: list, expenses: Optional[list], periods: int, resolution: str,
+    start: Optional[datetime.date], first: int = 0
+    ) -> Forecast:
+    """Evaluates periods [first, first + periods) of a forecast
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        periods (int): number of periods
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+        first (int): index of the first period
+
+    Returns:
+        Forecast: balances of every account and expense for the periods
+
+    """
+    if expenses is None:
+        expenses = []
+    dates, days, months = time_axis(periods, resolution, start, first)
+    expenses = upcoming(expenses, start)
+    return Forecast(
+        dates=dates,
+        account_names=[account['name'] for account in accounts],
+        account_balances=account_balances(accounts, days, months),
+        expense_names=[expense['name'] for expense in expenses],
+        expense_totals=expense_totals(expenses, days, months, dates)
+        )
+
+class ForecastModel():
+    """Forecast of a budget which keeps the series of every account and
+    expense, so changing a few line items only recomputes their series
+    before the totals are summed again"""
+    def __init__(
+        self, accounts: list, expenses: Optional[list] = None, years: int = 30,
+        resolution: str = 'monthly', start: Optional[datetime.date] = None
+        ) -> None:
+        """
+        Args:
+            accounts (list): account dicts or records as stored by BudgetDatabase
+            expenses (list): expense dicts or records as stored by BudgetDatabase
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly'
+            start (date): first date of the forecast, defaults to today
+
+        """
+        if start is None:
+            start = datetime.date.today()
+        self.start = start
+        self.dates, self.days, self.months = time_axis(
+            count_periods(years, resolution), resolution, start)
+        self.accounts = {}
+        self.expenses = {}
+        # rows of each line item in the series, in the order items were added
+        self.account_rows = {}
+        self.expense_rows = {}
+        self.account_series = np.zeros((0, len(self.dates)), dtype=np.float64)
+        self.expense_series = np.zeros((0, len(self.dates)), dtype=np.float64)
+        self.update_accounts(accounts)
+        self.update_expenses(expenses or [])
+
+    @classmethod
+    def from_forecast(
+        cls, result: Forecast, accounts: list, expenses: Optional[list] = None,
+        years: int = 30, resolution: str = 'monthly', start: Optional[datetime.date] = None
+        ) -> 'ForecastModel':
+        """Builds a model around a forecast already computed from accounts
+        & expenses, such as one read from ForecastCache, without computing it
+
+        Args:
+            result (Forecast): forecast of accounts & expenses with these parameters
+            accounts (list): account dicts the forecast was computed from
+            expenses (list): expense dicts the forecast was computed from
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly'
+            start (date): first date of the forecast, defaults to today
+
+        Returns:
+            ForecastModel: model which updates the series of result
+
+        """
+        model = cls([], [], years, resolution, start)
+        model.accounts = {account['name']: copy.copy(account) for account in accounts}
+        model.expenses = {expense['name']: copy.copy(expense)
+                          for expense in upcoming(expenses or [], model.start)}
+        model.account_rows = {name: row for row, name in enumerate(result.account_names)}
+        model.expense_rows = {name: row for row, name in enumerate(result.expense_names)}
+        model.account_series = np.array(result.account_balances, dtype=np.float64)
+        model.expense_series = np.array(result.expense_totals, dtype=np.float64)
+        return model
+
+    def copy(self) -> 'ForecastModel':
+        """Returns a model which can be updated without changing this one
+        or the forecasts it returned. Line items are replaced rather than
+        changed by updates, so they are shared.
+
+        Returns:
+            ForecastModel: copy of the model with its own series
+
+        """
+        model = copy.copy(self)
+        model.accounts = dict(self.accounts)
+        model.expenses = dict(self.expenses)
+        model.account_rows = dict(self.account_rows)
+        model.expense_rows = dict(self.expense_rows)
+        model.account_series = self.account_series.copy()
+        model.expense_series = self.expense_series.copy()
+        return model
+
+    def update_accounts(self, accounts: list) -> int:
+        """Replaces the accounts, recomputing only accounts which changed
+
+        Args:
+            accounts (list): every account dict of the budget
+
+        Returns:
+            int: number of accounts added, changed or removed
+
+        """
+        self.account_series, changed = self._update(
+            self.accounts, self.account_rows, self.account_series, accounts,
+            lambda items: account_balances(items, self.days, self.months))
+        return changed
+
+    def update_expenses(self, expenses: list) -> int:
+        """Replaces the expenses, recomputing only expenses which changed
+
+        Args:
+            expenses (list): every expense dict of the budget
+
+        Returns:
+            int: number of expenses added, changed or removed
+
+        """
+        self.expense_series, changed = self._update(
+            self.expenses, self.expense_rows, self.expense_series,
+            upcoming(expenses, self.start),
+            lambda items: expense_totals(items, self.days, self.months, self.dates))
+        return changed
+
+    @staticmethod
+    def _update(items: dict, rows: dict, series: np.ndarray, new_items: list, compute) -> tuple:
+        """Computes the series of items which were added or changed in one
+        vectorized call and drops the rows of items which were removed
+
+        Args:
+            items (dict): current line items by name, updated in place
+            rows (dict): row of every line item in series, updated in place
+            series (np.ndarray): line items x periods series
+            new_items (list): every line item dict after the update
+            compute (Callable): returns the series of a list of line items
+
+        Returns:
+            tuple: (updated series, number of line items added, changed or removed)
+
+        """
+        new_items = {item['name']: item for item in new_items}
+        removed = [name for name in items if name not in new_items]
+        changed = [item for name, item in new_items.items() if items.get(name) != item]
+        if removed:
+            series = np.delete(series, [rows[name] for name in removed], axis=0)
+            for name in removed:
+                del items[name]
+            rows.clear()
+            rows.update((name, row) for row, name in enumerate(items))
+        added = [item for item in changed if item['name'] not in rows]
+        if added:
+            series = np.vstack((series, np.zeros((len(added), series.shape[1]))))
+            for item in added:
+                rows[item['name']] = len(rows)
+        if changed:
+            series[[rows[item['name']] for item in changed]] = compute(changed)
+            # copies of dicts or records, see records.py, as they were computed
+            items.update((item['name'], copy.copy(item)) for item in changed)
+        return series, len(removed) + len(changed)
+
+    @property
+    def total(self) -> np.ndarray:
+        """np.ndarray: net worth of the budget for every period"""
+        return self.account_series.sum(axis=0) + self.expense_series.sum(axis=0)
+
+    def result(self) -> Forecast:
+        """Returns the current forecast, sharing the series of the model
+
+        Returns:
+            Forecast: balances of every account and expense for every period
+
+        """
+        return Forecast(
+            dates=self.dates,
+            account_names=list(self.account_rows),
+            account_balances=self.account_series,
+            expense_names=list(self.expense_rows),
+            expense_totals=self.expense_series
+            )
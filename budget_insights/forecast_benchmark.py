@@ -0,0 +1,58 @@
+"""Benchmarks of forecasts and their figures, run with nox -s benchmark"""
+import datetime
+
+import pytest
+
+import benchmark_data
+import forecast
+import predictions
+
+START = datetime.date(2022, 1, 15)
+HORIZONS = (1, 10, 30, 100)
+
+@pytest.mark.parametrize('resolution', ('monthly', 'daily'))
+@pytest.mark.parametrize('years', HORIZONS)
+def test_forecast(benchmark, years, resolution):
+    accounts = benchmark_data.accounts(20)
+    expenses = benchmark_data.expenses(80)
+    result = benchmark(forecast.forecast, accounts, expenses, years, resolution, START)
+    assert len(result.dates) == forecast.count_periods(years, resolution)
+
+@pytest.mark.parametrize('years', HORIZONS)
+def test_update_one_expense(benchmark, years):
+    accounts = benchmark_data.accounts(20)
+    expenses = benchmark_data.expenses(80)
+    model = forecast.ForecastModel(accounts, expenses, years, 'daily', START)
+    changed = [dict(expenses[0], amount=amount) for amount in (1, 2)]
+
+    def update():
+        changed.reverse()
+        return model.update_expenses(changed[:1] + expenses[1:])
+
+    assert benchmark(update) == 1
+
+@pytest.fixture(scope='module')
+def prediction(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('predictions') / 'budget.db')
+    budget_database = benchmark_data.database(path, 1000)
+    return predictions.BudgetPredictions('Budget 0', None, resolution='daily',
+                                         budget_database=budget_database)
+
+def test_build_figure(benchmark, prediction):
+    def build():
+        # a new figure & canvas every round, drawn off screen
+        prediction.chart = None
+        prediction.view_graph()
+        prediction.chart.canvas.draw()
+
+    benchmark(build)
+
+def test_switch_views(benchmark, prediction):
+    prediction.view_graph()
+    prediction.view_bar()
+
+    def switch():
+        prediction.view_graph()
+        prediction.view_bar()
+
+    benchmark(switch)
@@ -0,0 +1,260 @@
+"""Forecast cache stores computed forecasts in the forecast_cache table,
+keyed by a hash of the accounts, expenses and parameters they were
+computed from, so reopening a budget reads its forecast instead of
+computing it again. Triggers delete the forecasts of a budget whenever
+its accounts or expenses are written, and the least recently used
+forecasts are evicted once the cache grows past its size limit.
+"""
+import datetime
+import hashlib
+import json
+import threading
+from typing import Optional
+
+import numpy as np
+
+import connection
+import forecast
+import metrics
+import records
+from utils import create_cache_triggers, ErrorMixin, TransactionMixin
+
+# bump when forecasts are computed differently, older entries then never match
+CACHE_VERSION = 1
+# total size of the cached series kept in the database
+MAX_BYTES = 64 * 1024 * 1024
+
+# cache hits kept before they are written, see get
+FLUSH_HITS = 64
+
+def cache_key(
+    accounts: list, expenses: list, years: int, resolution: str,
+    start: Optional[datetime.date] = None
+    ) -> str:
+    """Returns the key of a forecast, which only changes if the forecast would
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+
+    Returns:
+        str: sha256 hex digest
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    start = np.datetime64(start, 'D')
+    if resolution == 'monthly':
+        # monthly forecasts are the same for every day of a month
+        start = start.astype('datetime64[M]')
+    content = {
+        'version': CACHE_VERSION,
+        'accounts': sorted(accounts, key=lambda account: account['name']),
+        'expenses': sorted(forecast.upcoming(expenses, start.astype('datetime64[D]')),
+                           key=lambda expense: expense['name']),
+        'years': years,
+        'resolution': resolution,
+        'start': str(start),
+        }
+    # records dump like the dicts they replace, so both give the same key
+    dump = json.dumps(content, sort_keys=True,
+                      default=lambda value: value.to_dict() if isinstance(value, records.Record)
+                      else str(value))
+    return hashlib.sha256(dump.encode('utf-8')).hexdigest()
+
+@metrics.instrument
+class ForecastCache(ErrorMixin, TransactionMixin, connection.ConnectionMixin):
+    """Reads and writes forecasts of the forecast_cache table"""
+    def __init__(
+        self, name: str = 'budget.db', manager: Optional[connection.ConnectionManager] = None,
+        max_bytes: int = MAX_BYTES
+        ) -> None:
+        """
+        Args:
+            name (str): path of the database file
+            manager (ConnectionManager): pool to take connections from,
+                defaults to the shared manager of name
+            max_bytes (int): total size of series kept before evicting
+
+        """
+        self.manager = manager if manager is not None else connection.get_manager(name)
+        self.cursors = threading.local()
+        self.failures = threading.local()
+        self.max_bytes = max_bytes
+        self.create_db()
+        # hits left when the pool is closed are written by one cache of the pool
+        with self.manager.lock:
+            self.manager.closing.setdefault('forecast_cache', self.close)
+
+    def create_db(self) -> bool:
+        """Creates the forecast_cache table and the triggers which
+        invalidate it when accounts or expenses are written, see
+        utils.create_cache_triggers
+
+        Returns:
+            bool: pass or fail
+
+        """
+        try:
+            self.cur.execute('''CREATE TABLE IF NOT EXISTS forecast_cache (
+                            Key text primary key,
+                            Budget_id integer NOT NULL
+                                REFERENCES budgets(Budget_id) ON DELETE CASCADE,
+                            Accessed integer NOT NULL,
+                            Size integer NOT NULL,
+                            Accounts text,
+                            Expenses text
+                            );''')
+            # series live in their own rows, so marking a forecast as used
+            # rewrites its small row of forecast_cache instead of the blobs
+            self.cur.execute('''CREATE TABLE IF NOT EXISTS forecast_series (
+                            Key text primary key
+                                REFERENCES forecast_cache(Key) ON DELETE CASCADE,
+                            Dates blob,
+                            Balances blob,
+                            Totals blob
+                            );''')
+            self.cur.execute('''CREATE INDEX IF NOT EXISTS forecast_cache_budget
+                            ON forecast_cache(Budget_id);''')
+            self.cur.execute('''CREATE INDEX IF NOT EXISTS forecast_cache_accessed
+                            ON forecast_cache(Accessed);''')
+            create_cache_triggers(self.cur)
+            self.commit()
+            return True
+        except Exception:
+            self.rollback()
+            return self.fail('create_db')
+
+    def get(self, key: str) -> Optional[forecast.Forecast]:
+        """Returns a cached forecast and marks it as the most recently used,
+        which is written with other hits, see flush
+
+        Args:
+            key (str): key of the forecast, see cache_key
+
+        Returns:
+            Forecast | None: cached forecast, None if it is not cached
+
+        """
+        self.cur.execute('''SELECT Accounts, Expenses, Dates, Balances, Totals
+                        FROM forecast_cache JOIN forecast_series USING (Key)
+                        WHERE Key = ?''', (key,))
+        row = self.cur.fetchone()
+        if row is None:
+            return None
+        # kept with the pool, shared by every cache of the database, and written
+        # FLUSH_HITS at a time, by put or evict, or when the pool is closed
+        with self.manager.lock:
+            hits = self.manager.cache_hits
+            hits.pop(key, None)
+            hits[key] = None
+            full = len(hits) >= FLUSH_HITS
+        if full:
+            self.flush()
+            self.commit()
+        account_names = json.loads(row[0])
+        expense_names = json.loads(row[1])
+        # series are read straight from the bytes of the blobs, without copying
+        dates = np.frombuffer(row[2], dtype='datetime64[D]')
+        return forecast.Forecast(
+            dates=dates,
+            account_names=account_names,
+            account_balances=np.frombuffer(row[3], dtype=np.float64).reshape(
+                len(account_names), len(dates)),
+            expense_names=expense_names,
+            expense_totals=np.frombuffer(row[4], dtype=np.float64).reshape(
+                len(expense_names), len(dates))
+            )
+
+    def put(self, key: str, budget_id: int, result: forecast.Forecast) -> None:
+        """Stores a forecast, then evicts the least recently used forecasts
+        until the cache fits in max_bytes
+
+        Args:
+            key (str): key of the forecast, see cache_key
+            budget_id (int): ID of the budget forecasted
+            result (Forecast): forecast to store
+
+        """
+        series = [np.ascontiguousarray(array, dtype=dtype).tobytes()
+                  for array, dtype in ((result.dates, 'datetime64[D]'),
+                                       (result.account_balances, np.float64),
+                                       (result.expense_totals, np.float64))]
+        self.flush()
+        self.cur.execute('''INSERT OR REPLACE INTO forecast_cache
+                        (Key, Budget_id, Accessed, Size, Accounts, Expenses)
+                        VALUES (?, ?, (SELECT COALESCE(MAX(Accessed), 0) + 1 FROM forecast_cache),
+                        ?, ?, ?)''',
+                         (key, budget_id, sum(len(blob) for blob in series),
+                          json.dumps(result.account_names), json.dumps(result.expense_names)))
+        self.cur.execute('''INSERT OR REPLACE INTO forecast_series (Key, Dates, Balances, Totals)
+                        VALUES (?, ?, ?, ?)''', (key, *series))
+        self.evict()
+        self.commit()
+
+    def flush(self) -> None:
+        """Marks the forecasts read by get since the last flush as the most
+        recently used, in the order they were read, without committing"""
+        with self.manager.lock:
+            hits = self.manager.cache_hits
+            self.manager.cache_hits = {}
+        if hits:
+            self.cur.executemany('''UPDATE forecast_cache SET Accessed =
+                            (SELECT MAX(Accessed) + 1 FROM forecast_cache) WHERE Key = ?''',
+                                 [(key,) for key in hits])
+
+    def close(self) -> bool:
+        """Writes the hits which are still kept, see ConnectionManager.close
+
+        Returns:
+            bool: pass or fail
+
+        """
+        if not self.manager.cache_hits:
+            return True
+        try:
+            self.flush()
+            self.commit()
+            return True
+        except Exception:
+            self.rollback()
+            return self.fail('close')
+
+    def evict(self) -> None:
+        """Deletes the least recently used forecasts past max_bytes"""
+        self.flush()
+        self.cur.execute('''DELETE FROM forecast_cache WHERE Key IN (
+                        SELECT Key FROM (
+                            SELECT Key, SUM(Size) OVER (ORDER BY Accessed DESC) AS Used
+                            FROM forecast_cache)
+                        WHERE Used > ?)''', (self.max_bytes,))
+
+    def forecast(
+        self, budget_id: int, accounts: list, expenses: Optional[list] = None,
+        years: int = 30, resolution: str = 'monthly', start: Optional[datetime.date] = None
+        ) -> forecast.Forecast:
+        """Returns the cached forecast of a budget, computing and caching
+        it if needed. Arguments are the same as forecast.forecast.
+
+        Args:
+            budget_id (int): ID of the budget forecasted
+
+        Returns:
+            Forecast: balances of every account and expense for every period
+
+        """
+        expenses = expenses or []
+        key = cache_key(accounts, expenses, years, resolution, start)
+        result = self.get(key)
+        if result is None:
+            result = forecast.forecast(accounts, expenses, years, resolution, start)
+            self.put(key, budget_id, result)
+        return result
+
+    def clear(self) -> None:
+        """Deletes every cached forecast"""
+        self.cur.execute('DELETE FROM forecast_cache')
+        self.commit()
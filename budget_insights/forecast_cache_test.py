@@ -0,0 +1,113 @@
+import datetime
+
+import numpy as np
+
+import budget_dbhelper
+import connection
+import forecast
+import forecast_cache
+
+START = datetime.date(2022, 1, 15)
+ACCOUNT = {'name': 'Savings', 'balance': 1000.0, 'interest': 12.0,
+           'type': 'Savings', 'compound': 'Monthly'}
+EXPENSE = {'name': 'Rent', 'description': '', 'amount': 500.0,
+           'type': 'Expense', 'frequency': 'Monthly'}
+
+def cached_keys(cache):
+    cache.cur.execute('SELECT Key FROM forecast_cache ORDER BY Accessed')
+    return [row[0] for row in cache.cur.fetchall()]
+
+def test_cache_hits_and_invalidation(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    cache = forecast_cache.ForecastCache(manager=database.manager)
+    database.create_budget('home', [ACCOUNT])
+    database.update_expenses('home', [EXPENSE])
+    budget_id = database.get_id_by_name('home')
+    accounts = database.get_accounts_by_name('home')
+    expenses = database.get_expenses_by_name('home')
+
+    result = cache.forecast(budget_id, accounts, expenses, 5, 'daily', START)
+    key = forecast_cache.cache_key(accounts, expenses, 5, 'daily', START)
+    cached = cache.get(key)
+    assert cached.expense_names == ['Rent']
+    assert np.array_equal(cached.dates, result.dates)
+    assert np.allclose(cached.total, result.total)
+    # monthly forecasts are keyed by month
+    assert (forecast_cache.cache_key(accounts, expenses, 5, 'monthly', START)
+            == forecast_cache.cache_key(accounts, expenses, 5, 'monthly', START.replace(day=1)))
+
+    # writing expenses of the budget drops its forecasts
+    database.update_expense('home', dict(EXPENSE, amount=600.0))
+    assert cache.get(key) is None
+
+def test_least_recently_used_are_evicted(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    database.create_budget('home', [ACCOUNT])
+    budget_id = database.get_id_by_name('home')
+    cache = forecast_cache.ForecastCache(manager=database.manager)
+    for years in (1, 2, 3):
+        cache.put(f'years {years}', budget_id,
+                  forecast.forecast([ACCOUNT], [], years, 'daily', START))
+    # hits are written by the next put or evict, of any cache of the database
+    changes = cache.con.total_changes
+    other = forecast_cache.ForecastCache(manager=database.manager)
+    assert other.get('years 1') is not None
+    assert cache.con.total_changes == changes and not cache.con.in_transaction
+    # room for the two most recently used forecasts only
+    cache.cur.execute("SELECT SUM(Size) FROM forecast_cache WHERE Key != 'years 2'")
+    cache.max_bytes = cache.cur.fetchone()[0]
+    cache.evict()
+    assert cached_keys(cache) == ['years 3', 'years 1']
+
+def test_model_from_cached_forecast():
+    expenses = [EXPENSE, dict(EXPENSE, name='Gym', amount=30.0)]
+    result = forecast.forecast([ACCOUNT], expenses, 2, 'monthly', START)
+    model = forecast.ForecastModel.from_forecast(result, [ACCOUNT], expenses, 2, 'monthly', START)
+    assert model.update_expenses(expenses) == 0
+    assert model.update_expenses(expenses[:1]) == 1
+    expected = forecast.forecast([ACCOUNT], expenses[:1], 2, 'monthly', START)
+    assert np.allclose(model.total, expected.total)
+
+def test_triggers_do_not_depend_on_creation_order(tmp_path):
+    path = str(tmp_path / 'budget.db')
+    cache = forecast_cache.ForecastCache(path)
+    database = budget_dbhelper.BudgetDatabase(path)
+    for _ in range(2):
+        database.create_budget('home', [ACCOUNT])
+        budget_id = database.get_id_by_name('home')
+        accounts = database.get_accounts_by_name('home')
+        key = forecast_cache.cache_key(accounts, [], 2, 'monthly', START)
+        cache.forecast(budget_id, accounts, [], 2, 'monthly', START)
+        database.update_expense('home', EXPENSE)
+        assert cache.get(key) is None
+        # tables created again have their triggers again
+        assert database.delete_table() is True
+        assert database.create_db() is True
+
+def test_create_db_failures_are_kept(tmp_path):
+    cache = forecast_cache.ForecastCache(str(tmp_path / 'budget.db'))
+    # an index can not take the name of a table
+    cache.cur.execute('DROP INDEX forecast_cache_accessed')
+    cache.cur.execute('CREATE TABLE forecast_cache_accessed (Key text)')
+    assert cache.create_db() is False
+    assert cache.last_error is not None
+
+def test_hits_are_written_in_batches_and_on_close(tmp_path, monkeypatch):
+    manager = connection.ConnectionManager(str(tmp_path / 'budget.db'))
+    database = budget_dbhelper.BudgetDatabase(manager=manager)
+    database.create_budget('home', [ACCOUNT])
+    budget_id = database.get_id_by_name('home')
+    cache = forecast_cache.ForecastCache(manager=manager)
+    for years in (1, 2, 3):
+        cache.put(f'years {years}', budget_id,
+                  forecast.forecast([ACCOUNT], [], years, 'monthly', START))
+    monkeypatch.setattr(forecast_cache, 'FLUSH_HITS', 2)
+    cache.get('years 2')
+    assert cached_keys(cache) == ['years 1', 'years 2', 'years 3']
+    cache.get('years 1')
+    assert cached_keys(cache) == ['years 3', 'years 2', 'years 1']
+    # hits of a read only session are written when the pool closes
+    cache.get('years 3')
+    manager.close()
+    reopened = forecast_cache.ForecastCache(str(tmp_path / 'budget.db'))
+    assert cached_keys(reopened) == ['years 2', 'years 1', 'years 3']
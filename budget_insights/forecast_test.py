@@ -0,0 +1,60 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import forecast
+
+START = datetime.date(2022, 1, 15)
+
+def test_monthly_compounding():
+    accounts = [{'name': 'Savings', 'balance': '1000', 'interest': '12', 'compound': 'Monthly'}]
+    result = forecast.forecast(accounts, years=1, start=START)
+    assert len(result.dates) == 13
+    assert result.account_balances[0][0] == 1000
+    assert np.isclose(result.account_balances[0][-1], 1000 * 1.01 ** 12)
+
+def test_expenses_and_income():
+    expenses = [
+        {'name': 'Rent', 'amount': 500, 'type': 'Expense', 'frequency': 'Monthly'},
+        {'name': 'Job', 'amount': '100', 'type': 'Income', 'frequency': 'Weekly'},
+        ]
+    result = forecast.forecast([], expenses, years=1, resolution='daily', start=START)
+    assert len(result.dates) == 366
+    assert result.expense_totals[0][-1] == -500 * 12
+    assert result.expense_totals[1][-1] == 100 * 52
+    assert result.total[-1] == -500 * 12 + 100 * 52
+
+def test_unknown_frequency():
+    expenses = [{'name': 'Rent', 'amount': 500, 'type': 'Expense', 'frequency': 'Hourly'}]
+    with pytest.raises(ValueError):
+        forecast.forecast([], expenses, start=START)
+
+def test_one_time_expenses():
+    expenses = [
+        {'name': 'Car', 'amount': 5000, 'type': 'Expense', 'frequency': 'Once', 'date': '2022-03-10'},
+        {'name': 'Old', 'amount': 100, 'type': 'Expense', 'frequency': 'Once', 'date': '2021-03-10'},
+        ]
+    result = forecast.forecast([], expenses, years=1, start=START)
+    assert result.expense_names == ['Car']
+    assert list(result.total[:4]) == [0, 0, 0, -5000]
+
+def test_forecast_model_updates_changed_items():
+    accounts = [{'name': 'Savings', 'balance': '1000', 'interest': '12', 'compound': 'Monthly'}]
+    expenses = [
+        {'name': 'Rent', 'amount': 500, 'type': 'Expense', 'frequency': 'Monthly'},
+        {'name': 'Job', 'amount': '100', 'type': 'Income', 'frequency': 'Weekly'},
+        ]
+    model = forecast.ForecastModel(accounts, expenses, years=2, start=START)
+    before = model.result()
+    total = model.total.copy()
+    adjusted = [dict(expenses[1], amount=200),
+                {'name': 'Gym', 'amount': 30, 'type': 'Expense', 'frequency': 'Monthly'}]
+    updated = model.copy()
+    assert updated.update_expenses(adjusted) == 3
+    assert updated.update_accounts(accounts) == 0
+    expected = forecast.forecast(accounts, adjusted, years=2, start=START)
+    assert updated.result().expense_names == ['Job', 'Gym']
+    assert np.allclose(updated.total, expected.total)
+    # the copy leaves the model & its forecasts as they were
+    assert before.expense_names == ['Rent', 'Job'] and np.array_equal(model.total, total)
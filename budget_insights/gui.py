@@ -2,16 +2,23 @@
 using Tkiner as the GUI. Conects with dbhelper which utilizes sqlite3
 to handle database
 """
+import time
+# measured before anything else is imported, see report_startup
+_STARTED = time.perf_counter()
 
+import logging
 import tkinter as tk
 from tkinter import ttk
-from functools import partial
-import json
+from tkinter import filedialog
 from typing import Optional
 
 import budget_dbhelper
+import logs
 import projections_dbhelper
-import predictions
+import tasks
+import virtual_list
+# predictions & export pull in matplotlib and numpy, they are imported
+# when a budget is first viewed so the Home page draws without them
 
 SMALL_FONT = ("Helvetica Neue", 12)
 MEDIUM_FONT = ("Helvetica Neue", 20)
@@ -19,6 +26,10 @@ LARGE_FONT = ("Helvetica Neue", 28)
 BACKGROUND_COLOR_1 = 'SlateGray4'
 BACKGROUND_COLOR_2 = 'SlateGray3'
 GEOMETRY = "1000x700"
+# seconds allowed from starting the GUI to drawing the first Home page
+STARTUP_BUDGET = 1.0
+
+logger = logging.getLogger(__name__)
 
 def center(size: int, width: bool = True) -> int:
     """Returns the center based on given size and current window
@@ -43,6 +54,10 @@ class Application(tk.Frame):
     Allows for ease of changing views from one page to another,
     simplifying navigation.
     """
+    # cached pages are kept alive and raised again on later visits,
+    # pages which are not cached (forms) are destroyed when left
+    CACHED = True
+
     def __init__(self, master: tk.Tk, budget_database=None, projections_database=None) -> None:
         """
         Args:
@@ -51,7 +66,7 @@ class Application(tk.Frame):
             projections_database (ProjectionsDatabase): helper for projections database
 
         """
-        super().__init__(master)
+        super().__init__(master, bg=BACKGROUND_COLOR_1)
         self.master.configure(bg='SlateGray4')
         # resize the window
         master.geometry(GEOMETRY)
@@ -64,48 +79,136 @@ class Application(tk.Frame):
             self.projections_database = projections_dbhelper.ProjectionsDatabase()
         else:
             self.projections_database = projections_database
+        # every page fills the window, the raised one is shown
+        self.place(relx=0, rely=0, relwidth=1, relheight=1)
+        # built pages by class, shared by every page of the window
+        if not hasattr(master, 'pages'):
+            master.pages = {}
+        self.pages = master.pages
+        if self.CACHED:
+            self.pages[type(self)] = self
+        # database & forecast work runs on worker threads, see run_task
+        if not hasattr(master, 'tasks'):
+            master.tasks = tasks.TaskRunner(master)
+        self.tasks = master.tasks
+        self.task = None
+        self.progress = None
         # set quit button
-        quit_button = ttk.Button(self.master, text="Quit", command=self.master.destroy)
+        quit_button = ttk.Button(self, text="Quit", command=self.master.destroy)
         quit_button.place(relx=0.9, rely=0.9, relwidth=0.08, relheight=0.08)
 
     def change_view(
-        self, destroy: tk.Frame, create: tk.Frame,
-        budget: Optional[str] = None, projection=None
+        self, create: type, budget: Optional[str] = None, projection=None
         ) -> None:
-        """Helper function for changing pages and destroying instances.
+        """Helper function for changing pages. A page is built the first
+        time it is shown, later visits raise it and refresh its data.
 
         Args:
-            destroy (tk.Frame): frame to be destroyed
-            create (tk.Frame): frame to be created
+            create (type): class of page to be shown
             budget (str): name of budget
             projeciton (str): name of projection
 
         """
-        for child in destroy.winfo_children():
-            child.destroy()
-        if create in (ViewBudget, AddExpenses, AdjustAccounts, AdjustExpenses):
-            create(
+        page = self.pages.get(create)
+        if page is not None and page.winfo_exists():
+            page.refresh(budget=budget, projection=projection)
+        elif create in (ViewBudget, AddExpenses, AdjustAccounts, AdjustExpenses):
+            page = create(
                 master=self.master,
                 budget=budget,
                 budget_database=self.budget_database,
                 projections_database=self.projections_database
                 )
         elif create == ViewProjection:
-            create(
+            page = create(
                 master=self.master,
                 projection=projection,
                 budget_database=self.budget_database,
                 projections_database=self.projections_database
                 )
         elif create == NewBudget and budget is not None:
-            create(
+            page = create(
                 master=self.master,
                 budget=budget,
                 budget_database=self.budget_database,
                 projections_database=self.projections_database
                 )
         else:
-            create(master=self.master)
+            # pass the helpers along so pages never open their own
+            page = create(
+                master=self.master,
+                budget_database=self.budget_database,
+                projections_database=self.projections_database
+                )
+        page.tkraise()
+        if not self.CACHED and page is not self:
+            self.destroy()
+
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Updates a cached page before it is shown again. Pages showing
+        data from the database override this to reload what changed.
+
+        Args:
+            budget (str): name of budget
+            projection (str): name of projection
+
+        """
+
+    def run_task(self, function, *args, done) -> tasks.Task:
+        """Runs function(task, *args) on a worker thread, then done(result)
+        on the main loop. A progress bar and a cancel button are shown
+        meanwhile, and the previous task of the page is cancelled.
+
+        Args:
+            function (Callable): work to run, must not touch widgets
+            args: further arguments of function
+            done (Callable): called with the result of function
+
+        Returns:
+            tasks.Task: the submitted task
+
+        """
+        self.cancel_task()
+        if self.progress is None:
+            self.progress = ttk.Progressbar(self, mode='indeterminate')
+            self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel_task)
+        self.progress.configure(mode='indeterminate', value=0)
+        self.progress.place(relx=0.3, rely=0.42, relwidth=0.3, relheight=0.04)
+        self.cancel_button.place(relx=0.62, rely=0.41, relwidth=0.08, relheight=0.06)
+        self.progress.start()
+
+        def finish(result) -> None:
+            # the page may have been left & destroyed while the task ran
+            if self.winfo_exists():
+                self.hide_progress()
+                done(result)
+
+        def fail(exception: Exception) -> None:
+            if self.winfo_exists():
+                self.hide_progress()
+            tasks.log_error(exception)
+
+        def progress(count: int, total: int) -> None:
+            if self.winfo_exists():
+                self.progress.stop()
+                self.progress.configure(mode='determinate', maximum=total, value=count)
+
+        self.task = self.tasks.submit(function, *args, done=finish, error=fail, progress=progress)
+        return self.task
+
+    def cancel_task(self) -> None:
+        """Cancels the running task of the page, if any"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.hide_progress()
+
+    def hide_progress(self) -> None:
+        """Hides the progress bar & cancel button of run_task"""
+        if self.progress is not None:
+            self.progress.stop()
+            self.progress.place_forget()
+            self.cancel_button.place_forget()
 
 class Home(Application):
     """Home page of application.
@@ -127,35 +230,39 @@ class Home(Application):
 
     def place_buttons_and_text(self) -> None:
         """Places buttons & labels on page"""
-        budget_button = ttk.Button(self.master, text="Budgets",
-                                   command = lambda: self.change_view(self.master, Budget))
+        budget_button = ttk.Button(self, text="Budgets",
+                                   command = lambda: self.change_view(Budget))
         budget_button.place(x = center(500), rely=0.1, width=500, relheight=0.2)
 
-        projection_button = ttk.Button(self.master, text="Projections",
-                                       command = lambda: self.change_view(self.master, Projections))
+        projection_button = ttk.Button(self, text="Projections",
+                                       command = lambda: self.change_view(Projections))
         projection_button.place(x = center(500), rely=0.4, width=500, relheight=0.2)
 
-        info_button = ttk.Button(self.master, text="Information & How to Use",
-                                       command = lambda: self.change_view(self.master, info))
+        info_button = ttk.Button(self, text="Information & How to Use",
+                                       command = lambda: self.change_view(info))
         info_button.place(x = center(500), rely=0.7, width=500, relheight=0.2)
 
 class info(Application):
 
-    def __init__(self, master: tk.Tk):
-        super().__init__(master=master)
+    def __init__(self, master: tk.Tk, projections_database=None, budget_database=None):
+        super().__init__(
+                master=master,
+                projections_database=projections_database,
+                budget_database=budget_database
+                )
         self.master = master
-        label = tk.Label(self.master, text="Information & How to Use", bg=BACKGROUND_COLOR_1)
+        label = tk.Label(self, text="Information & How to Use", bg=BACKGROUND_COLOR_1)
         label.configure(font=LARGE_FONT)
         label.place(rely=0.08, relheight=0.1, relwidth=1)
 
-        back_button = ttk.Button(self.master, text="Back",
-                                 command = lambda: self.change_view(self.master, Home))
+        back_button = ttk.Button(self, text="Back",
+                                 command = lambda: self.change_view(Home))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.18, relwidth=0.84, relheight=0.54)
 
-        instructions = tk.Label(self.master, bg=BACKGROUND_COLOR_2, justify = tk.LEFT, text =
+        instructions = tk.Label(self, bg=BACKGROUND_COLOR_2, justify = tk.LEFT, text =
                                 '1. Create a budget on the "Budgets" screen'
                                 '\n\n2. Add expenses, income, investments to the budget'
                                 '\n\n3. View your current budget using provided tables and graphs'
@@ -190,42 +297,33 @@ class Projections(Application):
     def place_buttons_and_text(self) -> None:
         """Places buttons & labels on page
         """
-        label = tk.Label(self.master, text="Projections", bg=BACKGROUND_COLOR_1)
+        label = tk.Label(self, text="Projections", bg=BACKGROUND_COLOR_1)
         label.configure(font=LARGE_FONT)
         label.place(relx=0.4, rely=0.08, relheight=0.1, relwidth=0.2)
 
-        back_button = ttk.Button(self.master, text="Back",
-                                 command = lambda: self.change_view(self.master, Home))
+        back_button = ttk.Button(self, text="Back",
+                                 command = lambda: self.change_view(Home))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.18, relwidth=0.84, relheight=0.54)
 
-        # list all budgets
-        projections = self.projections_database.get_all_projections()
-        self.projections = projections
-        for count, current_projection in enumerate(projections):
-            # we need to use functools partial here instead of
-            # lambda else the function calls will change
-            current_projection_btn = (ttk.Button(self.master, text=current_projection[2],
-                                                command = partial
-                                                (self.change_view, self.master,
-                                                 ViewProjection, projection=current_projection[2]))
-                                     )
-            current_projection_btn.place(relx = (0.1 + 0.2*int(count/5)),
-                                        rely=(0.3 + 0.1*(count%5-1)),
-                                        relwidth=0.19,
-                                        relheight=0.08)
-
-        new_projection_btn = ttk.Button(self.master, text="Create New Projection",
-                                       command = lambda: self.change_view(
-                                           self.master, NewProjection
-                                           )
-                                       )
+        new_projection_btn = ttk.Button(self, text="Create New Projection",
+                                       command = lambda: self.change_view(NewProjection))
         new_projection_btn.place(x = center(350), rely=0.8, width=350, relheight=0.08)
-        # max 20 bugets can be displayed for now
-        if len(projections) > 19:
-            new_projection_btn.configure(state=tk.DISABLED)
+
+        # only the projections on screen are read & get a button
+        rows = virtual_list.PagedRows(self.projections_database.count_projections,
+                                      self.projections_database.get_projections_page)
+        self.projection_list = virtual_list.VirtualList(
+            self, rows, text=lambda row: row[2],
+            command=lambda row: self.change_view(ViewProjection, projection=row[2]),
+            bg=BACKGROUND_COLOR_2)
+        self.projection_list.place(relx=0.1, rely=0.2, relwidth=0.8, relheight=0.5)
+
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Reads projections again, as they may have been created"""
+        self.projection_list.refresh()
 
 class ViewProjection(Application):
     """Interface which displays a projection.
@@ -251,25 +349,69 @@ class ViewProjection(Application):
                 )
         self.master = master
         self.projection = projection
+        self.prediction = None
         self.place_buttons_and_text()
+        self.view_prediction()
+
+    def view_prediction(self) -> None:
+        """Forecasts the budget of the projection with its events applied
+        on a worker thread, then graphs it replacing any previous graph
+        """
+        self.run_task(self.load_prediction, self.projection, done=self.show_prediction)
+
+    def load_prediction(self, task: tasks.Task, projection: str):
+        """Reads & forecasts a projection, runs on a worker thread
+
+        Returns:
+            BudgetPredictions | None: forecast, None if there is no such projection
+
+        """
+        import predictions
+        budget = self.projections_database.get_budget_name(projection)
+        if budget is False:
+            return None
+        return predictions.BudgetPredictions(
+            name=budget, master=self, budget_database=self.budget_database,
+            projection_events=self.projections_database.get_events(projection))
+
+    def show_prediction(self, prediction) -> None:
+        """Graphs a forecast made by load_prediction"""
+        if prediction is None:
+            # the projection is gone, hide the graph of the previous one
+            if self.prediction is not None and self.prediction.chart is not None:
+                self.prediction.chart.get_tk_widget().place_forget()
+            return
+        if self.prediction is not None:
+            # the figure & canvas of the page are kept, only their data changes
+            prediction.chart = self.prediction.chart
+        self.prediction = prediction
+        prediction.view_graph()
 
     def place_buttons_and_text(self) -> None:
         """Places buttons & labels on page"""
-        label = tk.Label(self.master, text=f'Projection: {self.projection}', bg=BACKGROUND_COLOR_1)
-        label.configure(font=LARGE_FONT)
-        label.place(x = center(300), rely=0.05, relheight=0.1, width=300)
+        self.label = tk.Label(self, text=f'Projection: {self.projection}', bg=BACKGROUND_COLOR_1)
+        self.label.configure(font=LARGE_FONT)
+        self.label.place(x = center(300), rely=0.05, relheight=0.1, width=300)
 
-        back_button = ttk.Button(self.master, text="Back",
-                                 command = lambda: self.change_view(self.master, Projections))
+        back_button = ttk.Button(self, text="Back",
+                                 command = lambda: self.change_view(Projections))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.18, relwidth=0.84, relheight=0.54)
 
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Shows a projection again, its events or budget may have changed"""
+        self.projection = projection
+        self.label.configure(text=f'Projection: {self.projection}')
+        self.view_prediction()
+
 class NewProjection(Application):
     """Interface which allows user to create projection
     Inherits from Application to allow changing of views.
     """
+    CACHED = False
+
     def __init__(self, master: tk.Tk, projections_database=None, budget_database=None) -> None:
         """
         Args:
@@ -284,44 +426,40 @@ class NewProjection(Application):
         self.master = master
         self.place_buttons_and_text()
 
-        self.warning = tk.Label(self.master, text="", justify="center")
+        self.warning = tk.Label(self, text="", justify="center")
         self.warning.configure(font=MEDIUM_FONT, fg='red', bg=BACKGROUND_COLOR_1)
         self.warning.place(relx=0.3, rely=0.8, relwidth=0.4, relheight=0.05)
 
     def place_buttons_and_text(self) -> None:
         """Places buttons & labels on page
         """
-        back_button = ttk.Button(self.master, text="Back",
-                                 command = lambda: self.change_view(self.master, Projections))
+        back_button = ttk.Button(self, text="Back",
+                                 command = lambda: self.change_view(Projections))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.19, relwidth=0.84, relheight=0.6)
 
         # name of the budget
-        name = tk.Label(self.master, text="Projection Name: ", font=MEDIUM_FONT,
+        name = tk.Label(self, text="Projection Name: ", font=MEDIUM_FONT,
                         justify="right", bg=BACKGROUND_COLOR_1)
         name.place(relx=0.1, rely=0.08, relwidth=0.25, relheight=0.09)
-        self.name_entry = tk.Entry(self.master, font=MEDIUM_FONT, bg='white',
+        self.name_entry = tk.Entry(self, font=MEDIUM_FONT, bg='white',
                                    exportselection=0, relief='sunken')
         self.name_entry.place(relx=0.35, rely=0.08, relwidth=0.5, relheight=0.09)
 
-        budget_label = tk.Label(self.master, text='Select a budet to work with',
+        budget_label = tk.Label(self, text='Select a budet to work with',
                                 font=MEDIUM_FONT, justify='center', bg=BACKGROUND_COLOR_2)
         budget_label.place(relx=0.1, rely=0.2, relwidth=0.8, relheight=0.09)
 
-        # list all budgets
-        budgets = self.budget_database.get_all_budgets()
-        self.budgets = budgets
-        options = []
-        for budget in budgets:
-            options.append(budget[2])
+        # list all budgets, only their names are read
+        options = [budget[2] for budget in self.budget_database.iter_budget_summaries()]
         self.budget_var = tk.StringVar(self.master)
-        budget_menu = ttk.OptionMenu(self.master, self.budget_var, "", *options)
+        budget_menu = ttk.OptionMenu(self, self.budget_var, "", *options)
         budget_menu.place(relx=0.3, rely=0.3, relwidth=0.4, relheight=0.1)
 
         # submit budget
-        submit_button = ttk.Button(self.master, text="Submit", command= self.submit)
+        submit_button = ttk.Button(self, text="Submit", command= self.submit)
         submit_button.place(relx=0.4, rely=0.85, relwidth=0.2, relheight=0.1)
 
     def submit(self) -> None:
@@ -338,7 +476,7 @@ class NewProjection(Application):
         if self.projections_database.create_projection(name, budget) is False:
             self.warning.configure(text="Projection name already exists")
             return
-        self.change_view(self.master, ViewProjection, projection=name)
+        self.change_view(ViewProjection, projection=name)
 
 class Budget(Application):
     """Interface which displays all existing budgets or ability to go to new one.
@@ -360,49 +498,40 @@ class Budget(Application):
 
     def place_buttons_and_text(self) -> None:
         """Places buttons & labels on page"""
-        label = tk.Label(self.master, text="Budgets", bg=BACKGROUND_COLOR_1)
+        label = tk.Label(self, text="Budgets", bg=BACKGROUND_COLOR_1)
         label.configure(font=LARGE_FONT)
         label.place(relx=0.4, rely=0.08, relheight=0.1, relwidth=0.2)
 
-        back_button = ttk.Button(self.master, text="Back",
-                                 command = lambda: self.change_view(self.master, Home))
+        back_button = ttk.Button(self, text="Back",
+                                 command = lambda: self.change_view(Home))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.18, relwidth=0.84, relheight=0.54)
 
-        # list all budgets
-        budgets = self.budget_database.get_all_budgets()
-        self.budgets = budgets
-        for count, current_budget in enumerate(budgets):
-            # we need to use functools partial here instead of
-            # lambda else the function calls will change
-            current_budget_button = (
-                ttk.Button(self.master, text=current_budget[2],
-                command = partial(
-                                self.change_view,
-                                self.master,
-                                ViewBudget,
-                                budget=current_budget[2]
-                                )))
-            current_budget_button.place(
-                relx = (0.1 + 0.2*int(count/5)),
-                rely=(0.3 + 0.1*(count%5-1)),
-                relwidth=0.19,
-                relheight=0.08
-                )
-
-        new_budget_button = ttk.Button(self.master, text="Create New Budget",
-                                       command = lambda: self.change_view(self.master, NewBudget))
+        new_budget_button = ttk.Button(self, text="Create New Budget",
+                                       command = lambda: self.change_view(NewBudget))
         new_budget_button.place(x = center(350), rely=0.8, width=350, relheight=0.08)
-        # max 20 bugets can be displayed for now
-        if len(budgets) > 19:
-            new_budget_button.configure(state=tk.DISABLED)
+
+        # only the budgets on screen are read & get a button
+        rows = virtual_list.PagedRows(self.budget_database.count_budgets,
+                                      self.budget_database.get_budgets_page)
+        self.budget_list = virtual_list.VirtualList(
+            self, rows, text=lambda row: row[2],
+            command=lambda row: self.change_view(ViewBudget, budget=row[2]),
+            bg=BACKGROUND_COLOR_2)
+        self.budget_list.place(relx=0.1, rely=0.2, relwidth=0.8, relheight=0.5)
+
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Reads budgets again, as they may have been created or changed"""
+        self.budget_list.refresh()
 
 class NewBudget(Application):
     """Interface which allows new budget to be created & account to be added.
     Inherits from Application to allow changing of views.
     """
+    CACHED = False
+
     def __init__(self, master: tk.Tk, budget: Optional[str] = None, projections_database=None, budget_database=None) -> None:
         """
         Args:
@@ -417,10 +546,11 @@ class NewBudget(Application):
                 )
         self.master = master
         if budget is not None:
-            self.accounts = json.loads(self.budget_database.get_accounts_by_name(budget))
+            self.accounts = self.budget_database.get_accounts_by_name(budget)
         else:
             self.accounts = []
-        self.warning = tk.Label(self.master, text="", justify="center")
+        self.details = []
+        self.warning = tk.Label(self, text="", justify="center")
         self.warning.configure(font=MEDIUM_FONT, fg='red', bg=BACKGROUND_COLOR_1)
         self.warning.place(relx=0.3, rely=0.8, relwidth=0.4, relheight=0.05)
 
@@ -437,86 +567,89 @@ class NewBudget(Application):
         # if instance of AdjustAccounts, back button should go back to ViewBudget
         if isinstance(self, AdjustAccounts):
             back_button = ttk.Button(
-                self.master,
+                self,
                 text="Back",
                 command = lambda: self.change_view(
-                self.master,
                 ViewBudget,
                 budget=self.name_entry.get()
                 ))
         else:
-            back_button = ttk.Button(self.master, text="Back",
-                                    command = lambda: self.change_view(self.master, Budget))
+            back_button = ttk.Button(self, text="Back",
+                                    command = lambda: self.change_view(Budget))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
         # name of the budget
-        name = tk.Label(self.master, text="Budget Name: ", font=MEDIUM_FONT,
+        name = tk.Label(self, text="Budget Name: ", font=MEDIUM_FONT,
                         justify="right", bg=BACKGROUND_COLOR_1)
         name.place(relx=0.1, rely=0.08, relwidth=0.2, relheight=0.09)
-        self.name_entry = tk.Entry(self.master, font=MEDIUM_FONT, bg='white',
+        self.name_entry = tk.Entry(self, font=MEDIUM_FONT, bg='white',
                                    exportselection=0, relief='sunken')
         self.name_entry.place(relx=0.35, rely=0.08, relwidth=0.5, relheight=0.09)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.2, relwidth=0.84, relheight=0.6)
 
         # submit budget
-        submit_button = ttk.Button(self.master, text="Next", command= self.submit_budget)
+        submit_button = ttk.Button(self, text="Next", command= self.submit_budget)
         submit_button.place(relx=0.4, rely=0.85, relwidth=0.2, relheight=0.1)
 
     def place_account_details(self) -> None:
         """Places more buttons & labels which will be updated as user inputs accounts
         """
+        # replace the widgets placed by the previous call
+        for widget in self.details:
+            widget.destroy()
+        placed = set(self.winfo_children())
         # account details
-        name = tk.Label(self.master, text="Account Name: ",font=SMALL_FONT,
+        name = tk.Label(self, text="Account Name: ",font=SMALL_FONT,
                         justify="right", bg=BACKGROUND_COLOR_2)
         name.place(relx=0.1, rely=0.21, relwidth=0.2, relheight=0.06)
 
-        balance = tk.Label(self.master, text="Balance: ", font=SMALL_FONT,
+        balance = tk.Label(self, text="Balance: ", font=SMALL_FONT,
                            justify="right", bg=BACKGROUND_COLOR_2)
         balance.place(relx=0.1, rely=0.31, relwidth=0.2, relheight=0.06)
 
-        interest = tk.Label(self.master, text="Annual Interest\n(%, out of 100)",
+        interest = tk.Label(self, text="Annual Interest\n(%, out of 100)",
                             font=SMALL_FONT, justify="right", bg=BACKGROUND_COLOR_2)
         interest.place(relx=0.1, rely=0.41, relwidth=0.2, relheight=0.06)
 
-        compound = tk.Label(self.master, text="Compounded: ", font=SMALL_FONT,
+        compound = tk.Label(self, text="Compounded: ", font=SMALL_FONT,
                             justify="right", bg=BACKGROUND_COLOR_2)
         compound.place(relx=0.1, rely=0.51, relwidth=0.2, relheight=0.06)
 
-        type_act_label = tk.Label(self.master, text="Type: ", font=SMALL_FONT,
+        type_act_label = tk.Label(self, text="Type: ", font=SMALL_FONT,
                         justify="right", bg=BACKGROUND_COLOR_2)
         type_act_label.place(relx=0.1, rely=0.61, relwidth=0.2, relheight=0.06)
 
-        self.account_name_entry = tk.Entry(self.master, font=MEDIUM_FONT, bg='white',
+        self.account_name_entry = tk.Entry(self, font=MEDIUM_FONT, bg='white',
                                            exportselection=0, relief='sunken')
         self.account_name_entry.place(relx=0.35, rely=0.21, relwidth=0.5, relheight=0.06)
 
-        self.balance_entry = tk.Entry(self.master, font=MEDIUM_FONT,
+        self.balance_entry = tk.Entry(self, font=MEDIUM_FONT,
                                       exportselection=0, relief='sunken')
         self.balance_entry.place(relx=0.35, rely=0.31, relwidth=0.5, relheight=0.06)
 
-        self.interest_entry = tk.Entry(self.master, font=MEDIUM_FONT,
+        self.interest_entry = tk.Entry(self, font=MEDIUM_FONT,
                                        exportselection=0, relief='sunken')
         self.interest_entry.place(relx=0.35, rely=0.41, relwidth=0.5, relheight=0.06)
 
         self.compounded_var = tk.StringVar(self.master)
-        self.compounded = ttk.OptionMenu(self.master, self.compounded_var, "Daily",
+        self.compounded = ttk.OptionMenu(self, self.compounded_var, "Daily",
                                          "Daily", "Weekly", "Monthly",
                                          "Quarterly", "Semi Annually", "Annually")
         self.compounded.place(relx=0.35, rely=0.51, relwidth=0.2, relheight=0.06)
 
         self.type_var = tk.StringVar(self.master)
-        self.type_act = ttk.OptionMenu(self.master, self.type_var, "Checkings",
+        self.type_act = ttk.OptionMenu(self, self.type_var, "Checkings",
                                    "Cash", "Checkings", "Savings", "401k",
                                    "Brokerage", "Roth IRA", "Traditional IRA", "Asset")
         self.type_act.place(relx=0.35, rely=0.61, relwidth=0.2, relheight=0.06)
 
-        submit_account_button = ttk.Button(self.master, text="Add Account",
+        submit_account_button = ttk.Button(self, text="Add Account",
                                            command= self.submit_account)
         submit_account_button.place(relx=0.35, rely=0.71, relwidth=0.1, relheight=0.06)
 
-        type_act_label = tk.Label(self.master, text="Modify an Account- ", font=SMALL_FONT,
+        type_act_label = tk.Label(self, text="Modify an Account- ", font=SMALL_FONT,
                         justify="right", bg=BACKGROUND_COLOR_2)
         type_act_label.place(relx=0.6, rely=0.71, relwidth=0.14, relheight=0.06)
 
@@ -525,9 +658,10 @@ class NewBudget(Application):
         options = ['']
         for option in self.accounts:
             options.append(option['name'])
-        modify_option = ttk.OptionMenu(self.master, self.modify, *options,
+        modify_option = ttk.OptionMenu(self, self.modify, *options,
                                        command= lambda x: self.change_account())
         modify_option.place(relx=0.75, rely=0.71, relwidth=0.15, relheight=0.06)
+        self.details = [widget for widget in self.winfo_children() if widget not in placed]
 
     def change_account(self) -> None:
         """Allows user to modify existing Account
@@ -608,7 +742,7 @@ class NewBudget(Application):
             self.warning.configure(text='Please add at least one account')
             return
         if self.budget_database.create_budget(name, self.accounts) is True:
-            self.change_view(self.master, AddExpenses, budget=self.name_entry.get())
+            self.change_view(AddExpenses, budget=self.name_entry.get())
         else:
             self.warning.configure(text='Budget Name already exists')
 
@@ -616,6 +750,8 @@ class AddExpenses(Application):
     """Interface which allows expenses to be added to new budget.
     Inherits from Application to allow changing of views.
     """
+    CACHED = False
+
     def __init__(
         self, master: tk.Tk, budget: Optional[str] = None,
         projections_database=None, budget_database=None
@@ -634,8 +770,9 @@ class AddExpenses(Application):
         self.name = budget
         self.master = master
         self.expenses = []
+        self.details = []
 
-        self.warning = tk.Label(self.master, text="", justify="center")
+        self.warning = tk.Label(self, text="", justify="center")
         self.warning.configure(font=MEDIUM_FONT, fg='red', bg=BACKGROUND_COLOR_1)
         self.warning.place(relx=0.3, rely=0.8, relwidth=0.4, relheight=0.05)
 
@@ -648,88 +785,90 @@ class AddExpenses(Application):
         # if instance of AdjustExpenses, back button should go back to ViewBudget
         if isinstance(self, AdjustExpenses):
             back_button = ttk.Button(
-                self.master,
+                self,
                 text="Back",
                 command = lambda: self.change_view(
-                self.master,
                 ViewBudget,
                 budget=self.name
                 ))
         else:
             back_button = ttk.Button(
-                self.master,
+                self,
                 text="Back",
                 command = lambda: self.change_view(
-                self.master,
                 NewBudget,
                 budget=self.name
                 ))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
         # name of the budget
-        name = tk.Label(self.master, text='Add Expenses to Budget "{}"'.format(self.name),
-                        font=MEDIUM_FONT, justify="center", bg=BACKGROUND_COLOR_1)
-        name.place(relx=0.2, rely=0.08, relwidth=0.6, relheight=0.09)
+        self.heading = tk.Label(self, text='Add Expenses to Budget "{}"'.format(self.name),
+                                font=MEDIUM_FONT, justify="center", bg=BACKGROUND_COLOR_1)
+        self.heading.place(relx=0.2, rely=0.08, relwidth=0.6, relheight=0.09)
 
-        bg_label = tk.Label(self.master, bg=BACKGROUND_COLOR_2)
+        bg_label = tk.Label(self, bg=BACKGROUND_COLOR_2)
         bg_label.place(relx=0.08, rely=0.2, relwidth=0.84, relheight=0.6)
 
         # submit budget
-        submit_button = ttk.Button(self.master, text="Submit", command= self.submit)
+        submit_button = ttk.Button(self, text="Submit", command= self.submit)
         submit_button.place(relx=0.4, rely=0.85, relwidth=0.2, relheight=0.1)
 
     def place_expense_details(self) -> None:
         """Places more buttons & labels which will be updated as user inputs expenses
         """
+        # replace the widgets placed by the previous call
+        for widget in self.details:
+            widget.destroy()
+        placed = set(self.winfo_children())
         # account details
-        name = tk.Label(self.master, text="Expense/Income Name: ",
+        name = tk.Label(self, text="Expense/Income Name: ",
                         font=SMALL_FONT, justify="right", bg=BACKGROUND_COLOR_2)
         name.place(relx=0.1, rely=0.21, relwidth=0.2, relheight=0.06)
 
-        description = tk.Label(self.master, text="Description: ", font=SMALL_FONT,
+        description = tk.Label(self, text="Description: ", font=SMALL_FONT,
                                 justify="right", bg=BACKGROUND_COLOR_2)
         description.place(relx=0.1, rely=0.31, relwidth=0.2, relheight=0.06)
 
-        amount = tk.Label(self.master, text="Amount: ", font=SMALL_FONT,
+        amount = tk.Label(self, text="Amount: ", font=SMALL_FONT,
                             justify="right", bg=BACKGROUND_COLOR_2)
         amount.place(relx=0.1, rely=0.41, relwidth=0.2, relheight=0.06)
 
-        expense_income_label = tk.Label(self.master, text="Expense/Income: ", font=SMALL_FONT,
+        expense_income_label = tk.Label(self, text="Expense/Income: ", font=SMALL_FONT,
                                         justify="right", bg=BACKGROUND_COLOR_2)
         expense_income_label.place(relx=0.1, rely=0.51, relwidth=0.2, relheight=0.06)
 
-        frequency_label = tk.Label(self.master, text="Frequency: ", font=SMALL_FONT,
+        frequency_label = tk.Label(self, text="Frequency: ", font=SMALL_FONT,
                                     justify="right", bg=BACKGROUND_COLOR_2)
         frequency_label.place(relx=0.1, rely=0.61, relwidth=0.2, relheight=0.06)
 
-        self.name_entry = tk.Entry(self.master, font=MEDIUM_FONT, bg='white',
+        self.name_entry = tk.Entry(self, font=MEDIUM_FONT, bg='white',
                                     exportselection=0, relief='sunken')
         self.name_entry.place(relx=0.35, rely=0.21, relwidth=0.5, relheight=0.06)
 
-        self.description_entry = tk.Entry(self.master, font=MEDIUM_FONT,
+        self.description_entry = tk.Entry(self, font=MEDIUM_FONT,
                                             exportselection=0, relief='sunken')
         self.description_entry.place(relx=0.35, rely=0.31, relwidth=0.5, relheight=0.06)
 
-        self.amount_entry = tk.Entry(self.master, font=MEDIUM_FONT,
+        self.amount_entry = tk.Entry(self, font=MEDIUM_FONT,
                                         exportselection=0, relief='sunken')
         self.amount_entry.place(relx=0.35, rely=0.41, relwidth=0.5, relheight=0.06)
 
         self.expense_income_var = tk.StringVar(self.master)
-        self.expense_income = ttk.OptionMenu(self.master, self.expense_income_var, "Expense",
+        self.expense_income = ttk.OptionMenu(self, self.expense_income_var, "Expense",
                                             "Income", "Expense")
         self.expense_income.place(relx=0.35, rely=0.51, relwidth=0.2, relheight=0.06)
 
         self.frequency_var = tk.StringVar(self.master)
-        self.frequency = ttk.OptionMenu(self.master, self.frequency_var, "Bi Weekly",
+        self.frequency = ttk.OptionMenu(self, self.frequency_var, "Bi Weekly",
                                         "Weekly", "Bi Weekly", "Monthly",
                                         "Quarterly", "Semi Annually", "Annually")
         self.frequency.place(relx=0.35, rely=0.61, relwidth=0.2, relheight=0.06)
 
-        submit_account_button = ttk.Button(self.master, text="Add Expense/Income",
+        submit_account_button = ttk.Button(self, text="Add Expense/Income",
                                            command= self.submit_expenses)
         submit_account_button.place(relx=0.35, rely=0.71, relwidth=0.15, relheight=0.06)
 
-        type_exp = tk.Label(self.master, text="Modify an Expense/Income- ",
+        type_exp = tk.Label(self, text="Modify an Expense/Income- ",
                         font=SMALL_FONT, justify="right", bg=BACKGROUND_COLOR_2)
         type_exp.place(relx=0.53, rely=0.71, relwidth=0.23, relheight=0.06)
 
@@ -738,9 +877,10 @@ class AddExpenses(Application):
         options = [""]
         for option in self.expenses:
             options.append(option['name'])
-        modify_option = ttk.OptionMenu(self.master, self.modify, *options,
+        modify_option = ttk.OptionMenu(self, self.modify, *options,
                                         command= lambda x: self.change_expense())
         modify_option.place(relx=0.75, rely=0.71, relwidth=0.15, relheight=0.06)
+        self.details = [widget for widget in self.winfo_children() if widget not in placed]
 
     def change_expense(self) -> None:
         """Allows user to modify existing expense
@@ -818,7 +958,7 @@ class AddExpenses(Application):
         name = self.name
         print(name)
         if self.budget_database.update_expenses(name, self.expenses) is True:
-            self.change_view(self.master, ViewBudget, budget=name)
+            self.change_view(ViewBudget, budget=name)
 
 class ViewBudget(Application):
     """Interface to view a budget and connection with predictions.py.
@@ -841,54 +981,142 @@ class ViewBudget(Application):
                 )
         self.budget = budget
         self.master = master
-        self.prediction = predictions.BudgetPredictions(name=budget, master=self.master)
-        self.prediction.view_graph()
+        self.prediction = None
+        self.view_prediction()
         self.place_buttons_and_text()
 
+    def view_prediction(self) -> None:
+        """Forecasts the budget on a worker thread, then graphs it
+        replacing any previous graph
+        """
+        self.run_task(self.load_prediction, self.budget, done=self.show_prediction)
+
+    def load_prediction(self, task: tasks.Task, budget: str):
+        """Reads & forecasts a budget, runs on a worker thread
+
+        Returns:
+            BudgetPredictions: forecast of the budget
+
+        """
+        import predictions
+        return predictions.BudgetPredictions(
+            name=budget, master=self, budget_database=self.budget_database)
+
+    def show_prediction(self, prediction) -> None:
+        """Graphs a forecast made by load_prediction"""
+        if self.prediction is not None:
+            # the figure & canvas of the page are kept, only their data changes
+            prediction.chart = self.prediction.chart
+        self.prediction = prediction
+        prediction.view_graph()
+
+    def update_prediction(self, task: tasks.Task, prediction, budget: str):
+        """Forecasts a copy of prediction again, recomputing only the accounts
+        & expenses which changed, runs on a worker thread. prediction is
+        left as it is, the page keeps drawing it until show_prediction.
+
+        Returns:
+            BudgetPredictions: the new forecast, None if nothing changed
+
+        """
+        accounts = self.budget_database.get_account_records(budget)
+        expenses = self.budget_database.get_expense_records(budget)
+        return prediction.updated(accounts, expenses)
+
+    def view_monte_carlo(self) -> None:
+        """Simulates the budget on a worker thread, reporting every chunk
+        of paths, then graphs its percentile bands"""
+        if self.prediction is None:
+            return
+        prediction = self.prediction
+        self.run_task(lambda task: prediction.simulate(progress=task.report),
+                      done=prediction.view_monte_carlo)
+
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Forecasts another budget, or only the accounts & expenses which changed"""
+        if budget != self.budget or self.prediction is None:
+            self.budget = budget
+            self.label.configure(text=f'Budget: {self.budget}')
+            self.view_prediction()
+            return
+        prediction = self.prediction
+        self.run_task(self.update_prediction, prediction, budget,
+                      done=lambda updated: updated is not None and self.show_prediction(updated))
+
     def place_buttons_and_text(self) -> None:
         """Places buttons & labels on page
         """
-        label = tk.Label(self.master, text=f'Budget: {self.budget}', bg=BACKGROUND_COLOR_1)
-        label.configure(font=LARGE_FONT)
-        label.place(x = center(300), rely=0.05, relheight=0.1, width=300)
+        self.label = tk.Label(self, text=f'Budget: {self.budget}', bg=BACKGROUND_COLOR_1)
+        self.label.configure(font=LARGE_FONT)
+        self.label.place(x = center(300), rely=0.05, relheight=0.1, width=300)
 
-        back_button = ttk.Button(self.master, text="Back",
-                                command = lambda: self.change_view(self.master, Budget))
+        back_button = ttk.Button(self, text="Back",
+                                command = lambda: self.change_view(Budget))
         back_button.place(relx=0.02, rely=0.9, relwidth=0.08, relheight=0.08)
 
-        graph_button = ttk.Button(self.master, text="graph",
-                                    command = self.prediction.view_graph)
+        graph_button = ttk.Button(self, text="graph",
+                                    command = lambda: self.prediction and
+                                        self.prediction.view_graph())
         graph_button.place(relx=0.38, rely=0.8, relwidth=0.11, relheight=0.08)
 
-        table_button = ttk.Button(self.master, text="bar",
-                                    command = self.prediction.view_bar)
+        table_button = ttk.Button(self, text="bar",
+                                    command = lambda: self.prediction and
+                                        self.prediction.view_bar())
         table_button.place(relx=0.51, rely=0.8, relwidth=0.11, relheight=0.08)
 
-        graph_button = ttk.Button(self.master, text="Adjust Accounts",
-                                    command = lambda: self.change_view(self.master,
-                                                                       AdjustAccounts,
+        monte_carlo_button = ttk.Button(self, text="Monte Carlo",
+                                        command = self.view_monte_carlo)
+        monte_carlo_button.place(relx=0.25, rely=0.8, relwidth=0.11, relheight=0.08)
+
+        graph_button = ttk.Button(self, text="Adjust Accounts",
+                                    command = lambda: self.change_view(AdjustAccounts,
                                                                        budget=self.budget))
         graph_button.place(relx=0.68, rely=0.8, relwidth=0.11, relheight=0.08)
 
-        graph_button = ttk.Button(self.master, text="Adjust Expenses",
-                                    command = lambda: self.change_view(self.master,
-                                                                       AdjustExpenses,
+        graph_button = ttk.Button(self, text="Adjust Expenses",
+                                    command = lambda: self.change_view(AdjustExpenses,
                                                                        budget=self.budget))
         graph_button.place(relx=0.68, rely=0.9, relwidth=0.11, relheight=0.08)
 
-        projections_button = ttk.Button(self.master, text="View associated projections",
-                                         command = lambda: self.change_view(self.master, Budget))
+        projections_button = ttk.Button(self, text="View associated projections",
+                                         command = lambda: self.change_view(Budget))
         projections_button.place(relx=0.38, rely=0.9, relwidth=0.24, relheight=0.08)
 
-        export_button = ttk.Button(self.master, text="Export as .csv",
-                                    command = lambda: self.change_view(self.master, Budget))
+        export_button = ttk.Button(self, text="Export as .csv",
+                                    command = self.export_csv)
         export_button.place(relx=0.2, rely=0.9, relwidth=0.1, relheight=0.08)
 
+    def export_csv(self) -> None:
+        """Asks user where to save the budget and exports it as .csv
+        on a worker thread
+        """
+        path = filedialog.asksaveasfilename(
+            parent=self.master,
+            defaultextension='.csv',
+            filetypes=[('CSV', '*.csv')],
+            initialfile=f'{self.budget}.csv'
+            )
+        if path:
+            self.run_task(self.write_csv, self.budget, path,
+                          done=lambda rows: logger.info('Exported %d rows to %s', rows, path))
+
+    def write_csv(self, task: tasks.Task, budget: str, path: str) -> int:
+        """Forecasts & writes a budget to a .csv file, runs on a worker thread
+
+        Returns:
+            int: number of rows written
+
+        """
+        import export
+        return export.export_budget(self.budget_database, budget, path)
+
 class AdjustAccounts(NewBudget):
     """Allows adjusting of accounts given a budget.
     Inherits from NewBudget to utilize the same screen
     with existing accounts already loaded in
     """
+    CACHED = True
+
     def __init__(
         self, master: tk.Tk, budget: Optional[str] = None,
         projections_database=None, budget_database=None
@@ -904,9 +1132,16 @@ class AdjustAccounts(NewBudget):
                 projections_database=projections_database,
                 budget_database=budget_database
                 )
-        self.accounts = json.loads(self.budget_database.get_accounts_by_name(budget))
+        self.refresh(budget=budget)
+
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Loads the accounts of budget, dropping changes which were not submitted"""
+        self.accounts = self.budget_database.get_accounts_by_name(budget)
+        self.name_entry.configure(state=tk.NORMAL)
+        self.name_entry.delete(0, tk.END)
         self.name_entry.insert(0, budget)
         self.name_entry.configure(state=tk.DISABLED)
+        self.warning.configure(text='')
         self.place_account_details()
 
     def submit_budget(self) -> None:
@@ -915,7 +1150,7 @@ class AdjustAccounts(NewBudget):
         self.submit_account()
         name = self.name_entry.get()
         if self.budget_database.update_accounts(name, self.accounts) is True:
-            self.change_view(self.master, ViewBudget, budget=self.name_entry.get())
+            self.change_view(ViewBudget, budget=self.name_entry.get())
         else:
             self.warning.configure(text='Could not update accounts')
 
@@ -924,6 +1159,8 @@ class AdjustExpenses(AddExpenses):
     Inherits from AddExpenses to utilize the same screen
     with existing accounts already loaded in.
     """
+    CACHED = True
+
     def __init__(
         self, master: tk.Tk, budget: Optional[str] = None,
         projections_database=None, budget_database=None
@@ -942,7 +1179,14 @@ class AdjustExpenses(AddExpenses):
                 projections_database=projections_database,
                 budget_database=budget_database
                 )
-        self.expenses = json.loads(self.budget_database.get_expenses_by_name(budget))
+        self.refresh(budget=budget)
+
+    def refresh(self, budget: Optional[str] = None, projection=None) -> None:
+        """Loads the expenses of budget, dropping changes which were not submitted"""
+        self.name = budget
+        self.heading.configure(text='Add Expenses to Budget "{}"'.format(self.name))
+        self.expenses = self.budget_database.get_expenses_by_name(budget)
+        self.warning.configure(text='')
         self.place_expense_details()
 
     # def submit(self):f
@@ -951,17 +1195,37 @@ class AdjustExpenses(AddExpenses):
     #     self.submit_expenses()
     #     name = self.name_entry.get()
     #     if self.budget_database.update_accounts(name, self.accounts) is True:
-    #         self.change_view(self.master, ViewBudget, budget=self.name_entry.get())
+    #         self.change_view(ViewBudget, budget=self.name_entry.get())
     #     else:
     #         self.warning.configure(text='Could not update accounts')
 
 # =================================================================
 
+def report_startup(budget: float = STARTUP_BUDGET) -> float:
+    """Returns the seconds since the GUI started and warns when it
+    took longer than budget
+
+    Args:
+        budget (float): seconds allowed for startup
+
+    Returns:
+        float: seconds since gui was imported
+
+    """
+    elapsed = time.perf_counter() - _STARTED
+    if elapsed > budget:
+        logger.warning('Startup took %.2fs, over the budget of %.2fs', elapsed, budget)
+    return elapsed
+
 def main():
+    logs.start()
     root = tk.Tk()
     root.resizable(False, False)
     app = Home(master=root)
+    # runs once the Home page has been drawn
+    root.after_idle(report_startup)
     app.mainloop()
+    root.tasks.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,5 +1,21 @@
+import os
+import subprocess
+import sys
+
 import gui
 
 def test_gui():
     result = gui.center(20, 10)
-    assert result == 340
\ No newline at end of file
+    assert result == 340
+
+def test_gui_import_is_light():
+    # a fresh interpreter, as modules imported by other tests are shared
+    code = ('import sys, gui; '
+            'print(",".join(m for m in ("matplotlib", "numpy", "predictions", "export") '
+            'if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                            text=True, check=True, cwd=os.path.dirname(os.path.abspath(gui.__file__)))
+    assert result.stdout.strip() == ''
+
+def test_report_startup():
+    assert gui.report_startup(budget=float('inf')) > 0
@@ -0,0 +1,202 @@
+"""Line items holds every account & expense of the database in memory as
+NumPy structured arrays, one row per line item ordered by budget. Text
+columns are stored as small integer codes, so filters and group-bys by
+budget over the whole database are vectorized and only read the columns
+they use.
+
+    items = line_items.load(budget_database)
+    savings = items.accounts['type'] == line_items.code(line_items.ACCOUNT_TYPES, 'Savings')
+    balances = items.group_sum('accounts', 'balance', where=savings)
+"""
+from typing import Optional, Union
+
+import numpy as np
+
+import forecast
+
+# codes of the Frequency column of expenses and the Compound column of accounts
+FREQUENCY_NAMES = (*forecast.FREQUENCIES, forecast.ONCE)
+# codes of the Type column of accounts, every type of the Add Account page
+ACCOUNT_TYPES = ('Cash', 'Checkings', 'Savings', '401k', 'Brokerage', 'Roth IRA',
+                 'Traditional IRA', 'Asset')
+# code of values which are not in the names of their column
+UNKNOWN = -1
+# occurrences per year of every frequency code, once & UNKNOWN (the last entry) never recur
+PER_YEAR = np.array([per_year for _, _, per_year in forecast.FREQUENCIES.values()] + [0, 0],
+                    dtype=np.float64)
+# rows fetched from sqlite at a time
+CHUNK_SIZE = 65536
+# NaT as an int64, the Date of expenses which recur
+NAT = np.iinfo(np.int64).min
+
+ACCOUNT_DTYPE = np.dtype([
+    ('id', np.int64), ('budget_id', np.int64), ('balance', np.float64),
+    ('interest', np.float64), ('compound', np.int8), ('type', np.int8)])
+EXPENSE_DTYPE = np.dtype([
+    ('id', np.int64), ('budget_id', np.int64), ('amount', np.float64),
+    ('frequency', np.int8), ('income', np.bool_), ('date', 'datetime64[D]')])
+# EXPENSE_DTYPE as read from sqlite, dates as days since 1970 which are then viewed as dates
+EXPENSE_ROW_DTYPE = np.dtype([
+    (name, np.int64 if name == 'date' else EXPENSE_DTYPE.fields[name][0])
+    for name in EXPENSE_DTYPE.names])
+
+def code(names: tuple, name: str) -> int:
+    """Returns the code of name in a column, UNKNOWN if it is not one of names"""
+    return names.index(name) if name in names else UNKNOWN
+
+def case(column: str, names: tuple) -> str:
+    """Returns an SQL expression giving the code of every value of a column"""
+    whens = ' '.join(f"WHEN '{name}' THEN {index}" for index, name in enumerate(names))
+    return f'CASE {column} {whens} ELSE {UNKNOWN} END'
+
+ACCOUNTS_COMMAND = f'''SELECT Account_id, Budget_id, COALESCE(Balance, 0), COALESCE(Interest, 0),
+                    {case('Compound', FREQUENCY_NAMES)}, {case('Type', ACCOUNT_TYPES)}
+                    FROM accounts ORDER BY Budget_id, Account_id'''
+EXPENSES_COMMAND = f'''SELECT Expense_id, Budget_id, ABS(COALESCE(Amount, 0)),
+                    {case('Frequency', FREQUENCY_NAMES)}, COALESCE(LOWER(Type) = 'income', 0),
+                    COALESCE(CAST(julianday(Date) - 2440587.5 AS INTEGER), {NAT})
+                    FROM expenses ORDER BY Budget_id, Expense_id'''
+
+def read(con, command: str, dtype: np.dtype, chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """Reads the rows of a query into a structured array, chunk_size rows at a time
+
+    Args:
+        con (sqlite3.Connection): connection of the database
+        command (str): query returning a value for every field of dtype, in order
+        dtype (np.dtype): structured dtype of the rows
+        chunk_size (int): rows fetched at a time
+
+    Returns:
+        np.ndarray: every row of the query
+
+    """
+    cursor = con.cursor()
+    try:
+        cursor.execute(command)
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=dtype))
+    finally:
+        cursor.close()
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+def load(budget_database, chunk_size: int = CHUNK_SIZE) -> 'LineItems':
+    """Reads every budget, account & expense of a database into columns
+
+    Args:
+        budget_database (BudgetDatabase): helper of the database
+        chunk_size (int): rows fetched from sqlite at a time
+
+    Returns:
+        LineItems: every line item of the database
+
+    """
+    con = budget_database.con
+    budgets = con.execute('SELECT Budget_id, Name FROM budgets ORDER BY Budget_id;').fetchall()
+    budget_ids = np.array([budget_id for budget_id, _ in budgets], dtype=np.int64)
+    names = np.array([name for _, name in budgets], dtype=object)
+    accounts = read(con, ACCOUNTS_COMMAND, ACCOUNT_DTYPE, chunk_size)
+    expenses = read(con, EXPENSES_COMMAND, EXPENSE_ROW_DTYPE, chunk_size).view(EXPENSE_DTYPE)
+    return LineItems(budget_ids, names, accounts, expenses)
+
+class LineItems():
+    """Accounts & expenses of many budgets as structured arrays ordered by budget"""
+    def __init__(
+        self, budget_ids: np.ndarray, names: np.ndarray,
+        accounts: np.ndarray, expenses: np.ndarray
+        ) -> None:
+        """
+        Args:
+            budget_ids (np.ndarray): sorted id of every budget
+            names (np.ndarray): name of every budget, aligned with budget_ids
+            accounts (np.ndarray): ACCOUNT_DTYPE rows ordered by budget_id
+            expenses (np.ndarray): EXPENSE_DTYPE rows ordered by budget_id
+
+        """
+        self.budget_ids = budget_ids
+        self.names = names
+        self.accounts = accounts
+        self.expenses = expenses
+        # position of the budget of every row in budget_ids, the key of group-bys
+        self.groups = {
+            'accounts': np.searchsorted(budget_ids, accounts['budget_id']),
+            'expenses': np.searchsorted(budget_ids, expenses['budget_id']),
+            }
+
+    def __len__(self) -> int:
+        """Returns the number of accounts & expenses"""
+        return len(self.accounts) + len(self.expenses)
+
+    def budget(self, budget_id: int) -> tuple:
+        """Returns the (accounts, expenses) rows of one budget, views of the columns"""
+        rows = []
+        for table in (self.accounts, self.expenses):
+            ids = table['budget_id']
+            rows.append(table[np.searchsorted(ids, budget_id, 'left'):
+                              np.searchsorted(ids, budget_id, 'right')])
+        return tuple(rows)
+
+    def group_sum(
+        self, table: str, values: Union[str, np.ndarray],
+        where: Optional[np.ndarray] = None
+        ) -> np.ndarray:
+        """Sums values of a table by budget
+
+        Args:
+            table (str): 'accounts' or 'expenses'
+            values (str | np.ndarray): field of the table, or a value for every row
+            where (np.ndarray): bool mask of the rows summed, every row if None
+
+        Returns:
+            np.ndarray: sum of every budget, aligned with budget_ids
+
+        """
+        groups = self.groups[table]
+        if isinstance(values, str):
+            values = getattr(self, table)[values]
+        if where is not None:
+            groups, values = groups[where], values[where]
+        # bincount returns ints when there are no rows at all
+        return np.bincount(groups, weights=values,
+                           minlength=len(self.budget_ids)).astype(np.float64, copy=False)
+
+    def group_count(self, table: str, where: Optional[np.ndarray] = None) -> np.ndarray:
+        """Counts the rows of a table by budget, see group_sum"""
+        groups = self.groups[table] if where is None else self.groups[table][where]
+        return np.bincount(groups, minlength=len(self.budget_ids))
+
+    def yearly_amounts(self) -> np.ndarray:
+        """Returns the cash flow of every expense in a year, positive for
+        income and negative for expenses. One time expenses count as 0."""
+        amounts = self.expenses['amount'] * PER_YEAR[self.expenses['frequency']]
+        return np.where(self.expenses['income'], amounts, -amounts)
+
+    def summary(self) -> np.ndarray:
+        """Returns one row per budget with the totals of its accounts & expenses
+
+        Returns:
+            np.ndarray: structured rows of budget_id, accounts, balance, interest
+                (balance weighted, in percent), expenses, yearly_income and
+                yearly_expenses, aligned with budget_ids
+
+        """
+        balances = self.group_sum('accounts', 'balance')
+        weighted = self.group_sum('accounts', self.accounts['balance'] * self.accounts['interest'])
+        yearly = self.yearly_amounts()
+        income = self.expenses['income']
+        summary = np.zeros(len(self.budget_ids), dtype=[
+            ('budget_id', np.int64), ('accounts', np.int64), ('balance', np.float64),
+            ('interest', np.float64), ('expenses', np.int64),
+            ('yearly_income', np.float64), ('yearly_expenses', np.float64)])
+        summary['budget_id'] = self.budget_ids
+        summary['accounts'] = self.group_count('accounts')
+        summary['balance'] = balances
+        summary['interest'] = np.divide(weighted, balances, out=np.zeros_like(weighted),
+                                        where=balances != 0)
+        summary['expenses'] = self.group_count('expenses')
+        summary['yearly_income'] = self.group_sum('expenses', yearly, where=income)
+        summary['yearly_expenses'] = -self.group_sum('expenses', yearly, where=~income)
+        return summary
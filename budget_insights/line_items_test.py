@@ -0,0 +1,46 @@
+import numpy as np
+
+import budget_dbhelper
+import line_items
+
+ACCOUNTS = [{'name': 'Checking', 'balance': 1000, 'interest': 0, 'type': 'Checkings', 'compound': 'Monthly'},
+            {'name': 'Savings', 'balance': 3000, 'interest': 4, 'type': 'Savings', 'compound': 'Daily'}]
+EXPENSES = [{'name': 'Rent', 'description': '', 'amount': 900, 'type': 'Expense', 'frequency': 'Monthly'},
+            {'name': 'Job', 'description': '', 'amount': 2000, 'type': 'Income', 'frequency': 'Bi Weekly'},
+            {'name': 'Car', 'description': '', 'amount': 5000, 'type': 'Expense', 'frequency': 'Once',
+             'date': '2030-05-01'}]
+
+def test_columns_and_group_bys(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    database.bulk_create_budgets([('home', ACCOUNTS), ('empty', []), ('cabin', ACCOUNTS[:1])])
+    database.update_expenses('home', EXPENSES)
+    items = line_items.load(database, chunk_size=2)
+    assert list(items.names) == ['home', 'empty', 'cabin'] and len(items) == 6
+    assert list(items.accounts['compound']) == [line_items.code(line_items.FREQUENCY_NAMES, 'Monthly'),
+                                                line_items.code(line_items.FREQUENCY_NAMES, 'Daily'),
+                                                line_items.code(line_items.FREQUENCY_NAMES, 'Monthly')]
+    assert items.expenses['date'][2] == np.datetime64('2030-05-01')
+    assert np.isnat(items.expenses['date'][:2]).all()
+    savings = items.accounts['type'] == line_items.code(line_items.ACCOUNT_TYPES, 'Savings')
+    assert list(items.group_sum('accounts', 'balance', where=savings)) == [3000, 0, 0]
+    summary = items.summary()
+    assert list(summary['accounts']) == [2, 0, 1]
+    assert list(summary['balance']) == [4000, 0, 1000]
+    assert summary['interest'][0] == 3
+    assert summary['yearly_income'][0] == 2000 * 26
+    assert summary['yearly_expenses'][0] == 900 * 12
+    accounts, expenses = items.budget(summary['budget_id'][0])
+    assert len(accounts) == 2 and len(expenses) == 3
+
+def test_empty_database(tmp_path):
+    items = line_items.load(budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db')))
+    assert len(items) == 0 and len(items.summary()) == 0
+
+def test_every_account_type_has_a_code(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    database.create_budget('home', [dict(ACCOUNTS[0], name='Stocks', type='Brokerage'),
+                                    dict(ACCOUNTS[0], name='Retirement', type='Roth IRA')])
+    items = line_items.load(database)
+    assert list(items.accounts['type']) == [line_items.code(line_items.ACCOUNT_TYPES, 'Brokerage'),
+                                            line_items.code(line_items.ACCOUNT_TYPES, 'Roth IRA')]
+    assert line_items.UNKNOWN not in items.accounts['type']
@@ -0,0 +1,93 @@
+"""Logs sends every log record through a queue to a listener thread, which
+formats it as one JSON object per line and writes it out. Threads which
+log, such as a bulk import failing on many rows, only put the record on
+the queue instead of waiting on the console or a file.
+
+    logs.start()                       # JSON lines on stderr
+    logs.start(logging.FileHandler('budget.log'))
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+# attributes every LogRecord has, anything else was passed with extra=
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message'}
+
+_listener = None
+_handler = None
+
+class StderrHandler(logging.StreamHandler):
+    """Writes to sys.stderr as it is when each record is written, which
+    may have been replaced since the handler was created"""
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """Puts records on the queue as they are. QueueHandler formats and copies
+    every record so it can be sent to another process, the listener of
+    start runs in this process, so that work is left to its thread."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a JSON object, with the fields passed to the
+    logger with extra= next to time, level, logger and message"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            }
+        entry.update((key, value) for key, value in vars(record).items()
+                     if key not in RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def start(handler: Optional[logging.Handler] = None, level: int = logging.INFO,
+          formatter: Optional[logging.Formatter] = None) -> logging.handlers.QueueListener:
+    """Routes the records of every logger through a queue to handler, once
+    per process. Later calls return the running listener.
+
+    Args:
+        handler (logging.Handler): writes the records, stderr if None
+        level (int): lowest level logged
+        formatter (logging.Formatter): formats the records, JsonFormatter if None
+
+    Returns:
+        logging.handlers.QueueListener: listener thread writing the records
+
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return _listener
+    handler = handler if handler is not None else StderrHandler()
+    handler.setFormatter(formatter if formatter is not None else JsonFormatter())
+    records = queue.SimpleQueue()
+    _handler = LocalQueueHandler(records)
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    # records still queued are written before the process exits
+    atexit.register(stop)
+    return _listener
+
+def stop() -> None:
+    """Writes the records still queued and stops the listener thread"""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    _listener = _handler = None
@@ -0,0 +1,21 @@
+import json
+import logging
+
+import logs
+
+def test_records_are_written_as_json_by_the_listener(tmp_path):
+    path = tmp_path / 'budget.log'
+    handler = logging.FileHandler(path)
+    logs.stop()
+    listener = logs.start(handler)
+    try:
+        assert logs.start() is listener
+        logging.getLogger('budget_dbhelper').warning(
+            'failed %s', 'home', extra={'operation': 'BudgetDatabase.create_budget'})
+    finally:
+        logs.stop()
+    handler.close()
+    entry = json.loads(path.read_text())
+    assert entry['level'] == 'WARNING' and entry['logger'] == 'budget_dbhelper'
+    assert entry['message'] == 'failed home'
+    assert entry['operation'] == 'BudgetDatabase.create_budget'
@@ -0,0 +1,266 @@
+"""Metrics times every method of the database helpers. Each call is
+counted in a latency histogram of its method along with the rows it
+returned or changed, and calls slower than SLOW_SECONDS are logged.
+The metrics of the process are exported as JSON or as Prometheus text.
+
+    @metrics.instrument
+    class BudgetDatabase(...):
+        ...
+
+    print(metrics.REGISTRY.to_prometheus())
+"""
+import bisect
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# upper bounds in seconds of the histogram buckets, +Inf is implied
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# calls slower than this many seconds are logged, 0 logs every call
+SLOW_SECONDS = float(os.environ.get('BUDGET_SLOW_QUERY_SECONDS', 0.1))
+# prefix of every exported Prometheus metric
+NAMESPACE = 'budget_db'
+
+class Histogram():
+    """Latency histogram, row count and error count of one method"""
+    def __init__(self, buckets: tuple = BUCKETS) -> None:
+        self.buckets = buckets
+        # calls in each bucket, the last counts calls slower than every bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, rows: int = 0, error: bool = False) -> None:
+        """Counts one call
+
+        Args:
+            seconds (float): duration of the call
+            rows (int): rows returned or changed by the call
+            error (bool): True if the call failed
+
+        """
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.errors += error
+
+    def quantile(self, fraction: float) -> float:
+        """Returns the upper bound of the bucket holding a quantile of the calls,
+        max if it is in the last bucket
+
+        Args:
+            fraction (float): quantile between 0 and 1, 0.5 for the median
+
+        Returns:
+            float: estimated duration in seconds, 0 if there were no calls
+
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Returns the histogram as a dict of plain values"""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'rows': self.rows,
+            'errors': self.errors,
+            'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], self.counts)),
+            }
+
+class Registry():
+    """Histograms of every instrumented method, shared by every thread"""
+    def __init__(self, slow_seconds: float = SLOW_SECONDS, buckets: tuple = BUCKETS) -> None:
+        """
+        Args:
+            slow_seconds (float): calls slower than this are logged, None logs none
+            buckets (tuple): upper bounds of the histogram buckets
+
+        """
+        self.slow_seconds = slow_seconds
+        self.buckets = buckets
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, method: str, seconds: float, rows: int = 0, error: bool = False) -> None:
+        """Counts one call of a method and logs it if it was slow
+
+        Args:
+            method (str): qualified name of the method
+            seconds (float): duration of the call
+            rows (int): rows returned or changed by the call
+            error (bool): True if the call failed
+
+        """
+        with self.lock:
+            histogram = self.histograms.get(method)
+            if histogram is None:
+                histogram = self.histograms[method] = Histogram(self.buckets)
+            histogram.observe(seconds, rows, error)
+        if self.slow_seconds is not None and seconds >= self.slow_seconds:
+            logger.warning('slow query %s took %.3fs, %d rows', method, seconds, rows)
+
+    def reset(self) -> None:
+        """Forgets every call counted so far"""
+        with self.lock:
+            self.histograms = {}
+
+    def to_dict(self) -> dict:
+        """Returns the histogram dict of every method, slowest total time first"""
+        with self.lock:
+            histograms = sorted(self.histograms.items(), key=lambda item: -item[1].sum)
+            return {method: histogram.to_dict() for method, histogram in histograms}
+
+    def to_json(self, indent: int = 2) -> str:
+        """Returns every histogram as JSON"""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Returns every histogram in the Prometheus text exposition format"""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            lines = [
+                f'# HELP {NAMESPACE}_call_seconds Duration of database helper calls',
+                f'# TYPE {NAMESPACE}_call_seconds histogram']
+            for method, histogram in histograms:
+                cumulative = 0
+                bounds = [repr(bound) for bound in histogram.buckets] + ['+Inf']
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{NAMESPACE}_call_seconds_bucket'
+                                 f'{{method="{method}",le="{bound}"}} {cumulative}')
+                lines.append(f'{NAMESPACE}_call_seconds_sum{{method="{method}"}} {histogram.sum!r}')
+                lines.append(f'{NAMESPACE}_call_seconds_count{{method="{method}"}} {histogram.count}')
+            for name, help_text in (('rows', 'Rows returned or changed by database helper calls'),
+                                    ('errors', 'Database helper calls which failed')):
+                lines.append(f'# HELP {NAMESPACE}_{name}_total {help_text}')
+                lines.append(f'# TYPE {NAMESPACE}_{name}_total counter')
+                lines += [f'{NAMESPACE}_{name}_total{{method="{method}"}} {getattr(histogram, name)}'
+                          for method, histogram in histograms]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """Writes every histogram to a file, as Prometheus text if path
+        ends with .prom or .txt, as JSON otherwise
+
+        Args:
+            path (str): path of the file
+
+        """
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+# registry of the process, used by instrument unless given another
+REGISTRY = Registry()
+
+def changes(helper) -> int:
+    """Returns the rows changed so far by the connection of the calling
+    thread, 0 for objects without a ConnectionManager"""
+    manager = getattr(helper, 'manager', None)
+    return manager.connection().total_changes if manager is not None else 0
+
+def result_rows(result) -> int:
+    """Returns the rows of a helper result, the length of a list or dict.
+    Ids and counts returned by helpers are not rows."""
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return 0
+
+def timed_generator(generator, registry: Registry, method: str, helper, changed: int):
+    """Yields the items of a generator returned by a helper. Only the time
+    spent inside the generator is counted, not the time of the caller
+    between items, and the call is observed once it is exhausted or closed."""
+    seconds = 0.0
+    rows = 0
+    error = False
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                seconds += time.perf_counter() - start
+            rows += 1
+            yield item
+    except Exception:
+        error = True
+        raise
+    finally:
+        generator.close()
+        registry.observe(method, seconds, rows + changes(helper) - changed, error)
+
+def timed(function, method: str, registry: Registry):
+    """Returns function wrapped to observe the duration and rows of every call
+
+    Args:
+        function (callable): method of a helper class
+        method (str): name the calls are counted under
+        registry (Registry): registry which counts the calls
+
+    Returns:
+        callable: wrapped method
+
+    """
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        changed = changes(self)
+        start = time.perf_counter()
+        try:
+            result = function(self, *args, **kwargs)
+        except Exception:
+            registry.observe(method, time.perf_counter() - start, error=True)
+            raise
+        seconds = time.perf_counter() - start
+        if inspect.isgenerator(result):
+            # iter_ helpers do their work while they are iterated
+            return timed_generator(result, registry, method, self, changed)
+        # helpers return False after handling an exception
+        registry.observe(method, seconds, result_rows(result) + changes(self) - changed,
+                         error=result is False)
+        return result
+    return wrapper
+
+def instrument(cls=None, registry: Registry = REGISTRY):
+    """Class decorator which times every public method defined by a class,
+    counted as "<class>.<method>". Inherited methods, properties and
+    static methods are left as they are.
+
+    Args:
+        cls (type): class to instrument
+        registry (Registry): registry which counts the calls
+
+    Returns:
+        type: cls, or a decorator if only registry was given
+
+    """
+    if cls is None:
+        return lambda cls: instrument(cls, registry)
+    for name, value in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(value):
+            continue
+        setattr(cls, name, timed(value, f'{cls.__name__}.{name}', registry))
+    return cls
@@ -0,0 +1,38 @@
+import json
+import logging
+
+import budget_dbhelper
+import metrics
+
+def test_helper_calls_are_timed_with_rows(tmp_path):
+    registry = metrics.REGISTRY
+    registry.reset()
+    budget_database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    accounts = [{'name': f'Account {index}', 'balance': 10, 'interest': 0,
+                 'type': 'Savings', 'compound': 'Monthly'} for index in range(3)]
+    assert budget_database.create_budget('home', accounts)
+    assert len(budget_database.get_accounts_by_name('home')) == 3
+    assert budget_database.get_id_by_name('missing') is False
+    assert len(list(budget_database.iter_budget_summaries())) == 1
+    timings = json.loads(registry.to_json())
+    # the budget row and its 3 accounts
+    assert timings['BudgetDatabase.create_budget']['rows'] == 4
+    assert timings['BudgetDatabase.get_accounts_by_name']['rows'] == 3
+    assert timings['BudgetDatabase.get_id_by_name']['errors'] == 1
+    assert timings['BudgetDatabase.iter_budget_summaries']['count'] == 1
+    assert timings['BudgetDatabase.iter_budget_summaries']['rows'] == 1
+
+def test_prometheus_text_and_slow_calls(caplog):
+    registry = metrics.Registry(slow_seconds=0.05, buckets=(0.01, 0.1))
+    registry.observe('Helper.fast', 0.001, rows=2)
+    with caplog.at_level(logging.WARNING, logger='metrics'):
+        registry.observe('Helper.slow', 0.5)
+    assert [record.getMessage() for record in caplog.records] == [
+        'slow query Helper.slow took 0.500s, 0 rows']
+    text = registry.to_prometheus()
+    assert 'budget_db_call_seconds_bucket{method="Helper.fast",le="0.01"} 1' in text
+    assert 'budget_db_call_seconds_bucket{method="Helper.slow",le="0.1"} 0' in text
+    assert 'budget_db_call_seconds_bucket{method="Helper.slow",le="+Inf"} 1' in text
+    assert 'budget_db_call_seconds_count{method="Helper.slow"} 1' in text
+    assert 'budget_db_rows_total{method="Helper.fast"} 2' in text
+    assert list(registry.to_dict()) == ['Helper.slow', 'Helper.fast']
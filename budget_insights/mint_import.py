@@ -0,0 +1,121 @@
+"""Mint import reads transactions exported from Mint as .csv and stores
+them as one time expenses & income of a budget. Files are parsed and
+written a fixed number of rows at a time, so memory stays bounded no
+matter how long the transaction history is.
+"""
+import csv
+import datetime
+import itertools
+import os
+from typing import Callable, Iterator, Optional
+
+import forecast
+
+# header of a Mint transactions export
+MINT_COLUMNS = ('Date', 'Description', 'Original Description', 'Amount',
+                'Transaction Type', 'Category', 'Account Name', 'Labels', 'Notes')
+CHUNK_SIZE = 5000
+
+class _ByteCounter():
+    """Decodes the lines of a binary file for csv.reader while counting
+    how many bytes were read, as text files can not tell() while iterated"""
+    def __init__(self, file) -> None:
+        self.file = file
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[str]:
+        encoding = 'utf-8-sig'
+        for line in self.file:
+            self.bytes_read += len(line)
+            yield line.decode(encoding)
+            # only the first line can start with a byte order mark
+            encoding = 'utf-8'
+
+def transaction_to_expense(row: dict, line: int) -> dict:
+    """Maps a Mint transaction to the expense dict used by AddExpenses
+
+    Args:
+        row (dict): transaction, keyed by MINT_COLUMNS
+        line (int): row of the transaction in the file, keeps names unique
+
+    Returns:
+        dict: expense with 'Once' frequency on the date of the transaction
+
+    """
+    date = datetime.datetime.strptime(row['Date'].strip(), '%m/%d/%Y').date().isoformat()
+    amount = abs(float(row['Amount'].replace(',', '').replace('$', '')))
+    return {
+        # importing the same file again updates the same rows
+        'name': f"{row['Description']} {date} #{line}",
+        'description': row.get('Category') or row.get('Original Description') or '',
+        'amount': amount,
+        'type': 'Income' if row['Transaction Type'].strip().lower() == 'credit' else 'Expense',
+        'frequency': forecast.ONCE,
+        'date': date
+        }
+
+def read_chunks(file, chunk_size: int = CHUNK_SIZE) -> Iterator[list]:
+    """Parses a Mint export chunk_size transactions at a time
+
+    Args:
+        file (Iterable): lines of the .csv file
+        chunk_size (int): number of transactions per chunk
+
+    Yields:
+        list: expense dicts of the next chunk of transactions
+
+    """
+    reader = csv.DictReader(file)
+    missing = set(MINT_COLUMNS[:5]) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f'Not a Mint export, missing columns {sorted(missing)}')
+    # row 1 is the header
+    rows = enumerate(reader, start=2)
+    while True:
+        chunk = [transaction_to_expense(row, line)
+                 for line, row in itertools.islice(rows, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+def import_mint(
+    budget_database, budget: str, path: str, chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[int, int, int], None]] = None
+    ) -> int:
+    """Imports a Mint export into a budget, creating the budget if needed.
+    Every chunk is written with one executemany and one commit. The header
+    and first chunk are read before the budget is created, so a file which
+    is not a Mint export leaves the database as it was.
+
+    Args:
+        budget_database (BudgetDatabase): helper for budget database
+        budget (str): name of budget
+        path (str): path of the Mint .csv export
+        chunk_size (int): number of transactions per chunk
+        progress (Callable): called after every chunk with
+            (transactions imported, bytes read, size of file)
+
+    Returns:
+        int: number of transactions imported
+
+    Raises:
+        ValueError: if the file is not a Mint export or a transaction can not be read
+
+    """
+    total = os.path.getsize(path)
+    imported = 0
+    with open(path, 'rb') as file:
+        lines = _ByteCounter(file)
+        chunks = read_chunks(lines, chunk_size)
+        first = next(chunks, None)
+        budget_database.create_budget(budget, [])
+        budget_id = budget_database.get_id_by_name(budget)
+        if budget_id is False:
+            raise ValueError(f'Could not create budget {budget}')
+        for chunk in itertools.chain([first] if first else [], chunks):
+            with budget_database.transaction():
+                budget_database.insert_expenses(budget_id, chunk)
+            imported += len(chunk)
+            if progress is not None:
+                progress(imported, lines.bytes_read, total)
+    return imported
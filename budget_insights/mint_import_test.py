@@ -0,0 +1,37 @@
+import pytest
+
+import budget_dbhelper
+import mint_import
+
+MINT_CSV = '''"Date","Description","Original Description","Amount","Transaction Type","Category","Account Name","Labels","Notes"
+"1/05/2022","Coffee Shop","COFFEE SHOP #12","4.50","debit","Coffee Shops","Checking","",""
+"1/06/2022","Employer","EMPLOYER PAYROLL","1,500.00","credit","Paycheck","Checking","",""
+"1/06/2022","Coffee Shop","COFFEE SHOP #12","3.25","debit","Coffee Shops","Checking","",""
+'''
+
+def test_import_mint(tmp_path):
+    path = tmp_path / 'transactions.csv'
+    path.write_text(MINT_CSV, encoding='utf-8')
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    calls = []
+    imported = mint_import.import_mint(
+        database, 'mint', str(path), chunk_size=2,
+        progress=lambda *args: calls.append(args))
+    assert imported == 3
+    assert [call[0] for call in calls] == [2, 3]
+    assert calls[-1][1] == calls[-1][2]
+    expenses = database.get_expenses_by_name('mint')
+    assert expenses[1] == {
+        'name': 'Employer 2022-01-06 #3', 'description': 'Paycheck', 'amount': 1500.0,
+        'type': 'Income', 'frequency': 'Once', 'date': '2022-01-06'}
+    # importing again updates the same rows
+    mint_import.import_mint(database, 'mint', str(path))
+    assert len(database.get_expenses_by_name('mint')) == 3
+
+def test_not_a_mint_export(tmp_path):
+    path = tmp_path / 'other.csv'
+    path.write_text('"Date","Amount"\n"1/05/2022","4.50"\n', encoding='utf-8')
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    with pytest.raises(ValueError):
+        mint_import.import_mint(database, 'mint', str(path))
+    assert database.get_id_by_name('mint') is False
@@ -0,0 +1,322 @@
+"""Monte Carlo forecasts a budget along thousands of random paths.
+Interest rates wander, income varies and unexpected expenses strike, each
+sampled for every path and period at once as paths x periods arrays.
+Paths are simulated in chunks, across a process pool when there are
+many, and gathered period by path so the percentiles of every period are
+taken over all paths. Totals too large for memory are kept in a
+temporary file, so memory stays bounded however many paths are run.
+"""
+import collections
+import concurrent.futures
+import datetime
+import multiprocessing
+import os
+import tempfile
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+
+import forecast
+
+# percentiles of the net worth reported for every period
+PERCENTILES = (5, 25, 50, 75, 95)
+# bytes of each paths x periods array of a chunk, a chunk holds a few of them.
+# about 5800 paths of a 30 year monthly forecast, 100 of a daily one
+CHUNK_BYTES = 16 * 1024 * 1024
+# paths sampled from one seed, chunks hold whole blocks so the paths
+# only depend on the seed, never on the chunk size
+BLOCK_PATHS = 100
+# the totals of every path are kept in memory up to this size, in a temporary file past it
+RESULT_BYTES = 256 * 1024 * 1024
+# chunks queued for every worker, the rest are not submitted yet
+CHUNKS_PER_WORKER = 2
+
+class Scenario:
+    """Uncertainty sampled by a simulation"""
+    def __init__(
+        self, rate_sd: float = 1.0, income_sd: float = 0.1,
+        shocks_per_year: float = 0.5, shock_size: float = 1000.0
+        ) -> None:
+        """
+        Args:
+            rate_sd (float): yearly change of interest rates, in percentage points.
+                Rates of every account with interest move together as a random walk
+            income_sd (float): relative standard deviation of income in every period
+            shocks_per_year (float): expected number of unexpected expenses a year
+            shock_size (float): average amount of an unexpected expense
+
+        """
+        self.rate_sd = rate_sd
+        self.income_sd = income_sd
+        self.shocks_per_year = shocks_per_year
+        self.shock_size = shock_size
+
+class Simulation:
+    """Result of a simulation. Every series shares the ``dates`` axis."""
+    def __init__(
+        self, dates: np.ndarray, paths: int, percentiles: tuple,
+        bands: np.ndarray, mean: np.ndarray
+        ) -> None:
+        """
+        Args:
+            dates (np.ndarray): datetime64[D] date of every period
+            paths (int): number of paths simulated
+            percentiles (tuple): percentile of every row of bands
+            bands (np.ndarray): percentiles x periods net worth
+            mean (np.ndarray): mean net worth of every period
+
+        """
+        self.dates = dates
+        self.paths = paths
+        self.percentiles = percentiles
+        self.bands = bands
+        self.mean = mean
+
+    def band(self, percentile: int) -> np.ndarray:
+        """Returns the net worth at a percentile for every period
+
+        Args:
+            percentile (int): one of percentiles
+
+        Returns:
+            np.ndarray: net worth of every period
+
+        """
+        return self.bands[self.percentiles.index(percentile)]
+
+def chunk_paths(years: int, resolution: str, chunk_bytes: int = CHUNK_BYTES) -> int:
+    """Returns the number of paths simulated together, whole blocks of
+    BLOCK_PATHS so each paths x periods array of a chunk fits in chunk_bytes
+
+    Args:
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        chunk_bytes (int): bytes of each paths x periods array
+
+    Returns:
+        int: paths of a chunk, at least one block
+
+    """
+    periods = forecast.count_periods(years, resolution)
+    paths = chunk_bytes // (np.dtype(np.float64).itemsize * periods)
+    return max(1, paths // BLOCK_PATHS) * BLOCK_PATHS
+
+def simulate(
+    accounts: list, expenses: Optional[list] = None, paths: int = 10000,
+    years: int = 30, resolution: str = 'monthly', start: Optional[datetime.date] = None,
+    scenario: Optional[Scenario] = None, seed: Optional[int] = None,
+    chunk_size: Optional[int] = None, workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+    ) -> Simulation:
+    """Simulates the net worth of a budget along random paths
+
+    Percentiles and the mean are taken over every path at once, and every
+    block of paths has its own seed, so results only depend on seed and
+    paths, not on chunk_size or workers.
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        paths (int): number of paths
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast, defaults to today
+        scenario (Scenario): uncertainty sampled, defaults to Scenario()
+        seed (int): seed of the random paths, random if None
+        chunk_size (int): maximum number of paths simulated together, rounded
+            down to whole blocks of BLOCK_PATHS, see chunk_paths if None
+        workers (int): processes used, defaults to one per core.
+            Chunks run in this process if 1 or there is a single chunk
+        progress (Callable): called with (chunks done, chunks) after every
+            chunk, an exception raised by it stops the simulation
+
+    Returns:
+        Simulation: percentiles and mean of the net worth for every period
+
+    """
+    if start is None:
+        start = datetime.date.today()
+    if scenario is None:
+        scenario = Scenario()
+    if chunk_size is None:
+        chunk_size = chunk_paths(years, resolution)
+    jobs = [(accounts, expenses or [], blocks, years, resolution, start, scenario)
+            for blocks in plan_chunks(paths, chunk_size, seed)]
+    periods = forecast.count_periods(years, resolution)
+    bands, mean = reduce_paths(run_chunks(jobs, workers, progress), paths, periods)
+    dates, _, _ = forecast.time_axis(periods, resolution, start)
+    return Simulation(dates=dates, paths=paths, percentiles=PERCENTILES, bands=bands, mean=mean)
+
+def plan_chunks(paths: int, chunk_size: int, seed: Optional[int] = None) -> list:
+    """Splits paths into blocks of BLOCK_PATHS with a seed each, then
+    groups the blocks into chunks of at most chunk_size paths
+
+    Args:
+        paths (int): number of paths
+        chunk_size (int): maximum number of paths of a chunk, at least one block
+        seed (int): seed of the random paths, random if None
+
+    Returns:
+        list: (paths, np.random.SeedSequence) of every block of every chunk
+
+    """
+    sizes = [min(BLOCK_PATHS, paths - first) for first in range(0, paths, BLOCK_PATHS)]
+    blocks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    per_chunk = max(1, chunk_size // BLOCK_PATHS)
+    return [blocks[first:first + per_chunk] for first in range(0, len(blocks), per_chunk)]
+
+def run_chunks(
+    jobs: list, workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[np.ndarray]:
+    """Simulates chunks in order, across a process pool when there are
+    several. Only a few chunks are in flight per worker, see CHUNKS_PER_WORKER.
+
+    Args:
+        jobs (list): arguments of simulate_chunk for every chunk
+        workers (int): processes used, defaults to one per core
+        progress (Callable): see simulate
+
+    Yields:
+        np.ndarray: paths x periods net worth of every chunk
+
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        for done, job in enumerate(jobs, 1):
+            yield simulate_chunk(*job)
+            if progress is not None:
+                progress(done, len(jobs))
+        return
+    # simulations start from worker threads of the GUI, forking a process
+    # which runs Tk and holds sqlite connections is not safe
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = collections.deque()
+        done = 0
+        try:
+            for index, job in enumerate(jobs):
+                pending.append(executor.submit(simulate_chunk, *job))
+                # the last job drains the queue
+                while pending and (len(pending) >= workers * CHUNKS_PER_WORKER
+                                   or index == len(jobs) - 1):
+                    yield pending.popleft().result()
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(jobs))
+        except BaseException:
+            # chunks which have not started are dropped instead of waited for
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+def simulate_chunk(
+    accounts: list, expenses: list, blocks: list, years: int, resolution: str,
+    start: datetime.date, scenario: Scenario
+    ) -> np.ndarray:
+    """Simulates one chunk of paths, see simulate
+
+    Args:
+        blocks (list): (paths, np.random.SeedSequence) of every block, see plan_chunks
+
+    Returns:
+        np.ndarray: paths x periods net worth
+
+    """
+    return np.concatenate([sample_paths(accounts, expenses, paths, years, resolution, start,
+                                        scenario, np.random.default_rng(seed))
+                           for paths, seed in blocks])
+
+def reduce_paths(chunks: Iterator[np.ndarray], paths: int, periods: int) -> tuple:
+    """Gathers the chunks of every path into a periods x paths array, kept in
+    a temporary file past RESULT_BYTES, then takes the percentiles and mean
+    of each period over all paths, a few periods at a time
+
+    Args:
+        chunks (Iterator): paths x periods net worth of every chunk, in order
+        paths (int): number of paths of every chunk together
+        periods (int): number of periods
+
+    Returns:
+        tuple: (percentiles x periods net worth, mean net worth of every period)
+
+    """
+    itemsize = np.dtype(np.float64).itemsize
+    bands = np.empty((len(PERCENTILES), periods), dtype=np.float64)
+    mean = np.empty(periods, dtype=np.float64)
+    with tempfile.TemporaryDirectory() as scratch:
+        if paths * periods * itemsize <= RESULT_BYTES:
+            totals = np.empty((periods, paths), dtype=np.float64)
+        else:
+            totals = np.lib.format.open_memmap(os.path.join(scratch, 'totals.npy'), mode='w+',
+                                               dtype=np.float64, shape=(periods, paths))
+        first = 0
+        for chunk in chunks:
+            totals[:, first:first + len(chunk)] = chunk.T
+            first += len(chunk)
+        step = max(1, CHUNK_BYTES // (itemsize * paths))
+        for row in range(0, periods, step):
+            rows = np.asarray(totals[row:row + step])
+            bands[:, row:row + step] = np.percentile(rows, PERCENTILES, axis=1)
+            mean[row:row + step] = rows.mean(axis=1)
+        del totals
+    return bands, mean
+
+def sample_paths(
+    accounts: list, expenses: list, paths: int, years: int, resolution: str,
+    start: datetime.date, scenario: Scenario, rng: np.random.Generator
+    ) -> np.ndarray:
+    """Samples the net worth of a budget along random paths
+
+    Args:
+        accounts (list): account dicts as stored by BudgetDatabase
+        expenses (list): expense dicts as stored by BudgetDatabase
+        paths (int): number of paths
+        years (int): length of the forecast in years
+        resolution (str): 'daily' or 'monthly'
+        start (date): first date of the forecast
+        scenario (Scenario): uncertainty sampled
+        rng (np.random.Generator): source of the random paths
+
+    Returns:
+        np.ndarray: paths x periods net worth
+
+    """
+    periods = forecast.count_periods(years, resolution)
+    dates, days, months = forecast.time_axis(periods, resolution, start)
+    totals = np.zeros((paths, periods), dtype=np.float64)
+
+    # rates move by a random walk once a year, shared by every account
+    walk = np.cumsum(rng.normal(0, scenario.rate_sd, (paths, months[-1] // 12 + 1)), axis=1)
+    walk = walk[:, months // 12] - walk[:, :1]
+    for account in accounts:
+        balance = float(account['balance'])
+        rate = float(account['interest'])
+        if rate == 0 or balance == 0:
+            totals += balance
+            continue
+        compound = str(account['compound'])
+        per_year = forecast.FREQUENCIES[compound][2]
+        counts = forecast.occurrences([compound], days, months)[0]
+        new = np.diff(counts, prepend=0)
+        # rates can fall to zero but never below
+        growth = np.log1p(np.maximum(rate + walk, 0) / 100 / per_year) * new
+        totals += balance * np.exp(np.cumsum(growth, axis=1))
+
+    expenses = forecast.upcoming(expenses, start)
+    flows = np.diff(forecast.expense_totals(expenses, days, months, dates), axis=1, prepend=0)
+    income = flows[flows.sum(axis=1) > 0].sum(axis=0)
+    # income of every period varies around its amount, but is never negative
+    cash = np.tile(flows.sum(axis=0) - income, (paths, 1))
+    if income.any():
+        cash += income * np.maximum(rng.normal(1, scenario.income_sd, (paths, periods)), 0)
+    # unexpected expenses arrive as a Poisson process, each costing an exponential amount
+    shocks = rng.poisson(scenario.shocks_per_year / forecast.RESOLUTIONS[resolution],
+                         (paths, periods))
+    # the first period is the budget as it stands
+    shocks[:, 0] = 0
+    struck = shocks > 0
+    cash[struck] -= rng.gamma(shocks[struck], scenario.shock_size)
+    totals += np.cumsum(cash, axis=1)
+    return totals
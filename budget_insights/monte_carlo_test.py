@@ -0,0 +1,53 @@
+import datetime
+
+import numpy as np
+
+import forecast
+import monte_carlo
+
+START = datetime.date(2022, 1, 15)
+ACCOUNTS = [
+    {'name': 'Savings', 'balance': 10000, 'interest': 5, 'compound': 'Monthly'},
+    {'name': 'Checking', 'balance': 2000, 'interest': 0, 'compound': 'Monthly'},
+    ]
+EXPENSES = [
+    {'name': 'Rent', 'amount': 1500, 'type': 'Expense', 'frequency': 'Monthly'},
+    {'name': 'Job', 'amount': 1000, 'type': 'Income', 'frequency': 'Weekly'},
+    ]
+
+def test_without_uncertainty_matches_forecast():
+    certain = monte_carlo.Scenario(rate_sd=0, income_sd=0, shocks_per_year=0)
+    result = monte_carlo.simulate(ACCOUNTS, EXPENSES, paths=100, years=5, start=START,
+                                  scenario=certain, seed=1, workers=1)
+    total = forecast.forecast(ACCOUNTS, EXPENSES, years=5, start=START).total
+    assert np.allclose(result.mean, total)
+    assert np.allclose(result.bands, total)
+
+def test_bands_are_ordered_and_independent_of_workers():
+    kwargs = {'paths': 300, 'years': 5, 'start': START, 'seed': 7, 'chunk_size': 100}
+    result = monte_carlo.simulate(ACCOUNTS, EXPENSES, workers=1, **kwargs)
+    assert result.bands.shape == (len(monte_carlo.PERCENTILES), len(result.dates))
+    assert (np.diff(result.bands[:, -1]) > 0).all()
+    assert np.allclose(result.bands[:, 0], 12000)
+    pooled = monte_carlo.simulate(ACCOUNTS, EXPENSES, workers=2, **kwargs)
+    assert np.array_equal(result.bands, pooled.bands)
+
+def test_bands_do_not_depend_on_chunks(monkeypatch):
+    kwargs = {'paths': 450, 'years': 5, 'start': START, 'seed': 3, 'workers': 1}
+    result = monte_carlo.simulate(ACCOUNTS, EXPENSES, chunk_size=100, **kwargs)
+    for chunk_size in (200, 1000, None):
+        other = monte_carlo.simulate(ACCOUNTS, EXPENSES, chunk_size=chunk_size, **kwargs)
+        assert np.array_equal(result.bands, other.bands)
+        assert np.allclose(result.mean, other.mean)
+    # totals past RESULT_BYTES go through a temporary file
+    monkeypatch.setattr(monte_carlo, 'RESULT_BYTES', 1)
+    spilled = monte_carlo.simulate(ACCOUNTS, EXPENSES, chunk_size=200, **kwargs)
+    assert np.array_equal(result.bands, spilled.bands)
+
+def test_chunks_shrink_as_the_horizon_grows():
+    monthly = monte_carlo.chunk_paths(30, 'monthly')
+    daily = monte_carlo.chunk_paths(30, 'daily')
+    assert daily < monthly and daily % monte_carlo.BLOCK_PATHS == 0
+    periods = forecast.count_periods(30, 'daily')
+    assert daily * periods * 8 <= monte_carlo.CHUNK_BYTES
+    assert monte_carlo.chunk_paths(30, 'daily', chunk_bytes=1) == monte_carlo.BLOCK_PATHS
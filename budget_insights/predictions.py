@@ -1,95 +1,172 @@
 """Predictions displays budget tables and graphs"""
-import json
-import matplotlib
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
+import copy
 import numpy as np
-import random
-import datetime
-import sys
 import tkinter as tk
+from typing import Callable, Optional
 
 import budget_dbhelper
-
-matplotlib.use("TkAgg")
-# tkinter colors in hex
-SLATEGRAY3 = '#9FB6CD'
-SLATEGRAY4 = '#6C7B8B'
+import chart
+import events
+import forecast
+import forecast_cache
+import monte_carlo
+import records
 
 class BudgetPredictions:
     """Generates budget graphs & tables for viewing
     """
-    def __init__(self, name: str, master: tk.Tk) -> None:
+    def __init__(
+        self, name: str, master: tk.Tk,
+        years: int = 30, resolution: str = 'monthly', budget_database=None,
+        projection_events: Optional[list] = None
+        ) -> None:
         """
         Args:
             master (tk.Tk): root of GUI
             name (str): name of budget
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly' forecast periods
+            budget_database (BudgetDatabase): helper for budget database
+            projection_events (list): events of a projection applied to the budget
 
         """
-        self.budget_database = budget_dbhelper.BudgetDatabase()
+        if budget_database is None:
+            budget_database = budget_dbhelper.BudgetDatabase()
+        self.budget_database = budget_database
         self.budget = self.budget_database.get_by_name(name)
-        self.accounts = json.loads(self.budget[3])
-        if self.budget[4] is not None:
-            self.expenses = json.loads(self.budget[4])
-        else:
-            self.expenses = []
+        # records parse numbers once & are smaller than dicts, see records.py
+        self.accounts = self.budget_database.get_account_records(name)
+        self.expenses = self.budget_database.get_expense_records(name)
+        if self.budget is False or self.accounts is False or self.expenses is False:
+            # the helper logged the failure, it is raised to the task running the forecast
+            raise self.budget_database.last_error
         self.master = master
-        self.canvas = None
+        # created on the main loop when first drawn, see show_chart
+        self.chart = None
+        self.years = years
+        self.resolution = resolution
+        self.cache = forecast_cache.ForecastCache(manager=self.budget_database.manager)
+        if projection_events:
+            self.forecast = events.project(self.accounts, self.expenses, projection_events,
+                                           years=years, resolution=resolution)
+            self.model = None
+        else:
+            # reopening a budget reads its forecast instead of computing it
+            self.forecast = self.cache.forecast(
+                self.budget[0], self.accounts, self.expenses, years, resolution)
+            # keeps every account & expense series, see update
+            self.model = forecast.ForecastModel.from_forecast(
+                self.forecast, self.accounts, self.expenses, years, resolution)
+
+    def update(self, accounts: list, expenses: list) -> int:
+        """Forecasts again after accounts or expenses were adjusted,
+        recomputing only the line items which changed
+
+        Args:
+            accounts (list): every account dict or record of the budget
+            expenses (list): every expense dict or record of the budget
+
+        Returns:
+            int: number of accounts & expenses recomputed or removed
+
+        """
+        accounts = [records.Account.from_dict(account) for account in accounts]
+        expenses = [records.Expense.from_dict(expense) for expense in expenses]
+        changed = self.model.update_accounts(accounts) + self.model.update_expenses(expenses)
+        self.accounts = accounts
+        self.expenses = expenses
+        self.forecast = self.model.result()
+        if changed:
+            self.cache.put(
+                forecast_cache.cache_key(accounts, expenses, self.years, self.resolution),
+                self.budget[0], self.forecast)
+        return changed
+
+    def updated(self, accounts: list, expenses: list) -> Optional['BudgetPredictions']:
+        """Forecasts a copy of the predictions again after accounts or expenses
+        were adjusted, see update. These predictions are left as they are,
+        so they can still be drawn while the copy is computed.
+
+        Args:
+            accounts (list): every account dict or record of the budget
+            expenses (list): every expense dict or record of the budget
+
+        Returns:
+            BudgetPredictions: the new predictions, None if nothing changed
+
+        """
+        prediction = copy.copy(self)
+        prediction.model = self.model.copy()
+        return prediction if prediction.update(accounts, expenses) else None
+
+    def show_chart(self) -> chart.Chart:
+        """Returns the chart of the budget, creating it the first time.
+        Runs on the main loop, as the chart is a Tk widget.
+
+        Returns:
+            Chart: figure & canvas every view is drawn on
+
+        """
+        if self.chart is None:
+            self.chart = chart.Chart(self.master)
+            self.chart.style(chart.BAR, ylabel='Balance')
+        self.chart.place(relx=0.05, rely=0.15, relwidth=0.9, relheight=0.6)
+        return self.chart
 
     def view_bar(self) -> None:
         """Displays a bar graph of budget.
         """
-        # clear any previous displays
-        if isinstance(self.canvas, FigureCanvasTkAgg):
-            if self.canvas.get_tk_widget():
-                self.canvas.get_tk_widget().destroy()
-        x = []
-        y = []
-        for account in self.accounts:
-            x.append(account['name'])
-            y.append(int(account['balance']))
-        y = np.array(y)
-
-        figure = Figure()
-        figure.patch.set_color(SLATEGRAY3)
-
-        subplot = figure.add_subplot(111)
-        subplot.bar(x, y, width = 0.72, label = 'Accounts', color=SLATEGRAY4)
-        subplot.set_ylabel('Balance')
-        subplot.yaxis.label.set_color(color='white')
-        subplot.spines['top'].set_color('none')
-        subplot.spines['bottom'].set_color('white')
-        subplot.spines['left'].set_color('white')
-        subplot.spines['right'].set_color('none')
-        subplot.patch.set_color(SLATEGRAY3)
-        subplot.tick_params(colors='white', top=False, bottom=False, left=True, right=False)
-
-        figure.tight_layout()
-
-        self.canvas = FigureCanvasTkAgg(figure, self.master)
-        self.canvas.get_tk_widget().place(relx=0.05, rely=0.15, relwidth=0.9, relheight=0.6)
+        budget_chart = self.show_chart()
+        budget_chart.bar(chart.BAR, [account['name'] for account in self.accounts],
+                         np.array([account['balance'] for account in self.accounts], dtype=np.float64),
+                         width=0.72, label='Accounts', color=chart.SLATEGRAY4)
+        budget_chart.show(chart.BAR)
 
     def view_graph(self) -> None:
         """Displays a graph of budget.
         """
-        # clear any previous displays
-        if isinstance(self.canvas, FigureCanvasTkAgg):
-            if self.canvas.get_tk_widget():
-                self.canvas.get_tk_widget().destroy()
-        # x = (datetime.datetime.now() + datetime.timedelta(hours=1))
-        y = (1,2,3,4)
-        y2 = (4,5,6,8.5)
-        x = [datetime.datetime.now() + datetime.timedelta(minutes=i) for i in range(4)]
-        # y = [i+random.gauss(0,1) for i,_ in enumerate(x)]
-
-        figure = Figure()
-        figure.patch.set_color(SLATEGRAY3)
-        subplot = figure.add_subplot(111)
-        subplot.plot(x, y, label='line 1')
-        subplot.plot(x, y2, label='line 2')
-        figure.tight_layout()
-        # subplot.gcf().autofmt_xdate()
-        # subplot.show()
-        self.canvas = FigureCanvasTkAgg(figure, self.master)
-        self.canvas.get_tk_widget().place(relx=0.05, rely=0.15, relwidth=0.9, relheight=0.6)
\ No newline at end of file
+        budget_chart = self.show_chart()
+        series = [('Total', self.forecast.total, {'color': 'white'})]
+        series += [(name, balances, {}) for name, balances in
+                   zip(self.forecast.account_names, self.forecast.account_balances)]
+        budget_chart.plot(chart.GRAPH, self.forecast.dates, series)
+        budget_chart.show(chart.GRAPH)
+
+    def simulate(
+        self, paths: int = 10000, progress: Optional[Callable[[int, int], None]] = None
+        ) -> monte_carlo.Simulation:
+        """Simulates the budget along random paths, without drawing, so it
+        can run off the main loop
+
+        Args:
+            paths (int): number of paths simulated
+            progress (Callable): see monte_carlo.simulate
+
+        Returns:
+            Simulation: percentiles of the net worth for every period
+
+        """
+        return monte_carlo.simulate(self.accounts, self.expenses, paths=paths, years=self.years,
+                                    resolution=self.resolution, progress=progress)
+
+    def view_monte_carlo(self, simulation: Optional[monte_carlo.Simulation] = None) -> None:
+        """Displays percentile bands of the budget simulated along random paths
+
+        Args:
+            simulation (Simulation): simulation to display, simulated if None
+
+        """
+        if simulation is None:
+            simulation = self.simulate()
+        budget_chart = self.show_chart()
+        budget_chart.fill(chart.MONTE_CARLO, simulation.dates, [
+            ('5-95%', simulation.band(5), simulation.band(95),
+             {'color': chart.SLATEGRAY4, 'alpha': 0.4}),
+            ('25-75%', simulation.band(25), simulation.band(75),
+             {'color': chart.SLATEGRAY4, 'alpha': 0.8}),
+            ])
+        budget_chart.plot(chart.MONTE_CARLO, simulation.dates, [
+            ('Median', simulation.band(50), {'color': 'white'}),
+            ('Forecast', self.forecast.total, {'color': 'black', 'linestyle': '--'}),
+            ])
+        budget_chart.show(chart.MONTE_CARLO)
@@ -1,95 +1,249 @@
 """dbhelper allows user to connect to Database and make
 changes to budget.db
 """
-import sqlite3
+import threading
 import json
-import sys
-from typing import Union
+from typing import Iterable, Iterator, Optional, Union
 
-class ProjectionsDatabase():
+import connection
+import errors
+import metrics
+from utils import table_columns, create_unique_index, iter_rows, ErrorMixin, TransactionMixin
+
+# keys of event dicts stored in their own column, any other keys are kept in Details
+EVENT_KEYS = ('name', 'kind', 'date', 'amount')
+
+@metrics.instrument
+class ProjectionsDatabase(ErrorMixin, TransactionMixin, connection.ConnectionMixin):
     """Allows user to connect to database using sqlite and
     make changes or get strored information"""
-    def __init__(self, name:str ='budget.db') -> None:
-        self.con = sqlite3.connect(name)
-        self.cur = self.con.cursor()
+    def __init__(self, name: str = 'budget.db',
+                 manager: Optional[connection.ConnectionManager] = None) -> None:
+        """
+        Args:
+            name (str): path of the database file
+            manager (ConnectionManager): pool to take connections from,
+                defaults to the shared manager of name
+
+        """
+        self.manager = manager if manager is not None else connection.get_manager(name)
+        self.cursors = threading.local()
+        self.failures = threading.local()
         self.create_db()
 
     def create_db(self):
-        """Executes command to create projections table if not exists"""
+        """Executes commands to create projections and events tables if not exists,
+        then migrates projections which still store events as JSON"""
         try:
             # create projection table, linked to budgets
-            # through Budget_id (one to many relation?)
+            # through Budget_id (one budget to many projections)
             command = ('''CREATE TABLE IF NOT EXISTS projections (
                         Projections_id integer primary key autoincrement,
                         Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                         Name text,
-                        Events text,
-                        Budget_id int
+                        Budget_id integer
+                            REFERENCES budgets(Budget_id) ON DELETE CASCADE
                         );''')
             self.cur.execute(command)
-            self.con.commit()
+            # one row per event, linked to projections through Projections_id
+            command = ('''CREATE TABLE IF NOT EXISTS events (
+                        Event_id integer primary key autoincrement,
+                        Projections_id integer NOT NULL
+                            REFERENCES projections(Projections_id) ON DELETE CASCADE,
+                        Name text,
+                        Kind text,
+                        Date text,
+                        Amount real,
+                        Details text
+                        );''')
+            self.cur.execute(command)
+            self.cur.execute('''CREATE INDEX IF NOT EXISTS events_projection
+                             ON events(Projections_id, Date);''')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS projections_budget ON projections(Budget_id);')
+            self.commit()
+            if 'Events' in table_columns(self.cur, 'projections'):
+                self.migrate_json_columns()
+            # name lookups use this index, create_projection relies on it for ON CONFLICT
+            create_unique_index(self.cur, 'projections_name', 'projections', 'Name', 'Projections_id')
+            self.commit()
             return True
-        except Exception as exception:
-            print(exception)
-            return False
+        except Exception:
+            self.rollback()
+            return self.fail('create_db')
+
+    def migrate_json_columns(self) -> None:
+        """Moves events stored as JSON in the Events column of an older
+        budget.db into the events table, then rebuilds projections without
+        that column. Projections_id values are kept.
+        """
+        # rebuilding a parent table must not cascade into its children
+        self.cur.execute('PRAGMA foreign_keys = OFF;')
+        try:
+            self.cur.execute('BEGIN;')
+            self.cur.execute('SELECT Projections_id, Events FROM projections;')
+            for projections_id, events in self.cur.fetchall():
+                if events:
+                    self.insert_events(projections_id, json.loads(events))
+            self.cur.execute('''CREATE TABLE projections_new (
+                            Projections_id integer primary key autoincrement,
+                            Timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                            Name text,
+                            Budget_id integer
+                                REFERENCES budgets(Budget_id) ON DELETE CASCADE
+                            );''')
+            self.cur.execute('''INSERT INTO projections_new(Projections_id, Timestamp, Name, Budget_id)
+                            SELECT Projections_id, Timestamp, Name, Budget_id FROM projections;''')
+            self.cur.execute('DROP TABLE projections;')
+            self.cur.execute('ALTER TABLE projections_new RENAME TO projections;')
+            self.cur.execute('CREATE INDEX IF NOT EXISTS projections_budget ON projections(Budget_id);')
+            self.con.commit()
+        finally:
+            if self.con.in_transaction:
+                self.con.rollback()
+            self.cur.execute('PRAGMA foreign_keys = ON;')
+
+    def insert_events(self, projections_id: int, events: Union[list, dict]) -> None:
+        """Inserts event rows of a projection without committing
+
+        Args:
+            projections_id (int): ID of projection
+            events (list): list of event dictionaries or events.Event objects
+
+        """
+        if isinstance(events, dict):
+            events = [events]
+        # typed events are stored as their dicts
+        events = [event.to_dict() if hasattr(event, 'to_dict') else event for event in events]
+        command = ('''INSERT INTO events(Projections_id, Name, Kind, Date, Amount, Details)
+                    VALUES (?, ?, ?, ?, ?, ?);''')
+        values = []
+        for event in events:
+            details = {key: value for key, value in event.items() if key not in EVENT_KEYS}
+            values.append((
+                projections_id,
+                event.get('name'),
+                event.get('kind'),
+                event.get('date'),
+                event.get('amount'),
+                json.dumps(details) if details else None
+                ))
+        self.cur.executemany(command, values)
 
     def create_projection(self, name: str, budget: str) -> bool:
         """Inserts row into budget table with new budget
         Inputs:
             name (str): name of budget
-            budget (str): a str which contains list of dictionaries
+            budget (str): name of budget the projection is built on
         """
         try:
-            # check if name already exists
-            command = "SELECT EXISTS(SELECT 1 FROM projections WHERE Name=?);"
-            self.cur.execute(command, (name,))
-            results = self.cur.fetchall()
-            if results[0][0] == 1:
-                return False
-            budget_id = self.get_id_by_name(budget)
-            # now that it does not exist, create it
+            # nothing is inserted if the name already exists or the budget does not
             command = ('''INSERT INTO projections(Name, Budget_id)
-                        VALUES (?, ?);''')
-            values = (name, int(budget_id))
-            self.cur.execute(command, values)
-            self.con.commit()
-        except Exception as exception:
-            print(exception)
-            return False
+                        SELECT ?, Budget_id FROM budgets WHERE Name = ?
+                        ON CONFLICT(Name) DO NOTHING;''')
+            self.cur.execute(command, (name, budget))
+            if self.cur.rowcount == 0:
+                self.cur.execute('SELECT 1 FROM budgets WHERE Name = ?;', (budget,))
+                if self.cur.fetchone() is None:
+                    raise errors.NotFoundError()
+                raise errors.ConflictError()
+            self.commit()
+        except Exception:
+            self.rollback()
+            return self.fail('create_projection', name=name, budget=budget)
         return True
 
-    def insert_event(self, name: str, events: str) -> bool:
-        """Inserts into events column in table projections
+    def insert_event(self, name: str, events: Union[list, str]) -> bool:
+        """Replaces the events of a projection
         Parameters:
-            name (str): name of budget
-            events (str): json dumps of events
+            name (str): name of projection
+            events (list): list of event dicts, or a json dumps of them
         """
         try:
-            # events = json.load(events)
-            command = ('UPDATE projections SET Events = ? WHERE Name = ?;')
-            self.cur.execute(command, (events, name))
-            self.con.commit()
+            if isinstance(events, str):
+                events = json.loads(events)
+            projections_id = self.get_id_by_name(name)
+            if projections_id is False:
+                return False
+            self.cur.execute('DELETE FROM events WHERE Projections_id = ?;', (projections_id,))
+            self.insert_events(projections_id, events)
+            self.commit()
+            return True
+        except Exception:
+            self.rollback()
+            return self.fail('insert_event', name=name)
+
+    def bulk_create_projections(self, projections: Iterable) -> Union[int, bool]:
+        """Creates many projections with a single commit.
+        Projections whose name already exists are skipped.
+        Parameters:
+            projections (Iterable): (projection name, budget name) pairs
+        Returns:
+            results (int): number of projections created
+        """
+        try:
+            command = ('''INSERT INTO projections(Name, Budget_id)
+                        SELECT ?, Budget_id FROM budgets WHERE Name = ?
+                        ON CONFLICT(Name) DO NOTHING;''')
+            self.cur.executemany(command, projections)
+            created = self.cur.rowcount
+            self.commit()
+            return created
+        except Exception:
+            self.rollback()
+            return self.fail('bulk_create_projections')
+
+    def bulk_insert_events(self, events: Iterable) -> bool:
+        """Replaces the events of many projections with a single commit
+        Parameters:
+            events (Iterable): (projection name, list of event dicts) pairs
+        """
+        try:
+            with self.transaction():
+                for name, projection_events in events:
+                    if self.insert_event(name, projection_events) is False:
+                        raise self.last_error
             return True
-        except Exception as exception:
-            print(exception)
-            return False
+        except Exception:
+            return self.fail('bulk_insert_events')
 
-    def get_events(self, name: str) -> Union[str, bool]:
+    def get_events(self, name: str) -> Union[list, bool]:
         """Returns events from projections for a name
         Parameters:
-            name (str): name of budget
+            name (str): name of projection
         Returns:
-            results (str): events associated with the budget
+            results (list): event dicts associated with the projection, sorted by date
         """
         try:
-            command = "SELECT Events FROM projections WHERE Name = ?"
+            command = ('''SELECT events.Name, Kind, Date, Amount, Details
+                        FROM events JOIN projections USING (Projections_id)
+                        WHERE projections.Name = ? ORDER BY Date, Event_id''')
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()[0][0]
-            # results = json.dump(results)
+            results = []
+            for row in self.cur.fetchall():
+                event = dict(zip(EVENT_KEYS, row))
+                if row[-1] is not None:
+                    event.update(json.loads(row[-1]))
+                results.append(event)
             return results
-        except Exception as exception:
-            print(exception)
-            return False
+        except Exception:
+            return self.fail('get_events', name=name)
+
+    def get_budget_name(self, name: str) -> Union[str, bool]:
+        """Returns the name of the budget a projection is built on
+        Parameters:
+            name (str): name of projection
+        Returns:
+            results (str): name of budget, False if there is no such projection"""
+        try:
+            command = ('''SELECT budgets.Name FROM projections JOIN budgets USING (Budget_id)
+                        WHERE projections.Name = ?''')
+            self.cur.execute(command, (name,))
+            row = self.cur.fetchone()
+            if row is None:
+                raise errors.NotFoundError()
+            return row[0]
+        except Exception:
+            return self.fail('get_budget_name', name=name)
 
     def get_id_by_name(self, name: str) -> Union[str, bool]:
         """Returns id of a projection by it's name
@@ -99,13 +253,14 @@ class ProjectionsDatabase():
             results (str): the ID associated with the budget
         """
         try:
-            command = "SELECT Projection_id FROM projection WHERE Name = ?"
+            command = "SELECT Projections_id FROM projections WHERE Name = ?"
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()[0][0]
-            return results
-        except Exception as exception:
-            print(exception)
-            return False
+            row = self.cur.fetchone()
+            if row is None:
+                raise errors.NotFoundError()
+            return row[0]
+        except Exception:
+            return self.fail('get_id_by_name', name=name)
 
     def get_by_name(self, name: str) -> Union[str, bool]:
         """Searches table projections by name
@@ -116,31 +271,53 @@ class ProjectionsDatabase():
         try:
             command = "SELECT * FROM projections WHERE Name = ?"
             self.cur.execute(command, (name,))
-            results = self.cur.fetchall()[0]
-            return results
-        except Exception as exception:
-            print(exception)
-            return False
+            row = self.cur.fetchone()
+            if row is None:
+                raise errors.NotFoundError()
+            return row
+        except Exception:
+            return self.fail('get_by_name', name=name)
 
-    def get_all_projections(self) -> str:
+    def get_all_projections(self) -> list:
         """Returns results (list) containing all projections"""
-        command = "SELECT * FROM projections"
+        command = "SELECT Projections_id, Timestamp, Name, Budget_id FROM projections"
         self.cur.execute(command)
         results = self.cur.fetchall()
         return results
 
+    def iter_projection_summaries(self) -> Iterator[tuple]:
+        """Iterates over a summary of every projection ordered by name, with the
+        name of its budget and its number of events computed in SQL
+        returns:
+            rows (Iterator): (Projections_id, Timestamp, Name, Budget, Events) rows"""
+        command = """SELECT Projections_id, projections.Timestamp, projections.Name,
+                    budgets.Name,
+                    (SELECT COUNT(*) FROM events
+                        WHERE events.Projections_id = projections.Projections_id)
+                    FROM projections LEFT JOIN budgets USING (Budget_id)
+                    ORDER BY projections.Name"""
+        return iter_rows(self.con, command)
+
+    def count_projections(self) -> int:
+        """Returns the number of projections"""
+        self.cur.execute("SELECT COUNT(*) FROM projections")
+        return self.cur.fetchone()[0]
+
+    def get_projections_page(self, offset: int, limit: int) -> list:
+        """Returns one page of projections ordered by name
+        parameters:
+            offset (int): number of projections before the page
+            limit (int): maximum number of projections in the page
+        returns:
+            results (list): (Projections_id, Timestamp, Name, Budget_id) rows"""
+        command = """SELECT Projections_id, Timestamp, Name, Budget_id FROM projections
+                    ORDER BY Name LIMIT ? OFFSET ?"""
+        self.cur.execute(command, (limit, offset))
+        return self.cur.fetchall()
+
     def delete_table(self) -> bool:
         """Deletes entire tables from database"""
-        command = "DROP TABLE projections"
-        self.cur.execute(command)
-        self.con.commit()
+        for table in ('events', 'projections'):
+            self.cur.execute(f'DROP TABLE IF EXISTS {table}')
+        self.commit()
         return True
-
-    def __del__(self) -> None:
-        """Closes the database on deletion of instance"""
-        self.con.close()
-"""
-from dbhelper import *  
-d=Database()
-d.create_db()
-"""
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Records hold the accounts & expenses of a budget in memory. Numbers are
+parsed once when a record is built, from a row of the database or a dict
+entered in the GUI, and __slots__ leaves out the dict every instance would
+otherwise carry, so hundreds of thousands of line items stay small.
+
+Records can be read like the dicts they replace, record['balance'] or
+record.get('date'), so functions written for dicts accept either.
+"""
+from typing import Iterator, Optional
+
+class Record():
+    """Line item of a budget. Subclasses list their fields in the order of
+    the columns of their table."""
+    __slots__ = ()
+    fields = ()
+    # fields left out of to_dict while they are None
+    optional = ()
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Record':
+        """Builds a record from a row with a value for every field, in order"""
+        return cls(*row)
+
+    @classmethod
+    def from_dict(cls, item: dict) -> 'Record':
+        """Builds a record from a dict, keys which are not fields are ignored"""
+        if isinstance(item, cls):
+            return item
+        return cls(**{field: item[field] for field in cls.fields if field in item})
+
+    def to_row(self) -> tuple:
+        """Returns the value of every field, in order"""
+        return tuple(getattr(self, field) for field in self.fields)
+
+    def to_dict(self) -> dict:
+        """Returns the record as the dict the database helpers return"""
+        return dict(self.items())
+
+    def keys(self) -> Iterator[str]:
+        """Iterates over the fields which have a value, like dict.keys"""
+        return (field for field in self.fields
+                if field not in self.optional or getattr(self, field) is not None)
+
+    def items(self) -> Iterator[tuple]:
+        """Iterates over (field, value) pairs, like dict.items"""
+        return ((field, getattr(self, field)) for field in self.keys())
+
+    def get(self, key: str, default=None):
+        """Returns the value of a field, default if it is not a key, like dict.get"""
+        return getattr(self, key) if key in self else default
+
+    def __getitem__(self, key: str):
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields and (key not in self.optional or getattr(self, key) is not None)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.to_row() == other.to_row()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    # records can be changed, so they are not hashable
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{field}={value!r}' for field, value in self.items())
+        return f'{type(self).__name__}({values})'
+
+class Account(Record):
+    """Account of a budget, its balance grows by interest"""
+    __slots__ = ('name', 'balance', 'interest', 'type', 'compound')
+    fields = __slots__
+
+    def __init__(
+        self, name: str, balance: float, interest: float,
+        type: Optional[str] = None, compound: Optional[str] = None
+        ) -> None:
+        """
+        Args:
+            name (str): name of account
+            balance (float | str): balance of the account
+            interest (float | str): yearly interest rate in percent
+            type (str): kind of account, such as 'Checkings', 'Savings' or
+                'Brokerage', see line_items.ACCOUNT_TYPES
+            compound (str): how often interest compounds, see forecast.FREQUENCIES
+
+        """
+        self.name = name
+        self.balance = float(balance)
+        self.interest = float(interest)
+        self.type = type
+        self.compound = compound
+
+class Expense(Record):
+    """Expense or income of a budget, recurring or happening once on date"""
+    __slots__ = ('name', 'description', 'amount', 'type', 'frequency', 'date')
+    fields = __slots__
+    optional = ('date',)
+
+    def __init__(
+        self, name: str, description: Optional[str] = None, amount: float = 0.0,
+        type: Optional[str] = None, frequency: Optional[str] = None,
+        date: Optional[str] = None
+        ) -> None:
+        """
+        Args:
+            name (str): name of expense
+            description (str): description of the expense
+            amount (float | str): amount per occurrence
+            type (str): 'Expense' or 'Income'
+            frequency (str): frequency, see forecast.FREQUENCIES
+            date (str): date of a one time expense, None if it recurs
+
+        """
+        self.name = name
+        self.description = description
+        self.amount = float(amount)
+        self.type = type
+        self.frequency = frequency
+        self.date = date
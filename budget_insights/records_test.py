@@ -0,0 +1,35 @@
+import numpy as np
+
+import budget_dbhelper
+import forecast
+import forecast_cache
+import records
+
+ACCOUNT = {'name': 'Checking', 'balance': 100.0, 'interest': 1.5,
+           'type': 'Checkings', 'compound': 'Monthly'}
+EXPENSE = {'name': 'Rent', 'description': 'apartment', 'amount': 900.0,
+           'type': 'Expense', 'frequency': 'Monthly'}
+
+def test_records_read_like_dicts():
+    account = records.Account.from_dict(dict(ACCOUNT, balance='100', interest='1.5'))
+    assert account.balance == 100.0 and account['interest'] == 1.5
+    assert account == ACCOUNT and dict(account) == ACCOUNT
+    assert not hasattr(account, '__dict__')
+    expense = records.Expense(*budget_dbhelper.expense_values(1, EXPENSE)[1:])
+    assert expense == EXPENSE and 'date' not in expense and expense.get('date') is None
+    assert records.Expense.from_dict(dict(EXPENSE, date='2022-01-01'))['date'] == '2022-01-01'
+    assert forecast_cache.cache_key([account], [expense], 30, 'monthly') == \
+        forecast_cache.cache_key([ACCOUNT], [EXPENSE], 30, 'monthly')
+
+def test_database_records_forecast_like_dicts(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    database.create_budget('home', [records.Account.from_dict(ACCOUNT)])
+    database.update_expenses('home', [records.Expense.from_dict(EXPENSE)])
+    accounts = database.get_account_records('home')
+    expenses = database.get_expense_records('home')
+    assert accounts == database.get_accounts_by_name('home') == [ACCOUNT]
+    assert expenses == database.get_expenses_by_name('home') == [EXPENSE]
+    model = forecast.ForecastModel(accounts, expenses, years=2)
+    assert np.allclose(model.result().total, forecast.forecast([ACCOUNT], [EXPENSE], years=2).total)
+    assert model.update_expenses(expenses) == 0
+    assert model.update_expenses([records.Expense.from_dict(dict(EXPENSE, amount=1))]) == 1
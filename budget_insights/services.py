@@ -0,0 +1,317 @@
+"""Services expose budgets, projections and forecasts to scripts and the
+command line. Nothing here imports tkinter or matplotlib, so it runs on
+machines without a display.
+"""
+import datetime
+from typing import Callable, Iterable, Optional, Union
+
+import batch
+import budget_dbhelper
+import events
+import export
+import forecast
+import forecast_cache
+import line_items
+import mint_import
+import monte_carlo
+import projections_dbhelper
+
+class BudgetService():
+    """Creates, reads, imports and exports budgets"""
+    def __init__(self, budget_database=None, path: str = 'budget.db') -> None:
+        """
+        Args:
+            budget_database (BudgetDatabase): helper for budget database
+            path (str): database file used when no helper is given
+
+        """
+        if budget_database is None:
+            budget_database = budget_dbhelper.BudgetDatabase(path)
+        self.budget_database = budget_database
+
+    def create(self, name: str, accounts: list, expenses: Optional[list] = None) -> bool:
+        """Creates a budget with its accounts and expenses in one commit
+
+        Args:
+            name (str): name of budget
+            accounts (list): account dicts
+            expenses (list): expense dicts
+
+        Returns:
+            bool: pass or fail, fails if the name already exists
+
+        """
+        with self.budget_database.transaction():
+            if self.budget_database.create_budget(name, accounts) is False:
+                return False
+            if expenses:
+                return self.budget_database.update_expenses(name, expenses)
+        return True
+
+    def create_many(self, budgets: Iterable[dict]) -> Union[int, bool]:
+        """Creates many budgets in one commit, skipping existing names
+
+        Args:
+            budgets (Iterable): dicts with 'name', 'accounts' and optional 'expenses'
+
+        Returns:
+            int | bool: number of budgets created, or fail
+
+        """
+        budgets = list(budgets)
+        with self.budget_database.transaction():
+            created = self.budget_database.bulk_create_budgets(
+                (budget['name'], budget.get('accounts', [])) for budget in budgets)
+            if created is False:
+                return False
+            expenses = [(budget['name'], budget['expenses'])
+                        for budget in budgets if budget.get('expenses')]
+            if expenses and self.budget_database.bulk_update_expenses(expenses) is False:
+                return False
+        return created
+
+    def get(self, name: str) -> Optional[dict]:
+        """Returns a budget
+
+        Args:
+            name (str): name of budget
+
+        Returns:
+            dict | None: 'name', 'accounts' and 'expenses' of the budget
+
+        """
+        if self.budget_database.get_id_by_name(name) is False:
+            return None
+        return {
+            'name': name,
+            'accounts': self.budget_database.get_accounts_by_name(name),
+            'expenses': self.budget_database.get_expenses_by_name(name)
+            }
+
+    def names(self) -> list:
+        """Returns the name of every budget
+
+        Returns:
+            list: names of budgets
+
+        """
+        return [budget[2] for budget in self.budget_database.iter_budget_summaries()]
+
+    def line_items(self) -> line_items.LineItems:
+        """Reads every account & expense of the database into columns, see line_items.py
+
+        Returns:
+            LineItems: line items of every budget
+
+        """
+        return line_items.load(self.budget_database)
+
+    def import_mint(
+        self, name: str, path: str,
+        progress: Optional[Callable[[int, int, int], None]] = None
+        ) -> int:
+        """Imports a Mint .csv export into a budget, see mint_import.import_mint
+
+        Args:
+            name (str): name of budget
+            path (str): path of the Mint export
+            progress (Callable): called with (transactions imported, bytes read, size of file)
+
+        Returns:
+            int: number of transactions imported
+
+        """
+        return mint_import.import_mint(self.budget_database, name, path, progress=progress)
+
+    def export_csv(
+        self, name: str, path: str, years: int = 30, resolution: str = 'monthly'
+        ) -> int:
+        """Exports a budget and its forecast to a .csv file, see export.export_budget
+
+        Args:
+            name (str): name of budget
+            path (str): path of the .csv file
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly'
+
+        Returns:
+            int: number of rows written
+
+        """
+        return export.export_budget(self.budget_database, name, path, years, resolution)
+
+class ProjectionService():
+    """Creates projections of budgets and manages their events"""
+    def __init__(
+        self, projections_database=None, path: str = 'budget.db', budget_database=None
+        ) -> None:
+        """
+        Args:
+            projections_database (ProjectionsDatabase): helper for projections database
+            path (str): database file used when no helper is given
+            budget_database (BudgetDatabase): helper for budget database
+
+        """
+        if projections_database is None:
+            projections_database = projections_dbhelper.ProjectionsDatabase(path)
+        self.projections_database = projections_database
+        if budget_database is None:
+            budget_database = budget_dbhelper.BudgetDatabase(path)
+        self.budget_database = budget_database
+
+    def create(self, name: str, budget: str, events: Optional[list] = None) -> bool:
+        """Creates a projection of a budget with its events in one commit
+
+        Args:
+            name (str): name of projection
+            budget (str): name of budget the projection is built on
+            events (list): event dicts
+
+        Returns:
+            bool: pass or fail, fails if the name already exists
+
+        """
+        with self.projections_database.transaction():
+            if self.projections_database.create_projection(name, budget) is False:
+                return False
+            if events:
+                return self.projections_database.insert_event(name, events)
+        return True
+
+    def events(self, name: str) -> Union[list, bool]:
+        """Returns the events of a projection sorted by date
+
+        Args:
+            name (str): name of projection
+
+        Returns:
+            list | bool: event dicts, or fail
+
+        """
+        return self.projections_database.get_events(name)
+
+    def names(self) -> list:
+        """Returns the name of every projection
+
+        Returns:
+            list: names of projections
+
+        """
+        return [projection[2] for projection in
+                self.projections_database.iter_projection_summaries()]
+
+    def forecast(
+        self, name: str, years: int = 30, resolution: str = 'monthly',
+        start: Optional[datetime.date] = None
+        ) -> forecast.Forecast:
+        """Forecasts the budget of a projection with its events applied
+
+        Args:
+            name (str): name of projection
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly'
+            start (date): first date of the forecast, defaults to today
+
+        Returns:
+            Forecast: balances of every account, expense and event for every period
+
+        """
+        budget = self.projections_database.get_budget_name(name)
+        if budget is False:
+            raise ValueError(f'Projection {name} does not exist')
+        accounts = self.budget_database.get_accounts_by_name(budget)
+        expenses = self.budget_database.get_expenses_by_name(budget)
+        projection_events = self.projections_database.get_events(name)
+        if accounts is False or expenses is False or projection_events is False:
+            raise ValueError(f'Could not read projection {name}')
+        return events.project(accounts, expenses, projection_events, years, resolution, start)
+
+class ForecastService():
+    """Forecasts budgets stored in the database"""
+    def __init__(self, budget_database=None, path: str = 'budget.db') -> None:
+        """
+        Args:
+            budget_database (BudgetDatabase): helper for budget database
+            path (str): database file used when no helper is given
+
+        """
+        if budget_database is None:
+            budget_database = budget_dbhelper.BudgetDatabase(path)
+        self.budget_database = budget_database
+        self.cache = forecast_cache.ForecastCache(manager=budget_database.manager)
+
+    def forecast(
+        self, name: str, years: int = 30, resolution: str = 'monthly',
+        start: Optional[datetime.date] = None
+        ) -> forecast.Forecast:
+        """Forecasts a budget, reading it from the forecast cache when it
+        was already computed
+
+        Args:
+            name (str): name of budget
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly'
+            start (date): first date of the forecast, defaults to today
+
+        Returns:
+            Forecast: balances of every account and expense for every period
+
+        """
+        budget_id = self.budget_database.get_id_by_name(name)
+        if budget_id is False:
+            raise ValueError(f'Budget {name} does not exist') from self.budget_database.last_error
+        accounts = self.budget_database.get_accounts_by_name(name)
+        expenses = self.budget_database.get_expenses_by_name(name)
+        if accounts is False or expenses is False:
+            raise ValueError(f'Could not read budget {name}') from self.budget_database.last_error
+        return self.cache.forecast(budget_id, accounts, expenses, years, resolution, start)
+
+    def simulate(
+        self, name: str, paths: int = 10000, years: int = 30, resolution: str = 'monthly',
+        start: Optional[datetime.date] = None, seed: Optional[int] = None,
+        workers: Optional[int] = None
+        ) -> monte_carlo.Simulation:
+        """Simulates a budget along random paths, see monte_carlo.simulate
+
+        Args:
+            name (str): name of budget
+            paths (int): number of paths
+            years (int): length of the forecast in years
+            resolution (str): 'daily' or 'monthly'
+            start (date): first date of the forecast, defaults to today
+            seed (int): seed of the random paths, random if None
+            workers (int): processes used, defaults to one per core
+
+        Returns:
+            Simulation: percentiles and mean of the net worth for every period
+
+        """
+        if self.budget_database.get_id_by_name(name) is False:
+            raise ValueError(f'Budget {name} does not exist') from self.budget_database.last_error
+        accounts = self.budget_database.get_accounts_by_name(name)
+        expenses = self.budget_database.get_expenses_by_name(name)
+        if accounts is False or expenses is False:
+            raise ValueError(f'Could not read budget {name}') from self.budget_database.last_error
+        return monte_carlo.simulate(accounts, expenses, paths, years, resolution, start,
+                                    seed=seed, workers=workers)
+
+    def forecast_all(
+        self, years: int = 30, resolution: str = 'monthly', path: Optional[str] = None,
+        chunk_size: int = batch.CHUNK_SIZE, workers: Optional[int] = None
+        ) -> int:
+        """Forecasts every budget across a process pool, see batch.forecast_all
+
+        Args:
+            years (int): length of the forecasts in years
+            resolution (str): 'daily' or 'monthly'
+            path (str): .npz file the totals are written to,
+                forecasts are stored in the forecast cache if None
+            chunk_size (int): budgets sent to a worker at once
+            workers (int): processes used, defaults to one per core
+
+        Returns:
+            int: number of budgets forecast
+
+        """
+        return batch.forecast_all(self.budget_database, years, resolution, path=path,
+                                  chunk_size=chunk_size, workers=workers)
@@ -0,0 +1,159 @@
+"""Tasks run database queries and forecasts on worker threads, so the Tk
+main loop keeps drawing while they run. Tk widgets may only be touched
+from the thread running mainloop, so results, errors and progress are
+handed back through a queue which the main loop polls with after().
+"""
+import concurrent.futures
+import logging
+import queue
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# milliseconds between polls of the result queue while tasks run, about one frame
+POLL_INTERVAL = 16
+# worker threads, database helpers give every thread its own connection
+WORKERS = 2
+
+def log_error(exception: Exception) -> None:
+    """Logs the exception of a task which was given no error callback"""
+    logger.error('task failed: %s', exception, exc_info=exception)
+
+class Cancelled(Exception):
+    """Raised by Task.report inside a task which was cancelled"""
+
+class Task:
+    """A function running on a worker thread of a TaskRunner"""
+    def __init__(
+        self, runner: 'TaskRunner', done: Optional[Callable] = None,
+        error: Optional[Callable] = None, progress: Optional[Callable] = None
+        ) -> None:
+        """
+        Args:
+            runner (TaskRunner): runner the task is submitted to
+            done (Callable): called with the result on the main loop
+            error (Callable): called with the exception raised on the main loop
+            progress (Callable): called with (done, total) on the main loop
+
+        """
+        self.runner = runner
+        self.done = done
+        self.error = error
+        self.progress = progress
+        self.future = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """bool: True once cancel() was called"""
+        return self.cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Cancels the task. A task which has not started never runs, a running
+        task stops at its next report(), and its callbacks are never called."""
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, done: int, total: int) -> None:
+        """Reports progress from the worker thread, usable as the progress
+        callback of mint_import or monte_carlo
+
+        Args:
+            done (int): units of work done
+            total (int): units of work in the task
+
+        Raises:
+            Cancelled: if the task was cancelled, to stop the work
+
+        """
+        if self.cancelled:
+            raise Cancelled()
+        if self.progress is not None:
+            self.runner.results.put((self, self.progress, (done, total), False))
+
+class TaskRunner:
+    """Runs tasks on a pool of worker threads and calls their callbacks on
+    the Tk main loop. The queue is only polled while tasks are running."""
+    def __init__(self, widget, workers: int = WORKERS, interval: int = POLL_INTERVAL) -> None:
+        """
+        Args:
+            widget (tk.Misc): any widget of the window, its after() schedules the polls
+            workers (int): number of worker threads
+            interval (int): milliseconds between polls
+
+        """
+        self.widget = widget
+        self.interval = interval
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='task')
+        # (task, callback, arguments, finished) put by worker threads
+        self.results = queue.Queue()
+        # only read and written on the main loop
+        self.running = 0
+        self.polling = None
+
+    def submit(
+        self, function: Callable, *args, done: Optional[Callable] = None,
+        error: Optional[Callable] = None, progress: Optional[Callable] = None
+        ) -> Task:
+        """Runs function(task, *args) on a worker thread
+
+        Args:
+            function (Callable): work to run, called with the task first so
+                it can report progress
+            args: further arguments of function
+            done (Callable): called with the result on the main loop
+            error (Callable): called with the exception raised on the main
+                loop, the exception is logged if None
+            progress (Callable): called with (done, total) on the main loop
+
+        Returns:
+            Task: the submitted task, which can be cancelled
+
+        """
+        task = Task(self, done, error if error is not None else log_error, progress)
+        task.future = self.executor.submit(self.run, task, function, args)
+        # a task cancelled before it started never runs, but still finishes
+        task.future.add_done_callback(
+            lambda future: future.cancelled() and self.results.put((task, None, (), True)))
+        self.running += 1
+        if self.polling is None:
+            self.polling = self.widget.after(self.interval, self.poll)
+        return task
+
+    def run(self, task: Task, function: Callable, args: tuple) -> None:
+        """Runs a task on the worker thread and queues its outcome"""
+        callback, value = None, None
+        try:
+            if not task.cancelled:
+                callback, value = task.done, function(task, *args)
+        except Cancelled:
+            callback = None
+        except Exception as exception:
+            callback, value = task.error, exception
+        self.results.put((task, callback, (value,), True))
+
+    def poll(self) -> None:
+        """Calls the callbacks queued by worker threads, then polls again
+        while any task is running"""
+        self.polling = None
+        try:
+            while True:
+                try:
+                    task, callback, args, finished = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if finished:
+                    self.running -= 1
+                if callback is not None and not task.cancelled:
+                    callback(*args)
+        finally:
+            if self.running > 0:
+                self.polling = self.widget.after(self.interval, self.poll)
+
+    def shutdown(self) -> None:
+        """Stops the worker threads once running tasks finish, tasks which
+        have not started are cancelled"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
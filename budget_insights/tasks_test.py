@@ -0,0 +1,56 @@
+import threading
+
+import tasks
+
+class Widget:
+    """Stands in for a Tk widget, polls are run by calling poll()"""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, interval, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+
+def finish(runner, task):
+    task.future.exception()
+    while runner.polling is not None:
+        runner.poll()
+
+def test_results_are_delivered_on_poll():
+    runner = tasks.TaskRunner(Widget())
+    results, progress = [], []
+
+    def work(task, value):
+        task.report(1, 2)
+        return value * 2
+
+    task = runner.submit(work, 21, done=results.append,
+                         progress=lambda done, total: progress.append((done, total)))
+    task.future.result()
+    assert results == []
+    finish(runner, task)
+    assert results == [42] and progress == [(1, 2)]
+    assert runner.running == 0
+
+def test_errors_and_cancellation():
+    runner = tasks.TaskRunner(Widget())
+    errors, results = [], []
+    task = runner.submit(lambda task: 1 / 0, error=errors.append)
+    finish(runner, task)
+    assert isinstance(errors[0], ZeroDivisionError)
+
+    started, release = threading.Event(), threading.Event()
+
+    def work(task):
+        started.set()
+        release.wait()
+        task.report(1, 1)
+        return 'not delivered'
+
+    task = runner.submit(work, done=results.append)
+    started.wait()
+    task.cancel()
+    release.set()
+    finish(runner, task)
+    assert results == [] and runner.running == 0
+    runner.shutdown()
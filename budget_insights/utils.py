@@ -2,8 +2,192 @@
 
 import sys
 import os
+import contextlib
+import logging
+from typing import Iterator, Optional
 
-def exception_handler() -> None:
-    exc_type, _, exc_tb = sys.exc_info()
-    fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-    print(exc_type, fname, exc_tb.tb_lineno)
\ No newline at end of file
+import errors
+
+logger = logging.getLogger(__name__)
+
+def exception_handler(operation: str = '', **context) -> errors.DatabaseError:
+    """Logs the exception being handled with the operation which failed,
+    call it from an except block. Logging only queues the record when
+    logs.start() was called, see logs.py.
+
+    Args:
+        operation (str): "<helper>.<method>" which failed
+        context: values the operation was called with
+
+    Returns:
+        errors.DatabaseError: the exception, wrapped unless it already was one
+
+    """
+    exception, exc_tb = sys.exc_info()[1:]
+    if isinstance(exception, errors.DatabaseError):
+        error = exception
+        error.operation = error.operation or operation
+        error.context = dict(context, **error.context)
+    else:
+        error = errors.DatabaseError(operation, exception, **context)
+    if not error.logged and logger.isEnabledFor(error.level):
+        error.logged = True
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        logger.log(error.level, '%s', error, extra={
+            'error': type(error).__name__, 'operation': error.operation,
+            'context': error.context, 'file': fname, 'line': exc_tb.tb_lineno})
+    return error
+
+def table_columns(cursor, table: str) -> list:
+    """Returns the column names of a table, empty if it does not exist
+
+    Args:
+        cursor (sqlite3.Cursor): cursor of the database
+        table (str): name of table
+
+    Returns:
+        list: names of every column in the table
+
+    """
+    cursor.execute(f'PRAGMA table_info({table});')
+    return [row[1] for row in cursor.fetchall()]
+
+def iter_rows(con, command: str, parameters: tuple = (), size: int = 256) -> Iterator[tuple]:
+    """Yields the rows of a query, fetching size rows at a time with a
+    cursor of its own so other queries can run while iterating
+
+    Args:
+        con (sqlite3.Connection): connection of the database
+        command (str): query to run
+        parameters (tuple): parameters of the query
+        size (int): number of rows fetched at a time
+
+    Yields:
+        tuple: every row returned by the query
+
+    """
+    cursor = con.cursor()
+    try:
+        cursor.execute(command, parameters)
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cursor.close()
+
+def create_unique_index(cursor, index: str, table: str, column: str, key: str) -> None:
+    """Creates a unique index if it does not exist yet. Duplicates left by
+    databases created without the index are renamed to "<value> (<key>)"
+    so the index can be built.
+
+    Args:
+        cursor (sqlite3.Cursor): cursor of the database
+        index (str): name of index
+        table (str): name of table
+        column (str): column which must be unique
+        key (str): primary key column of table
+
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?;", (index,))
+    if cursor.fetchall():
+        return
+    cursor.execute(f'''UPDATE {table} SET {column} = {column} || ' (' || {key} || ')'
+                    WHERE {key} NOT IN (SELECT MIN({key}) FROM {table} GROUP BY {column});''')
+    cursor.execute(f'CREATE UNIQUE INDEX {index} ON {table}({column});')
+
+def create_cache_triggers(cursor) -> None:
+    """Creates the triggers which delete the cached forecasts of a budget
+    whenever its accounts or expenses are written. Called by the create_db
+    of BudgetDatabase and ForecastCache, whichever runs last creates them,
+    as a trigger needs both forecast_cache and the table it watches.
+
+    Args:
+        cursor (sqlite3.Cursor): cursor of the database
+
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table';")
+    tables = {name for name, in cursor.fetchall()}
+    if 'forecast_cache' not in tables:
+        return
+    for table in ('accounts', 'expenses'):
+        if table not in tables:
+            continue
+        for action, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS
+                    forecast_cache_{table}_{action.lower()} AFTER {action} ON {table}
+                    BEGIN
+                        DELETE FROM forecast_cache WHERE Budget_id = {row}.Budget_id;
+                    END;''')
+
+class TransactionMixin():
+    """Lets a database helper group many writes into one commit.
+    Helpers call self.commit() and self.rollback() instead of using
+    self.con directly, both are deferred while inside transaction().
+    The state of the transaction is kept with the connection of the
+    calling thread, so every helper sharing that connection defers
+    its commits, and other threads are not affected.
+    """
+    @contextlib.contextmanager
+    def transaction(self):
+        """Context manager which commits once when the outermost block exits.
+        If any write inside fails, every write of the block is rolled back.
+
+        Yields:
+            the helper itself
+        """
+        lease = self.manager.lease()
+        lease.depth += 1
+        try:
+            yield self
+        except BaseException:
+            lease.failed = True
+            raise
+        finally:
+            lease.depth -= 1
+            if lease.depth == 0:
+                if lease.failed:
+                    lease.connection.rollback()
+                else:
+                    lease.connection.commit()
+                lease.failed = False
+
+    def commit(self) -> None:
+        """Commits, unless inside transaction()"""
+        lease = self.manager.lease()
+        if lease.depth == 0:
+            lease.connection.commit()
+
+    def rollback(self) -> None:
+        """Rolls back, or marks the enclosing transaction() as failed"""
+        lease = self.manager.lease()
+        if lease.depth == 0:
+            lease.connection.rollback()
+        else:
+            lease.failed = True
+
+class ErrorMixin():
+    """Keeps the error of the last failed call of a helper for each thread.
+    Helpers set self.failures to a threading.local() in __init__ and
+    return self.fail(...) from their except blocks."""
+    failures = None
+
+    @property
+    def last_error(self) -> Optional[errors.DatabaseError]:
+        """errors.DatabaseError: error of the last call which failed on the calling thread"""
+        return getattr(self.failures, 'error', None)
+
+    def fail(self, operation: str, **context) -> bool:
+        """Logs and keeps the exception being handled, call it from an except block
+
+        Args:
+            operation (str): name of the method which failed
+            context: values the method was called with
+
+        Returns:
+            bool: False, returned by the helper
+
+        """
+        self.failures.error = exception_handler(f'{type(self).__name__}.{operation}', **context)
+        return False
@@ -0,0 +1,154 @@
+"""Virtual list shows a scrollable list of database rows as buttons.
+Only the rows which fit on screen get a button, and rows are read a
+page at a time, so a list of thousands of budgets opens as fast as a
+list of ten.
+"""
+import collections
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+
+ROW_HEIGHT = 40
+PAGE_SIZE = 100
+# pages kept in memory, least recently used pages are dropped first
+MAX_PAGES = 20
+SCROLLBAR_WIDTH = 16
+
+class PagedRows():
+    """Reads rows on demand, one page of rows per query"""
+    def __init__(
+        self, count: Callable[[], int], fetch: Callable[[int, int], list],
+        page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES
+        ) -> None:
+        """
+        Args:
+            count (Callable): returns the number of rows
+            fetch (Callable): returns the rows of (offset, limit)
+            page_size (int): number of rows read per query
+            max_pages (int): number of pages kept in memory
+
+        """
+        self.count = count
+        self.fetch = fetch
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = collections.OrderedDict()
+        self.length = None
+
+    def __len__(self) -> int:
+        if self.length is None:
+            self.length = self.count()
+        return self.length
+
+    def __getitem__(self, index: int) -> tuple:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        page, row = divmod(index, self.page_size)
+        if page in self.pages:
+            self.pages.move_to_end(page)
+        else:
+            self.pages[page] = self.fetch(page * self.page_size, self.page_size)
+            if len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        rows = self.pages[page]
+        if row >= len(rows):
+            # rows were deleted since they were counted
+            raise IndexError(index)
+        return rows[row]
+
+    def invalidate(self) -> None:
+        """Forgets every page, rows are counted and read again when needed"""
+        self.pages.clear()
+        self.length = None
+
+class VirtualList(tk.Frame):
+    """Scrollable list of rows which reuses one button per visible row"""
+    def __init__(
+        self, master: tk.Misc, rows: PagedRows,
+        text: Callable[[tuple], str], command: Callable[[tuple], None],
+        row_height: int = ROW_HEIGHT, **kwargs
+        ) -> None:
+        """
+        Args:
+            master (tk.Misc): parent widget
+            rows (PagedRows): rows of the list
+            text (Callable): returns the text of a row's button
+            command (Callable): called with the row whose button was clicked
+            row_height (int): height of a row in pixels
+            kwargs: options of tk.Frame
+
+        """
+        super().__init__(master, **kwargs)
+        self.rows = rows
+        self.text = text
+        self.command = command
+        self.row_height = row_height
+        self.first = 0
+        self.buttons = []
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.scroll)
+        self.scrollbar.place(relx=1, rely=0, relheight=1, width=SCROLLBAR_WIDTH, anchor='ne')
+        self.bind('<Configure>', self.resize)
+        self.bind_wheel(self)
+
+    def bind_wheel(self, widget: tk.Misc) -> None:
+        """Scrolls the list with the mouse wheel over widget"""
+        widget.bind('<MouseWheel>', self.wheel)
+        # X11 reports the wheel as buttons 4 and 5
+        widget.bind('<Button-4>', self.wheel)
+        widget.bind('<Button-5>', self.wheel)
+
+    def resize(self, event: tk.Event) -> None:
+        """Creates or destroys buttons so there is one per visible row"""
+        visible = max(1, event.height // self.row_height)
+        while len(self.buttons) < visible:
+            button = ttk.Button(self)
+            self.bind_wheel(button)
+            self.buttons.append(button)
+        while len(self.buttons) > visible:
+            self.buttons.pop().destroy()
+        self.show(self.first)
+
+    def scroll(self, action: str, value: str, unit: str = 'units') -> None:
+        """Handles the commands of the scrollbar"""
+        if action == 'moveto':
+            self.show(int(float(value) * len(self.rows)))
+        else:
+            step = len(self.buttons) if unit == 'pages' else 1
+            self.show(self.first + int(value) * step)
+
+    def wheel(self, event: tk.Event) -> None:
+        """Scrolls three rows per notch of the mouse wheel"""
+        if event.num == 4 or event.delta > 0:
+            self.show(self.first - 3)
+        else:
+            self.show(self.first + 3)
+
+    def show(self, first: int) -> None:
+        """Shows rows starting at first, as far as they fill the list
+
+        Args:
+            first (int): index of the top row
+
+        """
+        total = len(self.rows)
+        self.first = max(0, min(first, total - len(self.buttons)))
+        for position, button in enumerate(self.buttons):
+            try:
+                row = self.rows[self.first + position]
+            except IndexError:
+                button.place_forget()
+                continue
+            button.configure(text=self.text(row),
+                             command=lambda row=row: self.command(row))
+            button.place(x=0, y=position * self.row_height, relwidth=1,
+                         width=-SCROLLBAR_WIDTH - 4, height=self.row_height - 4)
+        if total:
+            self.scrollbar.set(self.first / total,
+                               min(1, (self.first + len(self.buttons)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def refresh(self) -> None:
+        """Reads rows again, keeping the scroll position"""
+        self.rows.invalidate()
+        self.show(self.first)
@@ -0,0 +1,32 @@
+import pytest
+
+import budget_dbhelper
+import virtual_list
+
+def test_paged_rows_reads_pages_on_demand():
+    fetched = []
+
+    def fetch(offset, limit):
+        fetched.append(offset)
+        return [(index,) for index in range(offset, min(offset + limit, 250))]
+
+    rows = virtual_list.PagedRows(lambda: 250, fetch, page_size=100, max_pages=2)
+    assert len(rows) == 250
+    assert rows[5] == (5,) and rows[99] == (99,)
+    assert rows[249] == (249,)
+    assert fetched == [0, 200]
+    # page 0 was used least recently, so it is dropped for page 1
+    assert rows[150] == (150,)
+    assert rows[0] == (0,)
+    assert fetched == [0, 200, 100, 0]
+    with pytest.raises(IndexError):
+        rows[250]
+
+def test_budget_pages(tmp_path):
+    database = budget_dbhelper.BudgetDatabase(str(tmp_path / 'budget.db'))
+    database.bulk_create_budgets((f'budget {index:04}', []) for index in range(1000))
+    rows = virtual_list.PagedRows(database.count_budgets, database.get_budgets_page)
+    assert len(rows) == 1000
+    assert rows[0][2] == 'budget 0000'
+    assert rows[567][2] == 'budget 0567'
+    assert len(rows.pages) == 2
@@ -1,5 +1,10 @@
 import nox
 
+# benchmark only runs when asked for, with nox -s benchmark
+nox.options.sessions = ['lint', 'pytest']
+# a benchmark fails when its mean is this much slower than the baseline
+BENCHMARK_THRESHOLD = '25%'
+
 @nox.session
 def lint(session):
     session.install('pylama')
@@ -18,3 +23,21 @@ def pytest(session):
         '--cov-report', 'xml',
         '--cov=budget_insights',
         '--cov-fail-under=80')
+
+@nox.session
+def benchmark(session):
+    """Runs the *_benchmark.py files and fails if any is slower than the
+    baseline saved on this machine by more than BENCHMARK_THRESHOLD.
+    Save a new baseline with: nox -s benchmark -- save"""
+    session.install('pytest', 'pytest-benchmark', '-r', 'requirements.txt')
+    command = [
+        'pytest', 'budget_insights',
+        '-o', 'python_files=*_benchmark.py',
+        '--benchmark-only',
+        '--benchmark-storage=.benchmarks',
+        '--benchmark-sort=name']
+    if 'save' in session.posargs:
+        command.append('--benchmark-save=baseline')
+    else:
+        command += ['--benchmark-compare', f'--benchmark-compare-fail=mean:{BENCHMARK_THRESHOLD}']
+    session.run(*command)
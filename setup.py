@@ -1,18 +1,30 @@
+import os
+
 from setuptools import setup
 
+# the modules import each other by name (import services), so they are
+# installed as top level modules rather than as a package
+MODULES = sorted(
+    name[:-3] for name in os.listdir('budget_insights')
+    if name.endswith('.py') and not name.endswith(('_test.py', '_benchmark.py'))
+)
+
 setup(
     name = 'budget_insights',
     version = '0.1',
     description = 'Budget helper',
     author = 'Sam',
     author_email = 'sbriley.0@gmail.com',
-    packages = ['budget_insights'],
+    package_dir = {'': 'budget_insights'},
+    py_modules = MODULES,
     install_requires = [
         'matplotlib==3.4.3',
+        'numpy>=1.20',
     ],
     entry_points = {
         'console_scripts': [
-            'budget=budget_insights.gui:main'
+            'budget=gui:main',
+            'budget-cli=cli:main'
         ]
     },
 )
\ No newline at end of file